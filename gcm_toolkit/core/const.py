@@ -38,6 +38,10 @@ VARNAMES = dict(
     W=cc.W,
     Ttave=cc.Ttave,  # Temperature averaged
     wVeltave=cc.wVeltave,  # vertical velocity timeaveraged
+    uVeltave="uVeltave",  # zonal velocity timeaveraged
+    vVeltave="vVeltave",  # meridional velocity timeaveraged
+    EXOFricU="EXOFricU",  # zonal friction of the exorad package
+    EXOFricV="EXOFricV",  # meridional friction of the exorad package
     drW=cc.drW,
     drS=cc.drS,
     HFacW=cc.HFacW,
@@ -69,6 +73,7 @@ VARNAMES = dict(
     R_p="R_p",
     cp="cp",
     R="R",
+    region="region",  # region of horizontal averages
 )
 
 SUPPORTED_GCMS = ["MITgcm"]
@@ -33,26 +33,13 @@ def convert_pressure(dsi, current_unit, goal_unit):
         dataset with updated units
     """
 
-    if current_unit not in ALLOWED_PUNITS or goal_unit not in ALLOWED_PUNITS:
-        raise ValueError(
-            f"current_unit and goal_unit need to be in {ALLOWED_PUNITS}"
-        )
+    factor = pressure_factor(current_unit, goal_unit)
 
     # Convert pressure
     for dim in [c["Z"], c["Z_l"], c["Z_p1"], c["Z_u"]]:
         if dim in dsi.dims:
-            dsi[dim] = (
-                (np.array(dsi[dim]) * u.Unit(current_unit))
-                .to(u.Unit(goal_unit))
-                .value
-            )
-    dsi.attrs.update(
-        {
-            "p_ref": (dsi.p_ref * u.Unit(current_unit))
-            .to(u.Unit(goal_unit))
-            .value
-        }
-    )
+            dsi[dim] = np.array(dsi[dim]) * factor
+    dsi.attrs.update({"p_ref": dsi.p_ref * factor})
 
     # store the units in the dataset attributes
     dsi.attrs["p_unit"] = goal_unit
@@ -60,6 +47,30 @@ def convert_pressure(dsi, current_unit, goal_unit):
     return dsi
 
 
+def pressure_factor(current_unit, goal_unit):
+    """
+    Factor to convert pressures from current_unit to goal_unit.
+
+    Parameters
+    ----------
+    current_unit: str
+        Current unit
+    goal_unit: str
+        Unit to be changed to
+
+    Returns
+    -------
+    factor: float
+        pressure in goal_unit = factor * pressure in current_unit
+    """
+    if current_unit not in ALLOWED_PUNITS or goal_unit not in ALLOWED_PUNITS:
+        raise ValueError(
+            f"current_unit and goal_unit need to be in {ALLOWED_PUNITS}"
+        )
+
+    return (1 * u.Unit(current_unit)).to(u.Unit(goal_unit)).value
+
+
 def convert_time(dsi, current_unit, goal_unit):
     """
     Convert the time in dataset if current_unit and goal_unit differ.
@@ -0,0 +1,216 @@
+"""
+==============================================================
+                 Native MITgcm binary reader
+==============================================================
+ Reader for the .meta/.data output of MITgcm setups on a
+ regular lon/lat grid. The big-endian records are memory
+ mapped, so that no data is read or copied before it is
+ actually used. Cubed-sphere output needs to be regridded and
+ is therefore read with the cubedsphere package instead.
+==============================================================
+"""
+import os
+import re
+
+import numpy as np
+import xarray as xr
+
+from ..core.const import VARNAMES as c
+
+# Variables that are not located at the cell centers
+# (dimension in the native grid -> dimension of the variable)
+_STAGGERED = {
+    c["U"]: {"x": c["i_g"]},
+    c["V"]: {"y": c["j_g"]},
+    c["W"]: {"z": c["Z_l"]},
+    c["uVeltave"]: {"x": c["i_g"]},
+    c["vVeltave"]: {"y": c["j_g"]},
+    c["wVeltave"]: {"z": c["Z_l"]},
+    c["EXOFricU"]: {"x": c["i_g"]},
+    c["EXOFricV"]: {"y": c["j_g"]},
+}
+
+_META_ENTRY = re.compile(r"(\w+)\s*=\s*[\[{](.*?)[\]}]\s*;", re.DOTALL)
+
+
+def read_meta(filename):
+    """
+    Parse a MITgcm .meta file.
+
+    Parameters
+    ----------
+    filename: str
+        Path to the .meta file
+
+    Returns
+    -------
+    meta: dict
+        Dictionary with the shape of one record ('shape', C-order),
+        the big-endian dtype ('dtype'), the number of records ('nrecords')
+        and the names of the fields ('fields', may be empty).
+    """
+    with open(filename, "r", encoding="utf-8") as fil:
+        entries = dict(_META_ENTRY.findall(fil.read()))
+
+    dim_list = [int(d) for d in entries["dimList"].replace(",", " ").split()]
+    # every dimension is given as (global size, start, end)
+    shape = tuple(reversed(dim_list[::3]))
+
+    precision = entries["dataprec"].strip(" '")
+    if precision not in ["float32", "float64"]:
+        raise ValueError(f"Unsupported data precision {precision}")
+
+    return {
+        "shape": shape,
+        "dtype": np.dtype(">f4" if precision == "float32" else ">f8"),
+        "nrecords": int(entries["nrecords"]),
+        "fields": [
+            f.strip()
+            for f in re.findall(r"'([^']*)'", entries.get("fldList", ""))
+        ],
+    }
+
+
+def memmap_mds(basename):
+    """
+    Memory map all records of a MITgcm .data file.
+
+    Parameters
+    ----------
+    basename: str
+        Path to the file without the extension
+
+    Returns
+    -------
+    records: dict
+        Dictionary that maps the field names to read-only memory maps.
+        If the file has no field list, the name of the file (without
+        iteration) is used.
+    """
+    meta = read_meta(f"{basename}.meta")
+    data = np.memmap(
+        f"{basename}.data",
+        dtype=meta["dtype"],
+        mode="r",
+        shape=(meta["nrecords"],) + meta["shape"],
+    )
+
+    fields = meta["fields"]
+    if not fields:
+        fields = [os.path.basename(basename).split(".")[0]]
+
+    per_field = meta["nrecords"] // len(fields)
+    return {
+        name: data[n * per_field : (n + 1) * per_field].reshape(
+            (-1,) + meta["shape"][1:] if per_field > 1 else meta["shape"]
+        )
+        for n, name in enumerate(fields)
+    }
+
+
+def _read_grid(data_path):
+    """Helper function to read the lon/lat/pressure grid of the output."""
+    grid = {}
+    for name in ["XC", "YC", "RC", "RF"]:
+        basename = os.path.join(data_path, name)
+        if not os.path.isfile(f"{basename}.meta"):
+            raise FileNotFoundError(
+                f"Could not find the grid file {name}.meta in {data_path}"
+            )
+        grid[name] = np.squeeze(memmap_mds(basename)[name])
+
+    z_f = np.asarray(grid["RF"], dtype="<f8")
+    return {
+        c["lon"]: np.asarray(grid["XC"][0, :], dtype="<f8"),
+        c["lat"]: np.asarray(grid["YC"][:, 0], dtype="<f8"),
+        c["Z"]: np.asarray(grid["RC"], dtype="<f8"),
+        c["Z_p1"]: z_f,
+        c["Z_l"]: z_f[:-1],
+        c["Z_u"]: z_f[1:],
+    }
+
+
+def _dims_of(name, shape, coords):
+    """Helper function to find the dimensions of a native field."""
+    staggered = _STAGGERED.get(name, {})
+    dims = [staggered.get("y", c["lat"]), staggered.get("x", c["lon"])]
+
+    if len(shape) == 3:
+        if shape[0] == len(coords[c["Z_p1"]]):
+            dims.insert(0, c["Z_p1"])
+        else:
+            dims.insert(0, staggered.get("z", c["Z"]))
+
+    return dims
+
+
+def _to_centers(dsi):
+    """
+    Interpolate horizontally staggered fields (C-grid) to the cell centers.
+    The longitudes are periodic, the meridional velocity north of the
+    last row is zero at the pole.
+    """
+    for name in list(dsi.data_vars):
+        var = dsi[name]
+        if c["i_g"] in var.dims:
+            east = var.roll({c["i_g"]: -1}, roll_coords=False)
+            dsi[name] = (0.5 * (var + east)).rename({c["i_g"]: c["lon"]})
+        elif c["j_g"] in var.dims:
+            north = var.shift({c["j_g"]: -1}).fillna(0)
+            dsi[name] = (0.5 * (var + north)).rename({c["j_g"]: c["lat"]})
+
+    return dsi.drop_dims([c["i_g"], c["j_g"]], errors="ignore")
+
+
+def open_mds_dataset(data_path, iters, prefix):
+    """
+    Open MITgcm .data/.meta output on a regular lon/lat grid.
+    The data is memory mapped and wrapped in dask arrays, such that nothing
+    is read before it is actually used.
+
+    Parameters
+    ----------
+    data_path : str
+        Folder path to the standard output of the GCM.
+    iters : list
+        The iterations that should be read
+    prefix : list
+        The prefixes of the files that should be read
+
+    Returns
+    -------
+    dsi: xarray.Dataset
+        Dataset in the native units of MITgcm (pressure in Pa)
+        with time in iterations.
+    """
+    import dask.array as da
+
+    coords = _read_grid(data_path)
+
+    records = {}
+    for pre in prefix:
+        for i in iters:
+            basename = os.path.join(data_path, f"{pre}.{i:010d}")
+            for name, data in memmap_mds(basename).items():
+                records.setdefault(name, []).append(
+                    da.from_array(data, chunks=data.shape)
+                )
+
+    data_vars = {}
+    for name, arrays in records.items():
+        dims = _dims_of(name, arrays[0].shape, coords)
+        data_vars[name] = (
+            [c["time"]] + dims,
+            da.stack(arrays).astype("<f8"),
+        )
+
+    iters = np.asarray(iters)
+    dsi = xr.Dataset(
+        data_vars,
+        coords=dict(
+            coords,
+            **{c["time"]: iters, c["iter"]: (c["time"], iters)},
+        ),
+    )
+
+    return _to_centers(dsi)
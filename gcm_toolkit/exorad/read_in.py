@@ -12,11 +12,39 @@
 """
 import glob
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
+import numpy as np
 import xarray as xr
 
 from ..core import writer as wrt
+from ..core.const import VARNAMES as c
 from ..core.units import convert_pressure, convert_time
+from ..utils.manifest import scan_with_manifest
+from .weights import (
+    DEFAULT_WEIGHTS_CACHE_SIZE,
+    evict_weights,
+    finalize_weights,
+    get_weights_cache_dir,
+    lookup_weights,
+    store_weights,
+    weights_key,
+)
+
+ITER_MANIFEST = ".gcmt_iters.json"
+
+# Prefixes that need to be read together, because their conversion depends
+# on each other (vector rotation during regridding, Pa/s -> m/s for W).
+_COMPANION_PREFIXES = {
+    "U": ["V"],
+    "V": ["U"],
+    "W": ["T"],
+    "uVeltave": ["vVeltave"],
+    "vVeltave": ["uVeltave"],
+    "wVeltave": ["Ttave"],
+}
 
 
 def m_read_from_mitgcm(
@@ -27,6 +55,14 @@ def m_read_from_mitgcm(
     d_lon=5,
     d_lat=4,
     loaded_dsi=None,
+    weights_cache=True,
+    weights_cache_dir=None,
+    weights_cache_size=DEFAULT_WEIGHTS_CACHE_SIZE,
+    n_workers=1,
+    iters_per_batch=None,
+    lazy=False,
+    chunks=None,
+    reader="cubedsphere",
     **kwargs,
 ):
     """
@@ -47,9 +83,42 @@ def m_read_from_mitgcm(
         List iterations that you don't want to load
         if None, no iterations from the list of iters will be excluded
         if list: exclude from iters
-    data_file : str
-        Full path to the 'data' input file of MITgcm. If None, the default
-        location of the file is assumed to be: data_path/data
+    d_lon: float, optional
+        Longitude resolution of the regridded dataset
+    d_lat: float, optional
+        Latitude resolution of the regridded dataset
+    loaded_dsi: xarray.Dataset, optional
+        Already loaded dataset that should be extended
+    weights_cache: bool, optional
+        Keep the regridding weights in a persistent on-disk cache, so that
+        they only need to be generated once per grid geometry and resolution.
+    weights_cache_dir: str, optional
+        Directory of the weight cache.
+        Defaults to $GCM_TOOLKIT_CACHE/weights (or ~/.gcm_toolkit/weights).
+    weights_cache_size: float, optional
+        Maximum size of the weight cache in bytes. The least recently used
+        weights are evicted first.
+    n_workers: int, optional
+        Number of processes that read, regrid and postprocess batches of
+        iterations in parallel. Defaults to 1 (serial read in). With the
+        weight cache, the first iteration is read in the main process to
+        build the weights, all other iterations are read by the workers.
+    iters_per_batch: int, optional
+        Number of iterations per batch. By default, the iterations are split
+        evenly between the workers.
+    lazy: bool, optional
+        Do not read the data right away, but build a dask graph that reads,
+        regrids and converts the data on demand. Only the first iteration is
+        read directly to determine the layout of the dataset.
+    chunks: dict, optional
+        Chunks of the lazy dataset, e.g. {"time": 10, "Z": 20}. The chunk
+        size along time sets the number of iterations per read. Implies
+        lazy=True.
+    reader: str, optional
+        'cubedsphere' (default) reads and regrids cubed-sphere output with
+        the cubedsphere package. 'mds' memory maps the .data/.meta files of
+        a lon/lat setup directly (no regridding needed, d_lon, d_lat and
+        the weight cache are ignored).
     **kwargs: dict
         pass down parameters to open_ascii_dataset from cubedsphere.
 
@@ -58,9 +127,6 @@ def m_read_from_mitgcm(
     NoneType
         None
     """
-    import cubedsphere as cs
-    from .utils import exorad_postprocessing
-
     # determine the prefixes that should be loaded
     prefix = kwargs.pop("prefix", ["T", "U", "V", "W"])
 
@@ -91,37 +157,391 @@ def m_read_from_mitgcm(
             wrt.write_status("E-INFO", "No iterations selected to load.")
         return loaded_dsi
 
-    # Currently, the read-in method is built using the wrapper functionality of
-    # the cubedsphere package (Aaron Schneider)
-    # see: https://cubedsphere.readthedocs.io/en/latest/index.html
-    dsi_ascii, grid = cs.open_ascii_dataset(
-        data_path, iters=to_load, prefix=prefix, **kwargs
-    )
+    to_load = sorted(to_load)
+    if reader not in ["cubedsphere", "mds"]:
+        raise ValueError(
+            f"Unknown reader {reader}, use 'cubedsphere' or 'mds'"
+        )
 
-    # regrid the dataset
-    filename = (  # generate random filename for weights to be deleted
-        "tmp_gcmt_reg_weights_xya"
-    )
-    regrid = cs.Regridder(
-        ds=dsi_ascii, cs_grid=grid, d_lon=d_lon, d_lat=d_lat, filename=filename
+    read_kwargs = dict(
+        reader=reader,
+        d_lon=d_lon,
+        d_lat=d_lat,
+        weights_cache=weights_cache,
+        weights_cache_dir=weights_cache_dir,
+        weights_cache_size=weights_cache_size,
+        **kwargs,
     )
-    _ = [
-        os.remove(f) for f in glob.glob(filename + "*.nc")
-    ]  # delete aux weights
-    dsi = regrid()
 
-    # convert wind, vertical dimension, time, ...
-    dsi = exorad_postprocessing(dsi, outdir=data_path)
+    if lazy or chunks is not None:
+        dsi = _read_lazy_mitgcm(
+            data_path, to_load, prefix, read_kwargs, chunks
+        )
+        return _finalize_mitgcm(tools, dsi, loaded_dsi)
+
+    parallel = n_workers > 1 and len(to_load) > 1
+
+    # Read the first iteration in the main process, so that the regridding
+    # weights are cached before the workers start.
+    results = []
+    if parallel and reader == "cubedsphere" and weights_cache:
+        results.append(
+            _read_batch_mitgcm(data_path, to_load[:1], prefix, read_kwargs)
+        )
+        to_load = to_load[1:]
+
+    if iters_per_batch is None:
+        iters_per_batch = -(-len(to_load) // max(n_workers, 1))
+    batches = [
+        to_load[i : i + iters_per_batch]
+        for i in range(0, len(to_load), iters_per_batch)
+    ]
+
+    if parallel:
+        wrt.write_status(
+            "INFO", f"Read {len(batches)} batches with {n_workers} workers"
+        )
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            results += list(
+                executor.map(
+                    _read_batch_mitgcm,
+                    repeat(data_path),
+                    batches,
+                    repeat(prefix),
+                    repeat(read_kwargs),
+                )
+            )
+    else:
+        results += [
+            _read_batch_mitgcm(data_path, batch, prefix, read_kwargs)
+            for batch in batches
+        ]
+
+    if len(results) > 1:
+        dsi = xr.concat(
+            results,
+            dim=c["time"],
+            data_vars="minimal",
+            coords="minimal",
+            compat="override",
+        )
+    else:
+        dsi = results[0]
+
+    return _finalize_mitgcm(tools, dsi, loaded_dsi)
 
+
+def _finalize_mitgcm(tools, dsi, loaded_dsi):
+    """
+    Convert the units of freshly read data to the units of the GCMT object
+    and append it to already loaded data.
+    """
     convert_pressure(dsi, current_unit="Pa", goal_unit=tools.p_unit)
     convert_time(dsi, current_unit="iter", goal_unit=tools.time_unit)
 
     if loaded_dsi is not None:
-        dsi = xr.merge([dsi, loaded_dsi])
+        dsi = _append_along_time(loaded_dsi, dsi)
 
     return dsi
 
 
+def _read_lazy_mitgcm(data_path, iters, prefix, read_kwargs, chunks):
+    """
+    Build a dask backed dataset, that reads, regrids and postprocesses the
+    data on demand.
+
+    Parameters
+    ----------
+    data_path : str
+        Folder path to the standard output of the GCM.
+    iters : list
+        Sorted list of iterations that should be read
+    prefix : list
+        The prefixes of the files that should be read
+    read_kwargs : dict
+        Options passed to _read_batch_mitgcm
+    chunks : dict, None
+        Chunks of the resulting dataset
+
+    Returns
+    -------
+    dsi: xarray.Dataset
+        Lazy dataset in SI units (pressure in Pa) with time in iterations.
+    """
+    chunks = dict(chunks or {})
+    iters_per_chunk = chunks.pop(c["time"], 1)
+    batches = [
+        iters[i : i + iters_per_chunk]
+        for i in range(0, len(iters), iters_per_chunk)
+    ]
+
+    wrt.write_status(
+        "INFO", f"Lazy read in with {len(batches)} chunks along time"
+    )
+
+    # Each group of prefixes is read separately, so that only the files
+    # of the variables that are actually used need to be touched.
+    datasets = []
+    for group in _group_prefixes(prefix):
+        template = _read_batch_mitgcm(data_path, iters[:1], group, read_kwargs)
+        datasets.append(
+            _from_delayed_batches(
+                template, data_path, batches, group, read_kwargs
+            )
+        )
+
+    dsi = xr.merge(datasets, compat="override", combine_attrs="override")
+
+    if chunks:
+        dsi = dsi.chunk(chunks)
+
+    return dsi
+
+
+def _group_prefixes(prefix):
+    """Helper function to group prefixes that need to be read together."""
+    groups = []
+    for pre in prefix:
+        group = {pre} | set(_COMPANION_PREFIXES.get(pre, [])) & set(prefix)
+        for other in [g for g in groups if g & group]:
+            group |= other
+            groups.remove(other)
+        groups.append(group)
+
+    # keep the original order of the prefixes
+    groups = [[pre for pre in prefix if pre in group] for group in groups]
+    return sorted(groups, key=lambda group: prefix.index(group[0]))
+
+
+def _from_delayed_batches(template, data_path, batches, prefix, read_kwargs):
+    """
+    Construct a lazy dataset from a template, that contains the first
+    iteration, and delayed reads of the batches of iterations.
+
+    Parameters
+    ----------
+    template : xarray.Dataset
+        Already read in dataset of the first iteration
+    data_path : str
+        Folder path to the standard output of the GCM.
+    batches : list
+        List of lists of the iterations that are read together
+    prefix : list
+        The prefixes of the files that should be read
+    read_kwargs : dict
+        Options passed to _read_batch_mitgcm
+
+    Returns
+    -------
+    dsi: xarray.Dataset
+        Lazy dataset with all iterations
+    """
+    import dask
+    import dask.array as da
+
+    iters = np.concatenate(batches)
+    delayed = [
+        dask.delayed(_read_batch_mitgcm, pure=True)(
+            data_path, batch, prefix, read_kwargs
+        )
+        for batch in batches
+    ]
+
+    time_vars = [
+        name
+        for name, var in template.variables.items()
+        if c["time"] in var.dims
+    ]
+    dsi = template.drop_vars(time_vars)
+    dsi = dsi.assign_coords(
+        {
+            c["time"]: (c["time"], _times_of_iters(template, iters)),
+            "iter": (c["time"], iters),
+        }
+    )
+
+    for name in time_vars:
+        if name in [c["time"], "iter"]:
+            continue
+        var = template.variables[name]
+        axis = var.dims.index(c["time"])
+        blocks = []
+        for batch, dsd in zip(batches, delayed):
+            shape = list(var.shape)
+            shape[axis] = len(batch)
+            blocks.append(
+                da.from_delayed(
+                    dsd[name].data, shape=tuple(shape), dtype=var.dtype
+                )
+            )
+        lazy_var = xr.Variable(
+            var.dims, da.concatenate(blocks, axis=axis), attrs=var.attrs
+        )
+        if name in template.coords:
+            dsi = dsi.assign_coords({name: lazy_var})
+        else:
+            dsi[name] = lazy_var
+
+    dsi[c["time"]].attrs = template[c["time"]].attrs
+    return dsi
+
+
+def _times_of_iters(template, iters):
+    """
+    Helper function to compute the time coordinate of the given iterations
+    from the time and iteration of a template dataset.
+    """
+    iter0 = int(template["iter"].values[0])
+    time0 = template[c["time"]].values[0]
+
+    if np.issubdtype(np.asarray(time0).dtype, np.timedelta64):
+        step = np.timedelta64(int(round(template.attrs["dt"] * 1e9)), "ns")
+    elif iter0 != 0:
+        step = time0 / iter0
+    else:
+        step = 1
+
+    return time0 + (np.asarray(iters) - iter0) * step
+
+
+def _append_along_time(loaded_dsi, dsi):
+    """
+    Append newly read iterations to an already loaded dataset.
+    If both datasets share the same variables and grid, the new data is
+    simply concatenated along time, which avoids the alignment of a full
+    merge. Otherwise, we fall back to xarray.merge.
+
+    Parameters
+    ----------
+    loaded_dsi: xarray.Dataset
+        Already loaded dataset
+    dsi: xarray.Dataset
+        Dataset with the new iterations
+
+    Returns
+    -------
+    dsi: xarray.Dataset
+        Combined dataset
+    """
+    same_grid = all(
+        dim in loaded_dsi.indexes and loaded_dsi.indexes[dim].equals(index)
+        for dim, index in dsi.indexes.items()
+        if dim != c["time"]
+    )
+    if set(dsi.data_vars) != set(loaded_dsi.data_vars) or not same_grid:
+        wrt.write_status(
+            "WARN",
+            "New iterations do not match the loaded dataset, merging instead.",
+        )
+        return xr.merge([dsi, loaded_dsi])
+
+    dsi = xr.concat(
+        [loaded_dsi, dsi],
+        dim=c["time"],
+        data_vars="minimal",
+        coords="minimal",
+        compat="override",
+        join="override",
+        combine_attrs="override",
+    )
+
+    if not dsi.indexes[c["time"]].is_monotonic_increasing:
+        dsi = dsi.sortby(c["time"])
+
+    return dsi
+
+
+def _read_batch_mitgcm(data_path, iters, prefix, read_kwargs):
+    """
+    Read, regrid and postprocess one batch of iterations.
+    This function is also used in worker processes, so it needs to be
+    picklable and may not rely on a GCMT object.
+
+    Parameters
+    ----------
+    data_path : str
+        Folder path to the standard output of the GCM.
+    iters : list
+        The iterations of this batch
+    prefix : list
+        The prefixes of the files that should be read
+    read_kwargs : dict
+        The reader and the options for regridding (d_lon, d_lat and the
+        weights cache). All other options are passed down to
+        open_ascii_dataset from cubedsphere.
+
+    Returns
+    -------
+    dsi: xarray.Dataset
+        Regridded and postprocessed dataset in SI units (pressure in Pa)
+        with time in iterations.
+    """
+    from .utils import exorad_postprocessing
+
+    kwargs = dict(read_kwargs)
+    if kwargs.pop("reader") == "mds":
+        from .mds import open_mds_dataset
+
+        dsi = open_mds_dataset(data_path, iters, prefix)
+        return exorad_postprocessing(dsi, outdir=data_path)
+
+    import cubedsphere as cs
+
+    d_lon = kwargs.pop("d_lon")
+    d_lat = kwargs.pop("d_lat")
+    weights_cache = kwargs.pop("weights_cache")
+    weights_cache_dir = kwargs.pop("weights_cache_dir")
+    weights_cache_size = kwargs.pop("weights_cache_size")
+
+    # Currently, the read-in method is built using the wrapper functionality of
+    # the cubedsphere package (Aaron Schneider)
+    # see: https://cubedsphere.readthedocs.io/en/latest/index.html
+    dsi_ascii, grid = cs.open_ascii_dataset(
+        data_path, iters=iters, prefix=prefix, **kwargs
+    )
+
+    # regrid the dataset
+    if weights_cache:
+        cache_dir = get_weights_cache_dir(weights_cache_dir)
+        key = weights_key(grid, d_lon, d_lat)
+        filename, hit = lookup_weights(cache_dir, key)
+        wrt.write_status(
+            "INFO",
+            "Regridding weights: " + ("cached" if hit else "not cached"),
+        )
+        regrid = cs.Regridder(
+            ds=dsi_ascii,
+            cs_grid=grid,
+            d_lon=d_lon,
+            d_lat=d_lat,
+            filename=filename,
+            reuse_weights=hit,
+        )
+        store_weights(regrid)
+        if not hit:
+            finalize_weights(cache_dir, key)
+            evict_weights(cache_dir, weights_cache_size, keep=key)
+    else:
+        # generate unique filename for weights to be deleted
+        filename = (
+            f"tmp_gcmt_reg_weights_{os.getpid()}_{threading.get_ident()}"
+        )
+        regrid = cs.Regridder(
+            ds=dsi_ascii,
+            cs_grid=grid,
+            d_lon=d_lon,
+            d_lat=d_lat,
+            filename=filename,
+        )
+        _ = [
+            os.remove(f) for f in glob.glob(filename + "*.nc")
+        ]  # delete aux weights
+    dsi = regrid()
+
+    # convert wind, vertical dimension, time, ...
+    return exorad_postprocessing(dsi, outdir=data_path)
+
+
 def find_iters_mitgcm(data_path, prefixes):
     """
     Helper method to list all iterations (time steps) that are present in the
@@ -131,20 +551,92 @@ def find_iters_mitgcm(data_path, prefixes):
     ----------
     data_path : str
         Folder path to the standard output of the GCM.
+    prefixes : list
+        Prefixes of the files for which data needs to be present.
 
     Returns
     -------
-    iterations : list of int
-        List of all iterations that were found in the output folder.
+    iterations : set of int
+        Set of all iterations that were found in the output folder.
     """
-    iters_list = []
-    for prefix in prefixes:
-        files = glob.glob(os.path.join(data_path, f"{prefix}.*.data"))
+    index, _ = _get_iter_index(data_path)
+    return _common_iters(index, prefixes)
 
-        iters = [int(f.split(".")[-2]) for f in files]
-        iters_list.append(iters)
 
-    # find common iterations with data for all prefixes
-    iterations = set.intersection(*[set(list) for list in iters_list])
+def find_new_iters_mitgcm(data_path, prefixes):
+    """
+    Helper method to list the iterations (time steps) that have been added
+    to the given MITgcm output directory since the previous scan of the
+    directory.
+
+    Parameters
+    ----------
+    data_path : str
+        Folder path to the standard output of the GCM.
+    prefixes : list
+        Prefixes of the files for which data needs to be present.
+
+    Returns
+    -------
+    iterations : set of int
+        Set of all iterations that are new.
+    """
+    index, previous = _get_iter_index(data_path)
+    return _common_iters(index, prefixes) - _common_iters(previous, prefixes)
+
+
+def _common_iters(index, prefixes):
+    """Helper function to find iterations with data for all prefixes."""
+    return set.intersection(
+        *[set(index.get(prefix, [])) for prefix in prefixes]
+    )
+
+
+def _scan_iters_mitgcm(data_path):
+    """
+    List all iterations per prefix with one pass over the output directory.
+
+    Parameters
+    ----------
+    data_path : str
+        Folder path to the standard output of the GCM.
+
+    Returns
+    -------
+    index : dict
+        Dictionary that maps the prefixes to sorted lists of iterations
+    """
+    index = {}
+    with os.scandir(data_path) as entries:
+        for entry in entries:
+            # files are named like {prefix}.{iteration}.data
+            parts = entry.name.rsplit(".", 2)
+            if len(parts) != 3 or parts[2] != "data" or not parts[1].isdigit():
+                continue
+            index.setdefault(parts[0], []).append(int(parts[1]))
+
+    return {prefix: sorted(iters) for prefix, iters in index.items()}
+
+
+def _get_iter_index(data_path):
+    """
+    Return the iteration index of the output directory. The index is cached in
+    a manifest file in the output directory, which is only rebuilt if the
+    modification time of the directory changes.
 
-    return iterations
+    Parameters
+    ----------
+    data_path : str
+        Folder path to the standard output of the GCM.
+
+    Returns
+    -------
+    index : dict
+        Dictionary that maps the prefixes to sorted lists of iterations
+    previous: dict
+        The index before the last change of the output directory
+    """
+    index, previous = scan_with_manifest(
+        data_path, ITER_MANIFEST, _scan_iters_mitgcm
+    )
+    return index, previous or {}
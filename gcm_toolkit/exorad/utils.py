@@ -2,6 +2,7 @@
 utils to work with cubedsphere
 """
 import os
+from functools import lru_cache
 
 import cubedsphere as cs
 import cubedsphere.const as c
@@ -25,34 +26,70 @@ class MITgcmDataParser(Parser):
         self.sparse_arrays = True
 
 
-def get_parameter(datafile, keyword, default=None):
+def read_datafile(datafile):
     """
-    Function to parse the MITgcm 'data' file and return the parameter values
-    of the given specific keyword.
+    Function to parse the MITgcm 'data' file into a lookup table.
+    The parsed file is cached and only parsed again if the file changes.
 
     Parameters
     ----------
     datafile: string
         Full path to the MITgcm data file.
-    keyword: string
-        Parameter of which the value is required.
 
     Returns
     ----------
-    value: string
-        The value associated with the given keyword is returned as a string (!).
+    params: dict
+        All parameters of the data file with lowercase keywords as keys.
+        The returned dictionary is shared between calls and should not be
+        modified.
     """
-
     if not os.path.isfile(datafile):
         raise FileNotFoundError("could not find the datafile.")
 
+    return _read_datafile(
+        os.path.abspath(datafile), os.stat(datafile).st_mtime_ns
+    )
+
+
+@lru_cache(maxsize=32)
+def _read_datafile(datafile, mtime_ns):  # pylint: disable=unused-argument
+    """Helper function to parse the data file, memoized by path and mtime."""
     parser = MITgcmDataParser()
     data = parser.read(datafile)
 
+    params = {}
     for section in data:
         for key, val in data[section].items():
-            if key.lower() == keyword.lower():
-                return val
+            params.setdefault(key.lower(), val)
+
+    return params
+
+
+def get_parameter(datafile, keyword, default=None):
+    """
+    Function to parse the MITgcm 'data' file and return the parameter values
+    of the given specific keyword.
+
+    Parameters
+    ----------
+    datafile: string or dict
+        Full path to the MITgcm data file, or the already parsed data file
+        (see read_datafile).
+    keyword: string
+        Parameter of which the value is required.
+
+    Returns
+    ----------
+    value: string
+        The value associated with the given keyword is returned as a string (!).
+    """
+    if isinstance(datafile, dict):
+        params = datafile
+    else:
+        params = read_datafile(datafile)
+
+    if keyword.lower() in params:
+        return params[keyword.lower()]
 
     if default is None:
         raise KeyError(f"Keyword {keyword} not found in datafile.")
@@ -134,29 +171,30 @@ def exorad_postprocessing(dsi, outdir=None, datafile=None):
     if outdir is not None:
         datafile = f"{outdir}/data"
 
+    # parse the data file only once
+    params = read_datafile(datafile)
+
     # Add metadata
     radius = float(
-        get_parameter(datafile, "rSphere", 6370e3)
+        get_parameter(params, "rSphere", 6370e3)
     )  # planet radius in m
     p_rot = float(
-        get_parameter(datafile, "rotationperiod", 8.6164e4)
+        get_parameter(params, "rotationperiod", 8.6164e4)
     )  # planet rotationperiod in m
     attrs = {
         "p_ref": float(
-            get_parameter(datafile, "Ro_SeaLevel", 1.0e5)
+            get_parameter(params, "Ro_SeaLevel", 1.0e5)
         ),  # bot layer pres in pa
         "cp": float(
-            get_parameter(datafile, "atm_Cp", 1.004e3)
+            get_parameter(params, "atm_Cp", 1.004e3)
         ),  # heat cap at constant pres
         "R": float(
-            get_parameter(datafile, "atm_Rd", 2.868571e2)
+            get_parameter(params, "atm_Rd", 2.868571e2)
         ),  # specific gas constant
         "g": float(
-            get_parameter(datafile, "gravity", 9.81)
+            get_parameter(params, "gravity", 9.81)
         ),  # surface gravity in m/s^2
-        "dt": int(
-            get_parameter(datafile, "deltaT", 0.0)
-        ),  # time step size in s
+        "dt": int(get_parameter(params, "deltaT", 0.0)),  # time step size in s
         "R_p": radius,
         "P_rot": p_rot,
         "P_orb": p_rot,  # change, when this is available
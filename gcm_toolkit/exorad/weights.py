@@ -0,0 +1,222 @@
+"""
+==============================================================
+                 Regridding weight cache
+==============================================================
+ Building the xESMF weights for the cubedsphere -> lon/lat
+ regridding is the most expensive part of reading in raw
+ MITgcm data. Since the weights only depend on the grid
+ geometry and the target resolution, we keep them in a
+ persistent on-disk cache that is bounded in size.
+==============================================================
+"""
+import glob
+import hashlib
+import os
+
+import numpy as np
+
+from ..core import writer as wrt
+
+DEFAULT_WEIGHTS_CACHE_SIZE = 500e6  # in bytes
+WEIGHTS_PREFIX = "gcmt_weights_"
+COMPLETE_SUFFIX = ".complete"
+
+
+def get_weights_cache_dir(cache_dir=None):
+    """
+    Return (and create, if needed) the directory in which regridding weights
+    are cached.
+
+    Parameters
+    ----------
+    cache_dir: str, optional
+        Directory to be used. If None, we use $GCM_TOOLKIT_CACHE/weights,
+        which defaults to ~/.gcm_toolkit/weights.
+
+    Returns
+    -------
+    cache_dir: str
+        Path to the cache directory
+    """
+    if cache_dir is None:
+        root = os.environ.get(
+            "GCM_TOOLKIT_CACHE",
+            os.path.join(os.path.expanduser("~"), ".gcm_toolkit"),
+        )
+        cache_dir = os.path.join(root, "weights")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def weights_key(grid, d_lon, d_lat):
+    """
+    Construct a unique key for the regridding weights of a given grid
+    geometry and target resolution. The key depends on the sizes of all
+    dimensions and on the values of all variables of the grid.
+
+    Parameters
+    ----------
+    grid: xarray.Dataset
+        cubedsphere grid dataset (as returned by cs.open_ascii_dataset)
+    d_lon: float
+        Longitude resolution of the target grid
+    d_lat: float
+        Latitude resolution of the target grid
+
+    Returns
+    -------
+    key: str
+        Hash that identifies the weights
+    """
+    sha = hashlib.sha1()
+    sha.update(str(sorted(grid.sizes.items())).encode())
+    for name in sorted(grid.variables):
+        var = grid.variables[name]
+        sha.update(f"{name}{var.dims}".encode())
+        if np.issubdtype(var.dtype, np.number):
+            values = np.ascontiguousarray(var.values, dtype="<f8")
+            sha.update(values.tobytes())
+        else:
+            sha.update(str(var.values.tolist()).encode())
+    sha.update(f"d_lon={float(d_lon)},d_lat={float(d_lat)}".encode())
+    return sha.hexdigest()
+
+
+def _entry_files(cache_dir, key):
+    """Helper function that lists all weight files of one cache entry."""
+    return glob.glob(os.path.join(cache_dir, f"{WEIGHTS_PREFIX}{key}*.nc"))
+
+
+def _marker_name(cache_dir, key):
+    """Helper function that returns the completion marker of a cache entry."""
+    return os.path.join(cache_dir, f"{WEIGHTS_PREFIX}{key}{COMPLETE_SUFFIX}")
+
+
+def _remove_entry(cache_dir, key):
+    """Helper function that removes all files of one cache entry."""
+    for file in _entry_files(cache_dir, key) + [_marker_name(cache_dir, key)]:
+        if os.path.isfile(file):
+            os.remove(file)
+
+
+def lookup_weights(cache_dir, key):
+    """
+    Look up the weights in the cache. Only complete entries (see
+    finalize_weights) are used. Incomplete entries, e.g. of an interrupted
+    run, are removed.
+
+    Parameters
+    ----------
+    cache_dir: str
+        Directory of the weight cache
+    key: str
+        Key of the weights (see weights_key)
+
+    Returns
+    -------
+    filename: str
+        Filename (without tile suffix and extension) that should be passed
+        to cs.Regridder.
+    hit: bool
+        True if weights are already available.
+    """
+    filename = os.path.join(cache_dir, f"{WEIGHTS_PREFIX}{key}")
+    files = _entry_files(cache_dir, key)
+    marker = _marker_name(cache_dir, key)
+
+    complete = []
+    if os.path.isfile(marker):
+        with open(marker, encoding="utf-8") as fil:
+            complete = fil.read().split()
+    hit = len(complete) > 0 and set(complete) <= {
+        os.path.basename(file) for file in files
+    }
+
+    if not hit:
+        _remove_entry(cache_dir, key)
+        return filename, False
+
+    # mark as recently used for the eviction
+    for file in files:
+        os.utime(file)
+
+    return filename, True
+
+
+def finalize_weights(cache_dir, key):
+    """
+    Mark the weights of one cache entry as complete. Needs to be called
+    after all weight files of the entry have been written.
+
+    Parameters
+    ----------
+    cache_dir: str
+        Directory of the weight cache
+    key: str
+        Key of the weights (see weights_key)
+    """
+    files = sorted(
+        os.path.basename(file) for file in _entry_files(cache_dir, key)
+    )
+    marker = _marker_name(cache_dir, key)
+    tmpname = f"{marker}.tmp{os.getpid()}"
+    with open(tmpname, "w", encoding="utf-8") as fil:
+        fil.write("\n".join(files))
+    os.replace(tmpname, marker)
+
+
+def evict_weights(cache_dir, max_size, keep=None):
+    """
+    Remove the least recently used weights, until the size of the cache is
+    smaller than max_size.
+
+    Parameters
+    ----------
+    cache_dir: str
+        Directory of the weight cache
+    max_size: float
+        Maximum size of the cache in bytes
+    keep: str, optional
+        Key of weights that should never be evicted
+    """
+    entries = {}
+    for file in glob.glob(os.path.join(cache_dir, f"{WEIGHTS_PREFIX}*.nc")):
+        key = os.path.basename(file)[len(WEIGHTS_PREFIX) :]
+        key = key.split("_")[0].split(".")[0]
+        stat = os.stat(file)
+        size, mtime = entries.get(key, (0, 0))
+        entries[key] = (size + stat.st_size, max(mtime, stat.st_mtime))
+
+    total = sum(size for size, _ in entries.values())
+    for key, (size, _) in sorted(entries.items(), key=lambda e: e[1][1]):
+        if total <= max_size:
+            break
+        if key == keep:
+            continue
+        _remove_entry(cache_dir, key)
+        total -= size
+        wrt.write_status("INFO", f"Evicted regridding weights: {key}")
+
+
+def store_weights(regrid):
+    """
+    Make sure that the weights of a freshly built regridder are written to
+    disk. Older versions of xESMF write them automatically, newer versions
+    need an explicit call to to_netcdf.
+
+    Parameters
+    ----------
+    regrid: cubedsphere.Regridder
+        Regridder whose weights should be stored
+    """
+    regridders = regrid.regridder
+    if not isinstance(regridders, list):
+        regridders = [regridders]
+
+    for regridder in regridders:
+        filename = getattr(regridder, "filename", None)
+        if filename is None or os.path.isfile(filename):
+            continue
+        if hasattr(regridder, "to_netcdf"):
+            regridder.to_netcdf(filename)
@@ -18,6 +18,10 @@ from .gcm_dataset_collection import GCMDatasetCollection
 from .core.units import ALLOWED_PUNITS, ALLOWED_TIMEUNITS
 from .utils.passport import is_the_data_basic
 from .utils.interface import PrtInterface
+from .utils.sidecar import (
+    horizontal_average_from_sidecar,
+    sidecar_is_current,
+)
 
 
 class GCMT:
@@ -29,6 +33,9 @@ class GCMT:
     models : dict
         Dictionary containing all of the 3D GCM models that are stored in the
         memory, with their respective tags.
+    sidecars : dict
+        Dictionary containing the sidecars with reduced products of the
+        models that have been loaded, with their respective tags.
 
     Methods
     -------
@@ -54,6 +61,8 @@ class GCMT:
 
         # Initialize empty dictionary to store all GCM models
         self._models = GCMDatasetCollection()
+        # Sidecars with reduced products of loaded models
+        self.sidecars = {}
 
         # check units
         if p_unit not in ALLOWED_PUNITS:
@@ -139,6 +148,18 @@ class GCMT:
         """
         self._replace_model(tag, dsi)
 
+    def __delitem__(self, tag):
+        """
+        Remove a dataset from the collection
+
+        Parameters
+        ----------
+        tag: str
+           Tag of the model that should be removed
+        """
+        del self._models[tag]
+        self.sidecars.pop(tag, None)
+
     def __len__(self) -> int:
         return len(self._models)
 
@@ -204,6 +225,29 @@ class GCMT:
         """
         return self._models.get_models(tag, always_dict)
 
+    def get_sidecar(self, tag=None):
+        """
+        Return the sidecar with reduced products of a model, if it has been
+        loaded together with the model (see save(sidecar=True)). The sidecar
+        is not returned anymore, once variables, coordinates or attributes of
+        the model are replaced (e.g., tools[tag]["T"] = ...).
+
+        Parameters
+        ----------
+        tag: str, optional
+            Name of the model. If no tag is provided, and multiple datasets
+            are available, an error is raised.
+
+        Returns
+        -------
+        sidecar: xarray Dataset or None
+            The sidecar of the model or None if it is not available
+        """
+        dsi = self.get_one_model(tag)
+        if not sidecar_is_current(dsi):
+            return None
+        return self.sidecars.get(dsi.attrs.get("tag"))
+
     def _replace_model(self, tag, dsi):
         """
         Add or replaces a dataset. Do some checks beforehand.
@@ -235,6 +279,8 @@ class GCMT:
 
         dsi.attrs.update({"tag": tag})
         self._models[tag] = dsi
+        # the sidecar of a replaced model is outdated
+        self.sidecars.pop(tag, None)
 
     # ==============================================================================================
     #   Data manipulation
@@ -255,14 +301,16 @@ class GCMT:
 
         Parameters
         ----------
-        var_key: str, xarray.DataArray
+        var_key: str, xarray.DataArray or list
             The key or array of the variable quantity that should be averaged.
             If str, it will try to look up the key in the dataset.
             If DataArray, it will use this one instead.
-        var_key_out: str, optional
+            If list, all listed keys are averaged at once.
+        var_key_out: str or list, optional
             variable name used to store the outcome.
             If not provided, this script will just
             return the averages and not change the dataset inplace.
+            If var_key is a list, this needs to be a list of the same length.
         part: dict or str, optional
             'global': global average
             'night': only nightside (defined around +-180,0)
@@ -275,6 +323,8 @@ class GCMT:
             The 'lon', 'lat' specify regions of lon and lat that should be used,
             whereas 'inv' (optional, default False) gives the option to invert
             the lon and lat regions (e.g., exclude instead of include for average)
+            If a list of parts is given, all regions are averaged in one pass
+            and the result gets a new dimension 'region'.
         area_key: str, optional
             Variable key in the dataset for the area of grid cells
         tag : str, optional
@@ -284,11 +334,21 @@ class GCMT:
 
         Returns
         -------
-        avg: xarray.DataArray
-            Averaged data
+        avg: xarray.DataArray or xarray.Dataset
+            Averaged data (a Dataset, if var_key is a list)
 
         """
         dsi = self.get_one_model(tag)
+
+        havg = horizontal_average_from_sidecar(
+            self.get_sidecar(tag), var_key, part, area_key
+        )
+        if havg is not None:
+            wrt.write_status("INFO", "Use horizontal average of the sidecar")
+            if var_key_out is not None:
+                dsi.update({var_key_out: havg})
+            return havg
+
         return mani.m_add_horizontal_average(
             dsi, var_key, var_key_out=var_key_out, part=part, area_key=area_key
         )
@@ -343,6 +403,7 @@ class GCMT:
         rcb : xarray.DataArray
             A dataArray with reduced dimensionality,
             containing the pressure of the rcb location.
+            NaN, if the profile does not deviate from the adiabat.
         """
         dsi = self.get_one_model(tag)
         return mani.m_add_rcb(
@@ -354,6 +415,39 @@ class GCMT:
             temp_key=temp_key,
         )
 
+    def add_rcb_map(self, tol=0.01, var_key_out=None, temp_key="T", tag=None):
+        """
+        Calculate the radiative convective boundary (rcb) of every column by
+        searching (from the bottom upwards) for the first occurance of a
+        deviation from an adiabatic temperature profile.
+
+        Parameters
+        ----------
+        tol: float
+            tolerance for the relative deviation from adiabat
+        var_key_out: str, optional
+            variable name used to store the outcome.
+            If not provided, this script will just
+            return the map and not change the dataset inplace.
+        temp_key: str, optional
+            The key to look up the temperature
+        tag : str, optional
+            The tag of the dataset that should be used.
+            If no tag is provided, and multiple datasets are available,
+            an error is raised.
+
+        Returns
+        -------
+        rcb : xarray.DataArray
+            A dataArray with the dimensions lon, lat (and time),
+            containing the pressure of the rcb location.
+            Columns without a deviation from the adiabat are set to NaN.
+        """
+        dsi = self.get_one_model(tag)
+        return mani.m_add_rcb_map(
+            dsi, tol=tol, var_key_out=var_key_out, temp_key=temp_key
+        )
+
     def add_theta(self, var_key_out=None, temp_key="T", tag=None):
         """
         Convert temperature to potential temperature with respect to model boundary.
@@ -465,7 +559,7 @@ class GCMT:
         )
 
     def add_meridional_overturning(
-        self, v_data="V", var_key_out=None, tag=None
+        self, v_data="V", var_key_out=None, time_batch=None, tag=None
     ):
         """
         Calculate meridional overturning streamfunction.
@@ -481,6 +575,9 @@ class GCMT:
             If not provided, this script will just
             return the overturning circulation
             and not change the dataset inplace.
+        time_batch: int, optional
+            Number of snapshots that are read and averaged at once.
+            By default, all snapshots are processed at once.
         tag : str, optional
             The tag of the dataset that should be used.
             If no tag is provided,
@@ -489,11 +586,14 @@ class GCMT:
         Returns
         -------
         psi: xarray.DataArray
-            Horizontal overturning
+            Zonal-mean overturning streamfunction
         """
         dsi = self.get_one_model(tag)
         return mani.m_add_meridional_overturning(
-            dsi, v_data=v_data, var_key_out=var_key_out
+            dsi,
+            v_data=v_data,
+            var_key_out=var_key_out,
+            time_batch=time_batch,
         )
 
     # ======================================================
@@ -506,6 +606,7 @@ class GCMT:
         iters="last",
         load_existing=False,
         tag=None,
+        statistics=None,
         **kwargs,
     ):
         """
@@ -527,6 +628,9 @@ class GCMT:
             Set to true if you want to increment already loaded data
         tag : str
             Tag to reference the simulation in the collection of models.
+        statistics : gcm_toolkit.utils.statistics.TimeStatistics, optional
+            Running time statistics that are updated with the newly read
+            iterations.
         kwargs: dict
             Additional options passed down to read functions
         """
@@ -537,11 +641,21 @@ class GCMT:
             iters=iters,
             load_existing=load_existing,
             tag=tag,
+            statistics=statistics,
             **kwargs,
         )
 
     def read_reduced(
-        self, data_path, tag=None, time_unit_in=None, p_unit_in=None
+        self,
+        data_path,
+        tag=None,
+        time_unit_in=None,
+        p_unit_in=None,
+        chunks=None,
+        parallel=True,
+        variables=None,
+        p_range=None,
+        time_range=None,
     ):
         """
         Read in function for GCM data that has been reduced a
@@ -549,8 +663,11 @@ class GCMT:
 
         Parameters
         ----------
-        data_path : str
-            Folder path to the reduced (gcm_toolkit) data.
+        data_path : str, list
+            Path to the reduced (gcm_toolkit) data. Can also be a glob
+            pattern or a list of paths, e.g. for data that is split into
+            segments along time. Multiple files are opened lazily and
+            combined by coordinates.
         time_unit_in: str, None
             units of time dimension in input dataset.
             If None, try to read from nc file (ds.attr.time_unit)
@@ -559,6 +676,21 @@ class GCMT:
             If None, try to read from nc file (ds.attr.p_unit)
         tag : str
             Tag to reference the simulation in the collection of models.
+        chunks: dict, optional
+            Chunks of the dask arrays, e.g. {"time": 10}. By default, a
+            single file is not chunked and multiple files are chunked per
+            file.
+        parallel: bool, optional
+            Open multiple files in parallel using dask.
+        variables: list, optional
+            Only keep these data variables (the basic variables T, U, V and
+            W are always kept, since they are required by gcm_toolkit).
+        p_range: tuple, optional
+            Only keep pressures between p_range[0] and p_range[1]
+            (in units of the GCMT object).
+        time_range: tuple, optional
+            Only keep times between time_range[0] and time_range[1]
+            (in units of the GCMT object).
         """
         return raw.m_read_reduced(
             self,
@@ -566,9 +698,98 @@ class GCMT:
             tag=tag,
             time_unit_in=time_unit_in,
             p_unit_in=p_unit_in,
+            chunks=chunks,
+            parallel=parallel,
+            variables=variables,
+            p_range=p_range,
+            time_range=time_range,
         )
 
-    def save(self, direct, method="nc", update_along_time=False, tag=None):
+    def convert_raw(
+        self,
+        gcm,
+        data_path,
+        direct,
+        iters="all",
+        batch_size=10,
+        method="nc",
+        tag=None,
+        load_existing=False,
+        update_along_time=False,
+        encoding=None,
+        sidecar=False,
+        statistics=False,
+        **kwargs,
+    ):
+        """
+        Convert raw GCM data to the gcm_toolkit format in batches of
+        iterations. Every batch is read, appended to the output file and
+        removed from memory again, so that the memory usage stays constant,
+        no matter how many iterations are converted. A model that is already
+        stored under the tag is kept.
+
+        Parameters
+        ----------
+        gcm : str
+            Type of GCM, must be 'MITgcm'.
+        data_path : str
+            Folder path to the standard output of the GCM.
+        direct : str
+            directory at which the gcm_toolkit datasets should be stored.
+        iters : list, str
+            The iteration (time step) of the input files to be read.
+            If 'last', only the last iteration will be read.
+            If 'all' (default), all iterations will be read.
+        batch_size: int, optional
+            Number of iterations that are held in memory at once.
+        method : str, optional
+            Datasets can be stored as '.zarr' or '.nc'.
+            Decide which type you prefer. Defaults to '.nc'.
+        tag : str
+            Tag to reference the simulation in the collection of models.
+        load_existing: bool
+            Set to false if you want to overwrite already converted data
+            Set to true if you want to only append new iterations
+        update_along_time: bool, optional
+            Append the converted iterations to an existing output file
+            instead of overwriting it (see save). Implied by load_existing.
+        encoding: str or dict, optional
+            Encoding profile of the output (see save).
+        sidecar: bool or dict, optional
+            Also write a sidecar with reduced products (see save).
+        statistics: bool or dict, optional
+            Also accumulate time statistics (mean, variance, minimum and
+            maximum) of the converted iterations and store them next to the
+            output as <tag>.stats.nc.
+        kwargs: dict
+            Additional options passed down to read functions
+        """
+        return raw.m_convert_raw(
+            self,
+            gcm,
+            data_path,
+            direct,
+            iters=iters,
+            batch_size=batch_size,
+            method=method,
+            tag=tag,
+            load_existing=load_existing,
+            update_along_time=update_along_time,
+            encoding=encoding,
+            sidecar=sidecar,
+            statistics=statistics,
+            **kwargs,
+        )
+
+    def save(
+        self,
+        direct,
+        method="nc",
+        update_along_time=False,
+        tag=None,
+        encoding=None,
+        sidecar=False,
+    ):
         """
         Save function to store current member variables.
 
@@ -581,10 +802,23 @@ class GCMT:
             Decide which type you prefer. Defaults to '.nc'.
         update_along_time: bool, optional
             Decide if you want to update already saved datasets
-            along the timedimension. This only works with method='zarr'.
+            along the timedimension. With method='nc', this only works for
+            files that have been written by gcm_toolkit. With method='zarr',
+            timesteps that are already stored are overwritten.
         tag: str, optional
             tag of the model that should be loaded.
             Will save all available models by default.
+        encoding: str or dict, optional
+            Encoding profile (compression, chunks and packing) of newly
+            written datasets. Either the name of one of the profiles in
+            gcm_toolkit.utils.encoding.ENCODING_PROFILES ('archive', 'fast',
+            'analysis') or a dictionary with the same keys.
+            By default, the data is stored uncompressed.
+        sidecar: bool or dict, optional
+            Also write a sidecar with reduced products (horizontal averages,
+            zonal means and isobaric slices) next to each dataset, which is
+            used for quick looks after loading. A dictionary is passed as
+            keyword arguments to gcm_toolkit.utils.sidecar.compute_sidecar.
 
         Returns
         -------
@@ -597,9 +831,21 @@ class GCMT:
             method=method,
             update_along_time=update_along_time,
             tag=tag,
+            encoding=encoding,
+            sidecar=sidecar,
         )
 
-    def load(self, direct, method="nc", tag=None):
+    def load(
+        self,
+        direct,
+        method="nc",
+        tag=None,
+        chunks=None,
+        n_workers=None,
+        variables=None,
+        p_range=None,
+        time_range=None,
+    ):
         """
         Load function to load stored member variables.
 
@@ -612,8 +858,38 @@ class GCMT:
         tag: str, optional
             tag of the model that should be loaded.
             Will load all available models by default.
-        """
-        return raw.m_load(self, direct, method=method, tag=tag)
+        chunks: dict, optional
+            Open the datasets as dask arrays with the given chunks,
+            e.g. {"time": 10}. By default, netCDF files are loaded
+            lazily without dask and zarr stores are opened as dask arrays
+            with the chunks of the store.
+        n_workers: int, optional
+            Number of threads that open zarr stores in parallel. netCDF files
+            are opened one after another, since netCDF4/HDF5 is not thread safe.
+        variables: list, optional
+            Only keep these data variables (the basic variables T, U, V and
+            W are always kept, since they are required by gcm_toolkit).
+        p_range: tuple, optional
+            Only keep pressures between p_range[0] and p_range[1]
+            (in units of the GCMT object).
+        time_range: tuple, optional
+            Only keep times between time_range[0] and time_range[1]
+            (in units of the GCMT object).
+
+        Sidecars with reduced products that were written with
+        save(sidecar=True) are loaded as well (see get_sidecar).
+        """
+        return raw.m_load(
+            self,
+            direct,
+            method=method,
+            tag=tag,
+            chunks=chunks,
+            n_workers=n_workers,
+            variables=variables,
+            p_range=p_range,
+            time_range=time_range,
+        )
 
     # =============================================================
     #   Plotting Functions
@@ -638,6 +914,7 @@ class GCMT:
         """
         # select the appropriate dataset
         dsi = self.get_one_model(tag)
+        kwargs.setdefault("sidecar", self.get_sidecar(tag))
         return gcmplt.isobaric_slice(dsi, var_key, pres, **kwargs)
 
     def time_evol(self, var_key, tag=None, **kwargs):
@@ -676,6 +953,7 @@ class GCMT:
         """
         # select the appropriate dataset
         dsi = self.get_one_model(tag)
+        kwargs.setdefault("sidecar", self.get_sidecar(tag))
         return gcmplt.zonal_mean(dsi, var_key, **kwargs)
 
     # ==============================================================================================
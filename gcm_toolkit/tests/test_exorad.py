@@ -45,3 +45,382 @@ def test_exorad(exorad_testdata):
     tools.read_raw(
         gcm=expected["gcm"], data_path=data_path, load_existing=True, tag="new"
     )
+
+
+def test_exorad_weights_cache(exorad_testdata, tmpdir):
+    """Test that regridding weights are reused from the cache"""
+    from gcm_toolkit.exorad.weights import WEIGHTS_PREFIX
+
+    dirname, expected = exorad_testdata
+    data_path = expected.get("rel_data_dir", "{}").format(dirname)
+    cache_dir = str(tmpdir.mkdir("weights"))
+
+    tools = GCMT(write="off")
+    tools.read_raw(
+        gcm=expected["gcm"],
+        data_path=data_path,
+        tag="first",
+        weights_cache_dir=cache_dir,
+    )
+    weight_files = sorted(os.listdir(cache_dir))
+    assert len(weight_files) > 0
+    assert all(f.startswith(WEIGHTS_PREFIX) for f in weight_files)
+
+    tools.read_raw(
+        gcm=expected["gcm"],
+        data_path=data_path,
+        tag="second",
+        weights_cache_dir=cache_dir,
+    )
+    assert sorted(os.listdir(cache_dir)) == weight_files
+    assert np.allclose(tools["first"].T, tools["second"].T)
+
+
+def test_weights_cache_eviction(tmpdir):
+    """Test the size bounded eviction of the weight cache"""
+    from gcm_toolkit.exorad.weights import (
+        WEIGHTS_PREFIX,
+        evict_weights,
+        finalize_weights,
+        lookup_weights,
+        weights_key,
+    )
+
+    cache_dir = str(tmpdir)
+    grid = xarray.Dataset({"lon": ("x", np.arange(10.0))})
+    key = weights_key(grid, 5, 4)
+    assert key == weights_key(grid, 5.0, 4.0)
+    assert key != weights_key(grid, 10, 4)
+    assert key != weights_key(grid.assign(lat=("x", np.zeros(10))), 5, 4)
+    assert key != weights_key(grid.expand_dims(face=6), 5, 4)
+
+    for i, k in enumerate(["a" * 40, "b" * 40, key]):
+        for tile in [1, 2]:
+            fname = os.path.join(
+                cache_dir, f"{WEIGHTS_PREFIX}{k}_tile{tile}.nc"
+            )
+            with open(fname, "wb") as fil:
+                fil.write(b"0" * 100)
+            os.utime(fname, (i, i))
+        finalize_weights(cache_dir, k)
+
+    filename, hit = lookup_weights(cache_dir, "c" * 40)
+    assert not hit
+    assert filename.endswith(WEIGHTS_PREFIX + "c" * 40)
+
+    # an incomplete entry is no hit and gets removed
+    partial = os.path.join(cache_dir, f"{WEIGHTS_PREFIX}{'d' * 40}_tile1.nc")
+    with open(partial, "wb") as fil:
+        fil.write(b"0" * 100)
+    assert not lookup_weights(cache_dir, "d" * 40)[1]
+    assert not os.path.exists(partial)
+
+    evict_weights(cache_dir, max_size=400, keep=key)
+    remaining = [f for f in os.listdir(cache_dir) if f.endswith(".nc")]
+    assert len(remaining) == 4
+    assert not any("a" * 40 in f for f in os.listdir(cache_dir))
+
+    evict_weights(cache_dir, max_size=0, keep=key)
+    assert len(os.listdir(cache_dir)) == 3
+    assert lookup_weights(cache_dir, key)[1]
+
+
+def test_exorad_parallel(exorad_testdata):
+    """Test that the parallel read in gives the same result as the serial one
+    """
+    dirname, expected = exorad_testdata
+    data_path = expected.get("rel_data_dir", "{}").format(dirname)
+
+    tools = GCMT(write="off")
+    tools.read_raw(
+        gcm=expected["gcm"], data_path=data_path, iters="all", tag="serial"
+    )
+    tools.read_raw(
+        gcm=expected["gcm"],
+        data_path=data_path,
+        iters="all",
+        tag="parallel",
+        n_workers=2,
+        iters_per_batch=1,
+    )
+
+    assert list(tools["parallel"].iter.values) == sorted(expected["iters"])
+    xarray.testing.assert_allclose(tools["serial"], tools["parallel"])
+
+
+def test_exorad_lazy(exorad_testdata):
+    """Test that the lazy read in gives the same result as the eager one"""
+    dirname, expected = exorad_testdata
+    data_path = expected.get("rel_data_dir", "{}").format(dirname)
+
+    tools = GCMT(write="off")
+    tools.read_raw(
+        gcm=expected["gcm"], data_path=data_path, iters="all", tag="eager"
+    )
+    tools.read_raw(
+        gcm=expected["gcm"],
+        data_path=data_path,
+        iters="all",
+        tag="lazy",
+        chunks={"time": 1},
+    )
+
+    assert tools["lazy"].T.chunks is not None
+    xarray.testing.assert_allclose(tools["eager"], tools["lazy"].compute())
+
+
+def test_read_lazy_mitgcm(monkeypatch):
+    """Test that the lazy read in only reads what is needed"""
+    from gcm_toolkit.exorad import read_in
+
+    reads = []
+
+    def fake_read(data_path, iters, prefix, read_kwargs):
+        reads.append((tuple(iters), tuple(prefix)))
+        iters = np.array(iters)
+        data = np.ones((len(iters), 3)) * iters[:, None]
+        return xarray.Dataset(
+            {pre: (("time", "Z"), data) for pre in prefix},
+            coords={
+                "time": iters * 2.0,
+                "iter": ("time", iters),
+                "Z": [1e5, 1e4, 1e3],
+            },
+            attrs={"dt": 2},
+        )
+
+    monkeypatch.setattr(read_in, "_read_batch_mitgcm", fake_read)
+    dsi = read_in._read_lazy_mitgcm(
+        "", [10, 20, 30], ["T", "U", "V", "W"], {}, {"time": 2, "Z": 1}
+    )
+
+    assert reads == [((10,), ("T", "W")), ((10,), ("U", "V"))]
+    assert list(dsi.time.values) == [20.0, 40.0, 60.0]
+    assert dsi.T.chunks == ((2, 1), (1, 1, 1))
+
+    reads.clear()
+    assert float(dsi.U.isel(time=2, Z=0)) == 30.0
+    assert reads == [((30,), ("U", "V"))]
+
+
+@pytest.mark.parametrize("method", ["nc", "zarr"])
+def test_exorad_convert_raw(exorad_testdata, tmpdir, method):
+    """Test the conversion in batches"""
+    dirname, expected = exorad_testdata
+    data_path = expected.get("rel_data_dir", "{}").format(dirname)
+    save_path = str(tmpdir)
+
+    tools = GCMT(write="off")
+    tools.convert_raw(
+        gcm=expected["gcm"],
+        data_path=data_path,
+        direct=save_path,
+        batch_size=1,
+        method=method,
+        tag="converted",
+        statistics=True,
+    )
+    assert len(tools) == 0
+    assert os.path.exists(os.path.join(save_path, f"converted.{method}"))
+
+    # nothing new to convert
+    tools.convert_raw(
+        gcm=expected["gcm"],
+        data_path=data_path,
+        direct=save_path,
+        batch_size=1,
+        method=method,
+        tag="converted",
+        load_existing=True,
+    )
+
+    tools.load(save_path, method=method, tag="converted")
+    assert sorted(tools["converted"].iter.values) == sorted(expected["iters"])
+
+    # the statistics are accumulated over all batches
+    from gcm_toolkit.utils.statistics import read_statistics
+
+    stats = read_statistics(save_path, "converted")
+    assert stats.count == len(expected["iters"])
+    xarray.testing.assert_allclose(
+        stats.mean["T"], tools["converted"].T.mean("time")
+    )
+
+    # a model that is already stored under the tag is kept
+    loaded = tools["converted"]
+    tools.convert_raw(
+        gcm=expected["gcm"],
+        data_path=data_path,
+        direct=str(tmpdir.mkdir("again")),
+        batch_size=1,
+        method=method,
+        tag="converted",
+    )
+    assert tools["converted"] is loaded
+
+
+def test_find_iters_mitgcm(tmpdir):
+    """Test the iteration index of MITgcm output directories"""
+    from gcm_toolkit.exorad.read_in import (
+        ITER_MANIFEST,
+        find_iters_mitgcm,
+        find_new_iters_mitgcm,
+    )
+
+    def touch(*names):
+        for name in names:
+            tmpdir.join(name).write("")
+        # pretend that the directory was last modified a while ago
+        os.utime(str(tmpdir), (1e9, 1e9))
+
+    touch(
+        "T.0000000010.data",
+        "T.0000000010.meta",
+        "U.0000000010.data",
+        "T.0000000020.data",
+        "U.0000000020.data",
+        "T.0000000030.data",
+        "data",
+        "STDOUT.0000",
+    )
+
+    data_path = str(tmpdir)
+    assert find_iters_mitgcm(data_path, ["T", "U"]) == {10, 20}
+    assert find_iters_mitgcm(data_path, ["T"]) == {10, 20, 30}
+    assert find_iters_mitgcm(data_path, ["W"]) == set()
+    assert os.path.isfile(os.path.join(data_path, ITER_MANIFEST))
+    assert find_new_iters_mitgcm(data_path, ["T", "U"]) == {10, 20}
+
+    touch("U.0000000030.data", "T.0000000040.data", "U.0000000040.data")
+
+    assert find_iters_mitgcm(data_path, ["T", "U"]) == {10, 20, 30, 40}
+    assert find_new_iters_mitgcm(data_path, ["T", "U"]) == {30, 40}
+    assert find_new_iters_mitgcm(data_path, ["T"]) == {40}
+
+
+def test_get_parameter(tmpdir):
+    """Test the cached parsing of the MITgcm data file"""
+    from gcm_toolkit.exorad.utils import get_parameter, read_datafile
+
+    datafile = tmpdir.join("data")
+    datafile.write(
+        " &PARM01\n"
+        " gravity=9.42,\n"
+        " rSphere=9.0E7,\n"
+        " &\n"
+        " &PARM03\n"
+        " deltaT=25.,\n"
+        " &\n"
+    )
+    os.utime(str(datafile), (1e9, 1e9))
+
+    params = read_datafile(str(datafile))
+    assert read_datafile(str(datafile)) is params
+    assert get_parameter(str(datafile), "GRAVITY") == 9.42
+    assert get_parameter(params, "rsphere") == 9.0e7
+    assert get_parameter(params, "atm_Cp", 1004.0) == 1004.0
+    with pytest.raises(KeyError):
+        get_parameter(params, "atm_Cp")
+
+    # the data file is parsed again, if it changes
+    datafile.write(" &PARM01\n gravity=10.,\n &\n")
+    assert get_parameter(str(datafile), "gravity") == 10.0
+    assert read_datafile(str(datafile)) is not params
+
+
+def test_append_along_time():
+    """Test that new iterations are appended to loaded data"""
+    from gcm_toolkit.exorad.read_in import _append_along_time
+
+    def dataset(times):
+        return xarray.Dataset(
+            {"T": (("time", "lat"), np.outer(times, [1.0, 2.0]))},
+            coords={"time": times, "lat": [-45.0, 45.0]},
+            attrs={"tag": "test"},
+        )
+
+    combined = _append_along_time(dataset([1.0, 2.0]), dataset([3.0, 4.0]))
+    xarray.testing.assert_identical(combined, dataset([1.0, 2.0, 3.0, 4.0]))
+
+    combined = _append_along_time(dataset([1.0, 3.0]), dataset([2.0]))
+    xarray.testing.assert_identical(combined, dataset([1.0, 2.0, 3.0]))
+
+    # fall back to merging, if the datasets differ
+    other = dataset([3.0]).rename({"T": "U"})
+    combined = _append_along_time(dataset([1.0, 2.0]), other)
+    assert set(combined.data_vars) == {"T", "U"}
+    assert list(combined.time.values) == [1.0, 2.0, 3.0]
+
+
+def _write_mds(basename, data, fields=None):
+    """Helper function to write a MITgcm .data/.meta file"""
+    data = np.asarray(data, dtype=">f8")
+    shape = data.shape[1:] if fields else data.shape
+    dim_list = ",\n".join(f"{n:5d}, 1, {n:5d}" for n in reversed(shape))
+    meta = (
+        f" nDims = [ {len(shape)} ];\n"
+        f" dimList = [\n{dim_list}\n ];\n"
+        " dataprec = [ 'float64' ];\n"
+        f" nrecords = [ {len(fields) if fields else 1} ];\n"
+    )
+    if fields:
+        meta += " fldList = {\n" + " ".join(f"'{f:8s}'" for f in fields)
+        meta += "\n };\n"
+    with open(basename + ".meta", "w", encoding="utf-8") as fil:
+        fil.write(meta)
+    data.tofile(basename + ".data")
+
+
+def test_read_mds(tmpdir):
+    """Test the native reader for lon/lat MITgcm output"""
+    from gcm_toolkit.exorad.mds import memmap_mds, read_meta
+
+    data_path = str(tmpdir)
+    n_z, n_lat, n_lon = 4, 3, 8
+    lon = np.linspace(0, 360, n_lon, endpoint=False) + 22.5
+    lat = np.array([-60.0, 0.0, 60.0])
+    p_f = np.linspace(1e5, 0, n_z + 1)
+
+    _write_mds(f"{data_path}/XC", np.broadcast_to(lon, (n_lat, n_lon)))
+    _write_mds(f"{data_path}/YC", np.broadcast_to(lat[:, None], (3, n_lon)))
+    _write_mds(f"{data_path}/RF", p_f[:, None, None])
+    _write_mds(f"{data_path}/RC", 0.5 * (p_f[1:] + p_f[:-1])[:, None, None])
+    for i in [10, 20]:
+        for pre in ["T", "U", "V", "W"]:
+            _write_mds(
+                f"{data_path}/{pre}.{i:010d}",
+                np.full((n_z, n_lat, n_lon), float(i)),
+            )
+    _write_mds(
+        f"{data_path}/diag.{10:010d}",
+        np.ones((2, n_lat, n_lon)),
+        fields=["EXOSIT", "ETAN"],
+    )
+    with open(f"{data_path}/data", "w", encoding="utf-8") as fil:
+        fil.write(" &PARM01\n gravity=10.,\n &\n &PARM03\n deltaT=25.,\n &\n")
+
+    meta = read_meta(f"{data_path}/T.{10:010d}.meta")
+    assert meta["shape"] == (n_z, n_lat, n_lon)
+    assert meta["dtype"] == np.dtype(">f8")
+    records = memmap_mds(f"{data_path}/diag.{10:010d}")
+    assert list(records) == ["EXOSIT", "ETAN"]
+    assert isinstance(records["ETAN"], np.memmap)
+
+    tools = GCMT(write="off")
+    tools.read_raw(
+        gcm="MITgcm",
+        data_path=data_path,
+        iters="all",
+        reader="mds",
+        tag="mds",
+    )
+    dsi = tools["mds"]
+
+    assert list(dsi.iter.values) == [10, 20]
+    assert dsi.T.dims == ("time", "Z", "lat", "lon")
+    assert dsi.U.dims == ("time", "Z", "lat", "lon")
+    assert dsi.W.dims == ("time", "Z", "lat", "lon")
+    assert np.allclose(dsi.lon, lon)
+    assert np.allclose(dsi.U.isel(time=1), 20.0)
+    # V is zero at the north pole
+    assert np.allclose(dsi.V.isel(time=0, lat=-1), 5.0)
@@ -219,6 +219,8 @@ def test_set_model(all_nc_testdata):
 
 def test_load_save(all_nc_testdata):
     """Test load and save"""
+    from gcm_toolkit.utils.read_and_write import MANIFEST
+
     dirname, expected = all_nc_testdata
     tag = "raw_readin"
     tools = GCMT(write="off")
@@ -258,6 +260,7 @@ def test_load_save(all_nc_testdata):
     tools = GCMT(write="off")
     tools.load(".", method="zarr")
     shutil.rmtree(f"{tag}.zarr")
+    os.remove(MANIFEST)
 
     assert isinstance(tools[tag], xarray.Dataset)
     assert tools[tag] == ds
@@ -266,6 +269,351 @@ def test_load_save(all_nc_testdata):
         tools.load(".", method="wrong")
 
 
+def test_save_nc_update_along_time(all_nc_testdata, tmpdir):
+    """Test appending new timesteps to an existing netCDF file"""
+    dirname, expected = all_nc_testdata
+    tag = "append"
+    path = str(tmpdir)
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname, tag=tag)
+    ds = tools[tag]
+
+    tools[tag] = ds.isel(time=[0])
+    tools.save(path, method="nc", tag=tag)
+    tools[tag] = ds
+    tools.save(path, method="nc", tag=tag, update_along_time=True)
+    tools.save(path, method="nc", tag=tag, update_along_time=True)
+
+    del tools[tag]
+    assert tag not in tools.get_models(always_dict=True)
+
+    tools.load(path, method="nc", tag=tag)
+    assert tools[tag].sizes["time"] == ds.sizes["time"]
+    xarray.testing.assert_allclose(tools[tag], ds)
+
+
+def test_read_reduced_multiple_files(all_nc_testdata, tmpdir):
+    """Test reading reduced data that is split into segments along time"""
+    dirname, expected = all_nc_testdata
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname, tag="single")
+    ds = tools["single"]
+
+    files = []
+    for i in range(ds.sizes["time"]):
+        files.append(os.path.join(str(tmpdir), f"segment_{i:03d}.nc"))
+        ds.isel(time=[i]).to_netcdf(files[-1])
+
+    tools.read_reduced(
+        data_path=os.path.join(str(tmpdir), "segment_*.nc"), tag="glob"
+    )
+    tools.read_reduced(data_path=files[::-1], tag="list", parallel=False)
+
+    for tag in ["glob", "list"]:
+        assert tools[tag].T.chunks is not None
+        xarray.testing.assert_allclose(tools[tag].compute(), ds)
+
+    with pytest.raises(FileNotFoundError):
+        tools.read_reduced(data_path=os.path.join(str(tmpdir), "*.zarr"))
+
+
+def test_load_manifest(all_nc_testdata, tmpdir):
+    """Test the parallel load of multiple tags using the manifest"""
+    from gcm_toolkit.utils.read_and_write import MANIFEST
+
+    dirname, expected = all_nc_testdata
+    path = str(tmpdir)
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname, tag="a")
+    tools["b"] = tools["a"].copy()
+    tools["b"].attrs["tag"] = "b"
+    tools.save(path, method="nc")
+    assert os.path.isfile(os.path.join(path, MANIFEST))
+
+    # pretend that the data was saved a while ago, such that the
+    # manifest is trusted after the next load
+    os.utime(path, (1e9, 1e9))
+    loaded = GCMT(write="off")
+    loaded.load(path, method="nc", chunks={"time": 1}, n_workers=2)
+    assert sorted(loaded.get_models(always_dict=True)) == ["a", "b"]
+    assert loaded["a"].T.chunks is not None
+    xarray.testing.assert_allclose(loaded["b"].compute(), tools["b"])
+
+    # loading never creates a manifest
+    os.remove(os.path.join(path, MANIFEST))
+    loaded = GCMT(write="off")
+    loaded.load(path, method="nc")
+    assert sorted(loaded.get_models(always_dict=True)) == ["a", "b"]
+    assert not os.path.exists(os.path.join(path, MANIFEST))
+
+    # datasets that are added by other means are found nevertheless
+    shutil.copy(os.path.join(path, "a.nc"), os.path.join(path, "c.nc"))
+    loaded = GCMT(write="off")
+    loaded.load(path, method="nc")
+    assert sorted(loaded.get_models(always_dict=True)) == ["a", "b", "c"]
+
+    loaded = GCMT(write="off")
+    loaded.load(path, method="nc", tag="[ab]")
+    assert sorted(loaded.get_models(always_dict=True)) == ["a", "b"]
+
+
+@pytest.mark.parametrize("method", ["nc", "zarr"])
+@pytest.mark.parametrize(
+    "encoding", ["archive", "fast", "analysis", {"pack_bits": 16}]
+)
+def test_save_encoding(all_nc_testdata, tmpdir, method, encoding):
+    """Test saving with encoding profiles"""
+    dirname, expected = all_nc_testdata
+    path = str(tmpdir)
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname, tag="enc")
+    ds = tools["enc"].load()
+    tools.save(path, method=method, tag="enc", encoding=encoding)
+
+    loaded = GCMT(write="off")
+    loaded.load(path, method=method, tag="enc")
+    if encoding == "analysis":
+        assert loaded["enc"].T.encoding["dtype"] == np.float32
+        xarray.testing.assert_allclose(loaded["enc"], ds, rtol=1e-6)
+    elif isinstance(encoding, dict):
+        assert loaded["enc"].T.encoding["dtype"] == np.int16
+        temp_range = float(ds.T.max() - ds.T.min())
+        assert np.allclose(loaded["enc"].T, ds.T, atol=temp_range / 2**15)
+    else:
+        xarray.testing.assert_identical(loaded["enc"], ds)
+
+    # the data is stored in the chunks of the profile
+    from gcm_toolkit.utils.encoding import ENCODING_PROFILES
+
+    if isinstance(encoding, str):
+        profile = ENCODING_PROFILES[encoding]
+    else:
+        profile = encoding
+    chunks_on_disk = loaded["enc"].T.encoding[
+        "chunksizes" if method == "nc" else "chunks"
+    ]
+    assert tuple(chunks_on_disk) == tuple(
+        min(profile.get("chunks", {}).get(dim, size), size)
+        for dim, size in ds.T.sizes.items()
+    )
+
+    with pytest.raises(ValueError):
+        tools.save(path, method=method, tag="enc", encoding="unknown")
+    assert os.path.exists(os.path.join(path, f"enc.{method}"))
+
+
+@pytest.mark.parametrize("method", ["nc", "zarr"])
+def test_save_without_dask(all_nc_testdata, tmpdir, method, monkeypatch):
+    """Test that datasets are written eagerly if dask is not installed"""
+    from gcm_toolkit.utils import read_and_write
+
+    monkeypatch.setattr(read_and_write, "_has_dask", lambda: False)
+    dirname, expected = all_nc_testdata
+    path = str(tmpdir)
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname, tag="eager")
+    ds = tools["eager"].load()
+    tools.save(path, method=method, tag="eager", encoding="fast")
+    assert not any(f.startswith(".") for f in os.listdir(path))
+
+    loaded = GCMT(write="off")
+    loaded.load(path, method=method, tag="eager")
+    xarray.testing.assert_allclose(loaded["eager"], ds)
+
+
+@pytest.mark.parametrize("method", ["nc", "zarr"])
+def test_save_packed_update_along_time(all_nc_testdata, tmpdir, method):
+    """Test that appending refuses data outside of the packed range"""
+    dirname, expected = all_nc_testdata
+    path = str(tmpdir)
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname, tag="packed")
+    ds = tools["packed"].load()
+    tools["packed"] = ds.isel(time=[0])
+    tools.save(path, method=method, tag="packed", encoding={"pack_bits": 8})
+
+    # data outside of the range of the first write would be clipped
+    hot = ds.isel(time=[1])
+    tools["packed"] = hot.assign(T=hot.T + 1000)
+    with pytest.raises(ValueError):
+        tools.save(path, method=method, tag="packed", update_along_time=True)
+
+    # data within the range can be appended
+    first = ds.isel(time=[0])
+    tools["packed"] = hot.assign(
+        {
+            name: (var.dims, first[name].values)
+            for name, var in hot.data_vars.items()
+            if "time" in var.dims
+        }
+    )
+    tools.save(path, method=method, tag="packed", update_along_time=True)
+
+    loaded = GCMT(write="off")
+    loaded.load(path, method=method, tag="packed")
+    assert len(loaded["packed"].time) == 2
+
+
+def test_save_zarr_update_along_time(all_nc_testdata, tmpdir):
+    """Test appending and overwriting timesteps of a zarr store"""
+    from gcm_toolkit.utils.read_and_write import ZARR_TIME_MANIFEST
+
+    dirname, expected = all_nc_testdata
+    tag = "append"
+    path = str(tmpdir)
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname, tag=tag)
+    ds = tools[tag].load()
+    n_time = ds.sizes["time"]
+
+    # write the last timestep first and the others out of order
+    tools[tag] = ds.isel(time=[n_time - 1])
+    tools.save(path, method="zarr", tag=tag)
+    assert os.path.isfile(
+        os.path.join(path, f"{tag}.zarr", ZARR_TIME_MANIFEST)
+    )
+    for i in range(n_time - 1):
+        tools[tag] = ds.isel(time=[i])
+        tools.save(path, method="zarr", tag=tag, update_along_time=True)
+
+    # overlapping timesteps are overwritten
+    tools[tag] = ds.isel(time=[0, n_time - 1]) + 1.0
+    tools[tag].attrs = ds.attrs
+    tools.save(path, method="zarr", tag=tag, update_along_time=True)
+
+    # the store itself is kept sorted along time
+    with xarray.open_zarr(os.path.join(path, f"{tag}.zarr")) as stored:
+        assert stored.indexes["time"].is_monotonic_increasing
+        np.testing.assert_allclose(stored.time, ds.time)
+
+    loaded = GCMT(write="off")
+    loaded.load(path, method="zarr", tag=tag)
+    assert loaded[tag].sizes["time"] == n_time
+    assert loaded[tag].indexes["time"].is_monotonic_increasing
+    expected_ds = ds.copy(deep=True)
+    expected_ds["T"][{"time": [0, n_time - 1]}] += 1.0
+    xarray.testing.assert_allclose(loaded[tag].T, expected_ds.T)
+
+
+@pytest.mark.parametrize("method", ["nc", "zarr"])
+def test_save_multiple_tags(all_nc_testdata, tmpdir, method):
+    """Test saving multiple tags at once"""
+    from gcm_toolkit.utils.read_and_write import MANIFEST
+
+    dirname, expected = all_nc_testdata
+    path = str(tmpdir)
+
+    tools = GCMT(write="off")
+    tags = ["a", "b", "c"]
+    for i, tag in enumerate(tags):
+        tools.read_reduced(data_path=dirname, tag=tag)
+        tools[tag] = tools[tag] + i
+        tools[tag].attrs = dict(tools["a"].attrs, tag=tag)
+
+    tools.save(path, method=method)
+    # saving again replaces the existing files
+    tools.save(path, method=method)
+
+    assert sorted(os.listdir(path)) == sorted(
+        [f"{tag}.{method}" for tag in tags] + [MANIFEST]
+    )
+
+    loaded = GCMT(write="off")
+    loaded.load(path, method=method)
+    for tag in tags:
+        xarray.testing.assert_allclose(loaded[tag], tools[tag])
+
+
+def test_partial_load(all_nc_testdata, tmpdir):
+    """Test loading only a part of the data"""
+    dirname, expected = all_nc_testdata
+    path = str(tmpdir)
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname, tag="full")
+    ds = tools["full"]
+    ds["extra"] = 2 * ds.T
+    tools.save(path, method="zarr")
+
+    p_range = (float(ds.Z[5]), float(ds.Z[2]))
+    time_range = (float(ds.time[-1]), float(ds.time[-1]))
+    expected_ds = ds.isel(Z=slice(2, 6), time=[-1])
+
+    loaded = GCMT(write="off")
+    loaded.load(path, method="zarr", variables=["T"], p_range=p_range)
+    assert "extra" not in loaded["full"]
+    assert {"T", "U", "V", "W"} <= set(loaded["full"].data_vars)
+    assert loaded["full"].sizes["Z"] == 4
+
+    loaded.read_reduced(
+        dirname,
+        tag="reduced",
+        p_range=p_range,
+        time_range=time_range,
+    )
+    assert loaded["reduced"].sizes["time"] == 1
+    xarray.testing.assert_allclose(
+        loaded["reduced"].T, expected_ds.T.transpose(*loaded["reduced"].T.dims)
+    )
+
+
+@pytest.mark.parametrize("method", ["nc", "zarr"])
+def test_save_sidecar(all_nc_testdata, tmpdir, method):
+    """Test writing and loading sidecars with reduced products"""
+    from gcm_toolkit.utils.manipulations import m_add_horizontal_average
+    from gcm_toolkit.utils.sidecar import ISO_DIM
+
+    dirname, expected = all_nc_testdata
+    path = str(tmpdir)
+
+    tools = GCMT(write="off", p_unit="Pa")
+    tools.read_reduced(data_path=dirname, tag="full")
+    tools.save(path, method=method, sidecar=True)
+    assert os.path.exists(os.path.join(path, f"full.sidecar.{method}"))
+
+    loaded = GCMT(write="off")
+    loaded.load(path, method=method)
+    assert [tag for tag, _ in loaded] == ["full"]
+
+    ds = loaded["full"]
+    sidecar = loaded.get_sidecar()
+    xarray.testing.assert_allclose(
+        sidecar.T_zmean, ds.T.mean(dim="lon").transpose(*sidecar.T_zmean.dims)
+    )
+    for part in ["global", "night"]:
+        avg = loaded.add_horizontal_average("T", part=part)
+        xarray.testing.assert_allclose(
+            avg,
+            m_add_horizontal_average(ds, "T", part=part).transpose(*avg.dims),
+        )
+    pres = float(sidecar[ISO_DIM][0])
+    np.testing.assert_allclose(
+        sidecar.T_iso.sel(**{ISO_DIM: pres}).values,
+        ds.T.sel(Z=pres).transpose(*sidecar.T_iso.dims[:-3], "lat", "lon"),
+    )
+    loaded.zonal_mean("T")
+    loaded.isobaric_slice("T", pres)
+
+    # changing the data of the model invalidates the sidecar
+    loaded["full"].attrs["p_ref"] = 2 * loaded["full"].attrs["p_ref"]
+    assert loaded.get_sidecar() is None
+    loaded["full"].attrs["p_ref"] = loaded["full"].attrs["p_ref"] / 2
+    assert loaded.get_sidecar() is not None
+    loaded["full"]["T"] = 2 * loaded["full"].T
+    assert loaded.get_sidecar() is None
+
+    # replacing the model invalidates the sidecar
+    loaded["full"] = ds.isel(time=[0])
+    assert loaded.get_sidecar() is None
+
+
 def test_read_raw(all_raw_testdata):
     """Test load and save"""
     dirname, expected = all_raw_testdata
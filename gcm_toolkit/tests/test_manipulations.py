@@ -132,6 +132,38 @@ def test_rcb(all_nc_testdata):
     assert set(dsi.rcb.dims) == {"time"}
 
 
+def test_rcb_map(all_nc_testdata):
+    """Create a minimal gcm_toolkit object and do simple tests on the rcb map.
+    """
+    dirname, expected = all_nc_testdata
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname)
+
+    dsi = tools.get_models()
+
+    rcb = tools.add_rcb_map(tol=0.01, var_key_out="rcb_map", temp_key="T")
+
+    assert hasattr(dsi, "rcb_map")
+    assert rcb.equals(dsi.rcb_map)
+    assert set(dsi.rcb_map.dims) == {"time", "lat", "lon"}
+
+    # compare with a column by column search from the bottom upwards
+    theta = tools.add_theta(temp_key="T").transpose("time", "lat", "lon", "Z")
+    rel = abs(theta / theta.isel(Z=0) - 1).values
+    rcb = rcb.transpose("time", "lat", "lon").values
+    for index in np.ndindex(rcb.shape):
+        deviates = np.nonzero(rel[index] >= 0.01)[0]
+        if len(deviates) == 0:
+            assert np.isnan(rcb[index])
+        else:
+            assert rcb[index] == dsi.Z.values[deviates[0]]
+
+    # columns that never deviate are not found
+    rcb_none = tools.add_rcb_map(tol=np.inf)
+    assert rcb_none.isnull().all()
+
+
 def test_theta(all_nc_testdata):
     """Create a minimal gcm_toolkit object and do simple tests on the calculation of theta.
     """
@@ -151,6 +183,7 @@ def test_theta(all_nc_testdata):
 
 def test_horizontal_overturning(all_nc_testdata):
     """Create a minimal gcm_toolkit object and do simple tests on it."""
+    from gcm_toolkit.utils.manipulations import m_add_meridional_overturning
 
     dirname, expected = all_nc_testdata
 
@@ -163,4 +196,188 @@ def test_horizontal_overturning(all_nc_testdata):
 
     assert hasattr(dsi, "psi")
     assert (psi == dsi.psi).all()
-    assert set(dsi.psi.dims) == {"Z", "time", "lat", "lon"}
+    assert set(dsi.psi.dims) == {"Z", "time", "lat"}
+
+    # reading the snapshots in batches does not change the result
+    psi_batch = tools.add_meridional_overturning(v_data, time_batch=1)
+    np.testing.assert_allclose(psi_batch, psi)
+
+    # the streamfunction is in SI units, independent of the pressure unit
+    psi_si = m_add_meridional_overturning(dsi.gcmt.si, v_data)
+    np.testing.assert_allclose(psi_si, psi)
+
+
+def test_hydrostatic_state(all_nc_testdata):
+    """Test that the hydrostatic state is shared and updated if needed."""
+    from gcm_toolkit.utils.hydrostatic import get_hydrostatic_state
+
+    dirname, expected = all_nc_testdata
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname)
+
+    dsi = tools.get_models()
+
+    state = get_hydrostatic_state(dsi)
+    assert get_hydrostatic_state(dsi) is state
+    np.testing.assert_allclose(state.pressure, dsi.Z * 1e5)
+    np.testing.assert_allclose(state.rho * state.dzdp, -1 / dsi.g)
+    assert (state.z_geo.isel(Z=-1) > state.z_geo.isel(Z=0)).all()
+
+    # adding diagnostics does not invalidate the state
+    tools.add_total_energy(var_key_out="E_g")
+    tools.add_total_momentum(var_key_out="m_g")
+    assert get_hydrostatic_state(dsi) is state
+
+    # replacing the temperature does
+    dsi["T"] = 2 * dsi.T
+    new_state = get_hydrostatic_state(dsi)
+    assert new_state is not state
+    np.testing.assert_allclose(new_state.rho, state.rho / 2)
+
+
+def test_horizontal_average_multiple(all_nc_testdata):
+    """Test averaging multiple variables with cached region weights."""
+    from gcm_toolkit.utils.manipulations import get_region_weights
+
+    dirname, expected = all_nc_testdata
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname)
+    dsi = tools.get_models()
+
+    area_key = expected.get("area_key", "area_c")
+    weights = get_region_weights(dsi, part="day", area_key=area_key)
+    assert get_region_weights(dsi, part="day", area_key=area_key) is weights
+    assert np.isclose(weights.sum(), 1)
+
+    avg = tools.add_horizontal_average(
+        ["T", "U"],
+        var_key_out=["T_d", "U_d"],
+        part="day",
+        area_key=area_key,
+    )
+    assert set(avg.data_vars) == {"T", "U"}
+    for key in ["T", "U"]:
+        single = tools.add_horizontal_average(
+            key, part="day", area_key=area_key
+        )
+        assert np.isclose(avg[key], single).all()
+        assert np.isclose(dsi[key + "_d"], single).all()
+
+    with pytest.raises(ValueError):
+        tools.add_horizontal_average(["T", "U"], var_key_out="T_d")
+
+    # a new area invalidates the cached weights
+    dsi[area_key] = 2 * dsi[area_key]
+    assert get_region_weights(dsi, part="day", area_key=area_key) is not weights
+
+
+def test_horizontal_average_regions(all_nc_testdata):
+    """Test averaging multiple regions in one pass."""
+    dirname, expected = all_nc_testdata
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname)
+
+    area_key = expected.get("area_key", "area_c")
+    parts = ["global", "day", {"lon": [-100, -80], "name": "morning_man"}]
+    avg = tools.add_horizontal_average("T", part=parts, area_key=area_key)
+
+    assert list(avg.region.values) == ["global", "day", "morning_man"]
+    for name, part in zip(avg.region.values, ["global", "day", "morning"]):
+        single = tools.add_horizontal_average(
+            "T", part=part, area_key=area_key
+        )
+        assert np.isclose(avg.sel(region=name), single).all()
+
+    avg_multiple = tools.add_horizontal_average(
+        ["T", "U"], part=parts, area_key=area_key
+    )
+    assert set(avg_multiple.U.dims) == {"region", "Z", "time"}
+
+    with pytest.raises(ValueError):
+        tools.add_horizontal_average("T", part=["day", "day"])
+
+
+def test_horizontal_average_nan(all_nc_testdata):
+    """Test that missing values are skipped in horizontal averages."""
+    from gcm_toolkit.utils.manipulations import m_add_horizontal_average
+
+    dirname, expected = all_nc_testdata
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname)
+    dsi = tools.get_models()
+
+    area_key = expected.get("area_key", "area_c")
+    area = dsi[area_key]
+
+    # data masked at high latitudes
+    masked = dsi.T.where(dsi.lat < 80)
+    avg = m_add_horizontal_average(
+        dsi, masked, part=["global", "day"], area_key=area_key
+    )
+    expected_avg = (masked * area).sum(dim=["lon", "lat"]) / area.sum()
+    assert not avg.isnull().any()
+    np.testing.assert_allclose(avg.sel(region="global"), expected_avg)
+
+    # a single missing area cell
+    dsi_nan = dsi.copy()
+    first_cell = (dsi.lat == dsi.lat[0]) & (dsi.lon == dsi.lon[0])
+    dsi_nan[area_key] = area.where(~first_cell)
+    avg_nan = m_add_horizontal_average(dsi_nan, "T", area_key=area_key)
+    area_nan = dsi_nan[area_key]
+    assert not avg_nan.isnull().any()
+    np.testing.assert_allclose(
+        avg_nan, (dsi.T * area_nan).sum(dim=["lon", "lat"]) / area_nan.sum()
+    )
+
+
+def test_horizontal_average_no_broadcast(all_nc_testdata):
+    """Test that the regions are not broadcast against the full field."""
+    from gcm_toolkit.utils.manipulations import m_add_horizontal_average
+
+    dirname, expected = all_nc_testdata
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname, tag="lazy", chunks={"time": 1})
+    dsi = tools["lazy"]
+
+    area_key = expected.get("area_key", "area_c")
+    avg = m_add_horizontal_average(
+        dsi, "T", part=["global", "day", "night"], area_key=area_key
+    )
+    assert avg.sizes["region"] == 3
+
+    # no intermediate array of the graph is larger than the field itself
+    for layer in avg.data.__dask_graph__().layers.values():
+        shape = (layer.collection_annotations or {}).get("shape", ())
+        assert np.prod(shape) <= dsi.T.size
+
+
+def test_manipulations_dask(all_nc_testdata):
+    """Test that the manipulations stay lazy for chunked datasets."""
+    import dask.array
+
+    dirname, expected = all_nc_testdata
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname, tag="eager")
+    tools.read_reduced(data_path=dirname, tag="lazy", chunks={"time": 1})
+
+    area_key = expected.get("area_key", "area_c")
+    for method, kwargs in [
+        ("add_horizontal_average", {"var_key": "T", "part": ["day", "night"]}),
+        ("add_total_energy", {}),
+        ("add_total_momentum", {}),
+        ("add_rcb", {}),
+        ("add_rcb_map", {}),
+        ("add_meridional_overturning", {}),
+    ]:
+        if method not in ["add_meridional_overturning", "add_rcb_map"]:
+            kwargs["area_key"] = area_key
+        eager = getattr(tools, method)(tag="eager", **kwargs)
+        lazy = getattr(tools, method)(tag="lazy", **kwargs)
+        assert isinstance(lazy.data, dask.array.Array)
+        assert np.allclose(eager, lazy.compute(), equal_nan=True)
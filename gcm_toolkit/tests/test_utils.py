@@ -45,6 +45,185 @@ def test_convert_pressure_failures():
         convert_pressure(xarray.Dataset(), "wrong", "wrong2")
 
 
+def test_accessor(all_nc_testdata):
+    """Test the unit-aware views of the dsi.gcmt accessor"""
+    dirname, expected = all_nc_testdata
+
+    tools = GCMT(write="off", p_unit="bar")
+    tools.read_reduced(data_path=dirname)
+    ds = tools.get_models().load()
+
+    np.testing.assert_allclose(ds.gcmt.pressure(), ds.Z * 1e5)
+    xarray.testing.assert_identical(ds.gcmt.pressure(unit="bar"), ds.Z)
+    assert ds.gcmt.with_p_unit("bar") is ds
+
+    si = ds.gcmt.si
+    np.testing.assert_allclose(si.Z, ds.Z * 1e5)
+    assert si.attrs["p_unit"] == "Pa"
+    np.testing.assert_allclose(si.attrs["p_ref"], ds.attrs["p_ref"] * 1e5)
+    # the data is shared, the original dataset is unchanged
+    assert np.shares_memory(si.T.values, ds.T.values)
+    assert ds.attrs["p_unit"] == "bar"
+
+    converted = convert_pressure(ds.copy(deep=True), "bar", "Pa")
+    xarray.testing.assert_allclose(si, converted)
+
+    # datasets without pressure unit are in Pa
+    no_unit = ds.copy()
+    del no_unit.attrs["p_unit"]
+    assert no_unit.gcmt.p_unit == "Pa"
+    assert no_unit.gcmt.p_factor("bar") == 1e-5
+    assert no_unit.gcmt.si is no_unit
+
+
+def test_derived(all_nc_testdata):
+    """Test the memoized derived variables of the dsi.gcmt accessor"""
+    dirname, expected = all_nc_testdata
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname)
+    ds = tools.get_models()
+
+    theta = ds.gcmt["theta"]
+    assert theta.name == "theta"
+    # the values are memoized, but every call returns a new object
+    assert ds.gcmt["theta"] is not theta
+    assert np.shares_memory(ds.gcmt["theta"], theta)
+    assert np.shares_memory(ds.gcmt.derived("theta", temp_key="T"), theta)
+    xarray.testing.assert_allclose(
+        theta, ds.T * (ds.Z.max() / ds.Z) ** (ds.R / ds.cp)
+    )
+
+    speed = ds.gcmt["wind_speed"]
+    np.testing.assert_allclose(speed, np.sqrt(ds.U**2 + ds.V**2))
+    assert np.shares_memory(ds.gcmt["z_geo"], ds.gcmt["z_geo"])
+
+    # modifying the returned variable does not corrupt the memoized one
+    theta.attrs["units"] = "changed"
+    assert "units" not in ds.gcmt["theta"].attrs
+    with pytest.raises(ValueError):
+        theta[0, 0, 0, 0] = 0.0
+
+    # variables of the dataset are returned as they are
+    xarray.testing.assert_identical(ds.gcmt["T"], ds.T)
+
+    # replacing an input invalidates the derived variable
+    ds.update({"T": ds.T * 2})
+    theta_new = ds.gcmt["theta"]
+    assert not np.shares_memory(theta_new, theta)
+    np.testing.assert_allclose(theta_new, 2 * theta)
+
+    # the other datasets are not affected
+    assert not np.shares_memory(ds.copy().gcmt["theta"], theta_new)
+
+    with pytest.raises(ValueError):
+        ds.gcmt.derived("not_derived")
+    with pytest.raises(ValueError):
+        ds.gcmt.derived("theta", wrong_key="T")
+    with pytest.raises(KeyError):
+        ds.gcmt.derived("theta", temp_key="not_there")
+
+
+def test_time_statistics(all_nc_testdata, tmpdir):
+    """Test the streaming time statistics"""
+    from gcm_toolkit.utils.statistics import (
+        TimeStatistics,
+        read_statistics,
+        write_statistics,
+    )
+
+    dirname, expected = all_nc_testdata
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname)
+    ds = tools.get_models().load()
+
+    # one snapshot after another, as a batch, and lazily
+    single = TimeStatistics(["T", "U"])
+    for i in range(len(ds.time)):
+        single.update(ds.isel(time=i))
+    batch = TimeStatistics(["T", "U"]).update(ds)
+    lazy = TimeStatistics(["T", "U"]).update(ds.chunk({"time": 1}))
+
+    for stats in [single, batch, lazy]:
+        assert stats.count == len(ds.time)
+        xarray.testing.assert_allclose(stats.mean, ds[["T", "U"]].mean("time"))
+        xarray.testing.assert_allclose(
+            stats.variance(ddof=1), ds[["T", "U"]].var("time", ddof=1)
+        )
+        xarray.testing.assert_allclose(stats.min, ds[["T", "U"]].min("time"))
+        xarray.testing.assert_allclose(stats.max, ds[["T", "U"]].max("time"))
+
+    # iterations that have been added before are skipped
+    single.update(ds.isel(time=[0]))
+    assert single.count == len(ds.time)
+
+    # the statistics can be stored and continued
+    first = TimeStatistics().update(ds.isel(time=[0]))
+    write_statistics(first, str(tmpdir), "stats")
+    restored = read_statistics(str(tmpdir), "stats")
+    assert restored.count == 1
+    assert "T" in restored.variables
+    restored.update(ds)
+    assert restored.count == len(ds.time)
+    xarray.testing.assert_allclose(restored.std()["T"], ds.T.std("time"))
+
+    assert read_statistics(str(tmpdir), "missing").count == 0
+    with pytest.raises(ValueError):
+        TimeStatistics().to_dataset()
+
+
+def test_pressure_interpolation(all_nc_testdata):
+    """Test the interpolation in log(p)"""
+    from gcm_toolkit.utils.interpolation import (
+        get_interpolator,
+        interpolate_pressure,
+    )
+
+    dirname, expected = all_nc_testdata
+
+    tools = GCMT(write="off")
+    tools.read_reduced(data_path=dirname)
+    ds = tools.get_models().isel(time=-1)
+
+    # halfway between two levels in log(p)
+    pres = float(np.sqrt(ds.Z[3] * ds.Z[4]))
+    iso = interpolate_pressure(ds, pres)
+    assert set(iso.T.dims) == {"lat", "lon"}
+    assert float(iso.Z) == pres
+    xarray.testing.assert_allclose(
+        iso.T.drop_vars("Z"), 0.5 * (ds.T.isel(Z=3) + ds.T.isel(Z=4))
+    )
+
+    # new levels, outside of the domain the data is missing
+    z_new = [float(ds.Z[2]), pres, 2 * float(ds.Z.max())]
+    levels = interpolate_pressure(ds, z_new)
+    np.testing.assert_allclose(levels.Z, z_new)
+    xarray.testing.assert_allclose(
+        levels.T.sel(Z=z_new[0]).drop_vars("Z"), ds.T.isel(Z=2).drop_vars("Z")
+    )
+    assert levels.T.sel(Z=z_new[2]).isnull().all()
+    assert get_interpolator(ds.Z.values, z_new) is get_interpolator(
+        ds.Z.values, z_new
+    )
+
+    # a different target for each column
+    target = xarray.full_like(ds.area_c, pres)
+    columns = interpolate_pressure(ds.chunk(), target)
+    xarray.testing.assert_allclose(
+        columns.T.compute().drop_vars("Z"), iso.T.drop_vars("Z")
+    )
+
+    # auxiliary coordinates along Z (e.g., drF of MITgcm) are dropped
+    with_drf = ds.assign_coords(drF=("Z", np.ones(ds.sizes["Z"])))
+    iso_drf = interpolate_pressure(with_drf, pres)
+    assert "drF" not in iso_drf.coords
+    xarray.testing.assert_allclose(iso_drf.T, iso.T)
+    iso_drf = interpolate_pressure(with_drf.T, pres)
+    assert "drF" not in iso_drf.coords
+    xarray.testing.assert_allclose(iso_drf, iso.T)
+
+
 def test_convert_time_failures():
     with pytest.raises(ValueError):
         convert_time(xarray.Dataset(), "wrong", "wrong2")
@@ -1 +1,3 @@
 """Moldule init"""
+# register the dsi.gcmt accessor
+from . import accessor
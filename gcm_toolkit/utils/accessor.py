@@ -0,0 +1,180 @@
+"""
+==============================================================
+                  gcm_toolkit dataset accessor
+==============================================================
+ Unit-aware views of gcm_toolkit datasets, available as
+ dsi.gcmt. Pressures are converted on the fly, so that no
+ coordinate or data array of the dataset has to be copied.
+==============================================================
+"""
+import xarray as xr
+
+from ..core.const import VARNAMES as c
+from ..core.units import pressure_factor
+
+PRESSURE_DIMS = [c["Z"], c["Z_l"], c["Z_p1"], c["Z_u"]]
+
+
+@xr.register_dataset_accessor("gcmt")
+class GCMTAccessor:
+    """
+    Accessor for gcm_toolkit datasets (dsi.gcmt).
+
+    Attributes
+    ----------
+    p_unit : str
+        The pressure unit of the dataset. Defaults to Pa, if the dataset
+        does not specify it.
+    """
+
+    def __init__(self, dsi):
+        """
+        Constructor for the accessor.
+
+        Parameters
+        ----------
+        dsi: xarray.Dataset
+            A gcm_toolkit-compatible dataset
+        """
+        self._obj = dsi
+
+    @property
+    def p_unit(self):
+        """The pressure unit of the dataset, Pa if it is not specified"""
+        return self._obj.attrs.get("p_unit", "Pa")
+
+    def p_factor(self, unit="Pa"):
+        """
+        Factor to convert the pressures of the dataset to the given unit.
+
+        Parameters
+        ----------
+        unit: str, optional
+            Unit to be changed to. Defaults to Pa.
+
+        Returns
+        -------
+        factor: float
+            pressure in unit = factor * pressure in the dataset
+        """
+        return pressure_factor(self.p_unit, unit)
+
+    def pressure(self, dim=c["Z"], unit="Pa"):
+        """
+        Pressure coordinate in the given unit. Only the (one dimensional)
+        coordinate is scaled, the dataset is not changed.
+
+        Parameters
+        ----------
+        dim: str, optional
+            The pressure coordinate. Defaults to Z.
+        unit: str, optional
+            Unit of the pressure. Defaults to Pa.
+
+        Returns
+        -------
+        pressure: xarray.DataArray
+            The pressure coordinate in the given unit
+        """
+        factor = self.p_factor(unit)
+        if factor == 1:
+            return self._obj[dim]
+        return self._obj[dim] * factor
+
+    def with_p_unit(self, unit="Pa"):
+        """
+        View of the dataset with pressures in the given unit. The data
+        variables are shared with the original dataset, only the pressure
+        coordinates are scaled.
+
+        Parameters
+        ----------
+        unit: str, optional
+            Unit of the pressure. Defaults to Pa.
+
+        Returns
+        -------
+        dsi: xarray.Dataset
+            Shallow copy of the dataset with pressures in the given unit
+        """
+        factor = self.p_factor(unit)
+        if factor == 1:
+            return self._obj
+
+        view = self._obj.assign_coords(
+            {
+                dim: self._obj[dim].variable * factor
+                for dim in PRESSURE_DIMS
+                if dim in self._obj.coords
+            }
+        )
+        view.attrs = dict(self._obj.attrs, p_unit=unit)
+        if "p_ref" in view.attrs:
+            view.attrs["p_ref"] = view.attrs["p_ref"] * factor
+        return view
+
+    @property
+    def si(self):
+        """View of the dataset with pressures in Pa (see with_p_unit)"""
+        return self.with_p_unit("Pa")
+
+    def __getitem__(self, name):
+        """
+        Variable of the dataset. Variables that are not part of the dataset
+        are derived on demand, if possible (see derived).
+
+        Parameters
+        ----------
+        name: str
+            Name of the variable
+
+        Returns
+        -------
+        data: xarray.DataArray
+            The variable
+        """
+        from .derived import get_derived, is_derived
+
+        if name in self._obj.variables or not is_derived(name):
+            return self._obj[name]
+        return get_derived(self._obj, name)
+
+    def derived(self, name, **keys):
+        """
+        Derived variable of the dataset. The variable is memoized until the
+        variables it depends on are replaced.
+
+        Parameters
+        ----------
+        name: str
+            Name of the derived variable (e.g., theta, rho, z_geo, wind_speed)
+        keys: str, optional
+            Keys of the input variables, if they differ from the defaults
+            (e.g., temp_key="T")
+
+        Returns
+        -------
+        data: xarray.DataArray
+            The derived variable
+        """
+        from .derived import get_derived
+
+        return get_derived(self._obj, name, **keys)
+
+    def hydrostatic(self, temp_key="T"):
+        """
+        Shared hydrostatic state of the dataset.
+
+        Parameters
+        ----------
+        temp_key: str, optional
+            The key to look up the temperature
+
+        Returns
+        -------
+        state: gcm_toolkit.utils.hydrostatic.HydrostaticState
+            The (cached) hydrostatic state
+        """
+        from .hydrostatic import get_hydrostatic_state
+
+        return get_hydrostatic_state(self._obj, temp_key)
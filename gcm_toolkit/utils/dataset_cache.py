@@ -0,0 +1,137 @@
+"""
+==============================================================
+                      Per-dataset caches
+==============================================================
+ Caches of derived quantities that live as long as the
+ dataset they belong to. Entries are validated with cheap
+ fingerprints of the variables they depend on.
+==============================================================
+"""
+import weakref
+
+import numpy as np
+
+# id(dataset) -> {cache name: {key: value}}
+_CACHES = {}
+
+
+def get_cache(dsi, name):
+    """
+    Get a cache (dictionary) that belongs to a dataset. The cache is removed
+    once the dataset is garbage collected.
+
+    Parameters
+    ----------
+    dsi: xarray.Dataset
+        The dataset the cache belongs to
+    name: str
+        Name of the cache
+
+    Returns
+    -------
+    cache: dict
+        The cache
+    """
+    key = id(dsi)
+    if key not in _CACHES:
+        _CACHES[key] = {}
+        # forget the caches, once the dataset is garbage collected
+        weakref.finalize(dsi, _CACHES.pop, key, None)
+
+    return _CACHES[key].setdefault(name, {})
+
+
+def fingerprint(dsi, variables=(), values=(), attrs=()):
+    """
+    Cheap fingerprint of the data a cached quantity depends on (see
+    same_fingerprint). Note that changing the values of an array in place
+    is not detected.
+
+    Parameters
+    ----------
+    dsi: xarray.Dataset
+        The dataset the quantity is derived from
+    variables: list, optional
+        Keys of the variables (or coordinates) the quantity depends on.
+        They are compared by the identity of their data (see same_data).
+    values: list, optional
+        Keys of small variables (e.g., the lon, lat or Z coordinates) that
+        are compared by value
+    attrs: list, optional
+        Attributes of the dataset the quantity depends on
+
+    Returns
+    -------
+    fingerprint: tuple
+        The fingerprint. A KeyError is raised, if one of the variables is not
+        in the dataset.
+    """
+    return (
+        tuple((key, dsi.variables[key]) for key in variables),
+        tuple(np.asarray(dsi.variables[key].values) for key in values)
+        + tuple(dsi.attrs.get(key) for key in attrs),
+    )
+
+
+def same_fingerprint(old, new):
+    """
+    Compare two fingerprints of fingerprint().
+
+    Parameters
+    ----------
+    old: tuple
+        The fingerprint of the data a cached quantity was derived from
+    new: tuple
+        The fingerprint of the current data
+
+    Returns
+    -------
+    same: bool
+        True, if the cached quantity can be reused
+    """
+    return (
+        len(old[0]) == len(new[0])
+        and len(old[1]) == len(new[1])
+        and all(
+            old_key == new_key and same_data(old_var, new_var)
+            for (old_key, old_var), (new_key, new_var) in zip(old[0], new[0])
+        )
+        and all(np.array_equal(o, n) for o, n in zip(old[1], new[1]))
+    )
+
+
+def same_data(old, new):
+    """
+    Cheap check whether two variables share the same data.
+
+    xarray wraps the data of a variable in (lazy) indexing adapters, which
+    are recreated when a dataset is updated. The array itself is only replaced
+    if new data is assigned, or if the data is loaded into memory. Old and new
+    data are therefore compared by the identity of the array that holds the
+    data, at the time of the comparison. This relies on the private attribute
+    Variable._data of xarray. All caches of gcm_toolkit compare data via
+    fingerprint and same_fingerprint, so that this is the only place that
+    depends on it.
+
+    Parameters
+    ----------
+    old: xarray.Variable
+        The variable a cached quantity was derived from
+    new: xarray.Variable
+        The current variable
+
+    Returns
+    -------
+    same: bool
+        True, if both variables share the same data
+    """
+    return _storage_of(old) is _storage_of(new)
+
+
+def _storage_of(variable):
+    """Helper function to find the array in which the data is stored."""
+    # pylint: disable=protected-access
+    data = variable._data
+    while hasattr(data, "array") and not isinstance(data, np.ndarray):
+        data = data.array
+    return data
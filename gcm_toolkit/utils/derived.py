@@ -0,0 +1,181 @@
+"""
+==============================================================
+                  Derived-variable registry
+==============================================================
+ Variables that can be derived from the variables of a
+ dataset (e.g., potential temperature or wind speed). They are
+ computed on demand, via dsi.gcmt[name], and memoized until
+ the variables they depend on change.
+==============================================================
+"""
+import numpy as np
+
+from ..core.const import VARNAMES as c
+from .dataset_cache import fingerprint, get_cache, same_fingerprint
+from .hydrostatic import get_hydrostatic_state
+
+# name -> {"func": function, "inputs": {keyword: default variable key},
+#          "coords": [coordinates], "attrs": [attributes]}
+DERIVED = {}
+
+
+def register_derived(name, inputs, coords=(), attrs=()):
+    """
+    Decorator to register a function that derives a variable. The function
+    is called as func(dsi, **keys), where keys maps the keywords of inputs
+    to the variable keys that should be used.
+
+    Parameters
+    ----------
+    name: str
+        Name of the derived variable
+    inputs: dict
+        Keywords of the function and the default keys of the variables
+        they refer to (e.g., {"temp_key": "T"})
+    coords: list, optional
+        Coordinates the derived variable depends on
+    attrs: list, optional
+        Attributes of the dataset the derived variable depends on
+
+    Returns
+    -------
+    decorator: function
+        Decorator that registers the function
+    """
+
+    def decorator(func):
+        DERIVED[name] = {
+            "func": func,
+            "inputs": dict(inputs),
+            "coords": list(coords),
+            "attrs": list(attrs),
+        }
+        return func
+
+    return decorator
+
+
+def is_derived(name):
+    """
+    Check if a variable can be derived.
+
+    Parameters
+    ----------
+    name: str
+        Name of the variable
+
+    Returns
+    -------
+    derived: bool
+        True, if the variable is registered
+    """
+    return isinstance(name, str) and name in DERIVED
+
+
+def get_derived(dsi, name, **keys):
+    """
+    Get a derived variable of a dataset. The variable is computed on first
+    access and memoized as long as the dataset exists and the variables,
+    coordinates and attributes it depends on are not replaced. Note that
+    changing the values of a variable in place is not detected.
+
+    A shallow copy of the memoized variable is returned, such that changing
+    its attributes does not affect the memo. The values are shared with the
+    memo and therefore read-only, use .copy() to modify them.
+
+    Parameters
+    ----------
+    dsi: xarray.Dataset
+        A gcm_toolkit-compatible dataset
+    name: str
+        Name of the derived variable (see DERIVED)
+    keys: str, optional
+        Keys of the input variables, if they differ from the defaults
+        (e.g., temp_key="T")
+
+    Returns
+    -------
+    data: xarray.DataArray
+        The derived variable
+    """
+    if not is_derived(name):
+        raise ValueError(
+            f"{name} is not a derived variable. Please use one of: "
+            + ", ".join(DERIVED)
+        )
+    entry = DERIVED[name]
+
+    unknown = set(keys) - set(entry["inputs"])
+    if unknown:
+        raise ValueError(
+            f"Unknown keys for {name}: " + ", ".join(sorted(unknown))
+        )
+    keys = dict(entry["inputs"], **keys)
+
+    memo = get_cache(dsi, "derived")
+    memo_key = (name, tuple(sorted(keys.items())))
+    for key in keys.values():
+        if key not in dsi.variables:
+            raise KeyError(f"{key} is needed, but not in the dataset")
+    inputs = fingerprint(
+        dsi,
+        variables=list(keys.values()),
+        values=entry["coords"],
+        attrs=entry["attrs"],
+    )
+
+    cached = memo.get(memo_key)
+    if cached is None or not same_fingerprint(cached[0], inputs):
+        data = _read_only(entry["func"](dsi, **keys).rename(name))
+        cached = memo[memo_key] = (inputs, data)
+
+    return cached[1].copy(deep=False)
+
+
+def _read_only(data):
+    """Helper function to protect the values of a memoized variable."""
+    if isinstance(data.data, np.ndarray):
+        # a read-only view, the array itself might be used elsewhere
+        values = data.data.view()
+        values.flags.writeable = False
+        data = data.copy(data=values)
+    return data
+
+
+@register_derived(
+    "theta",
+    inputs={"temp_key": c["T"]},
+    coords=[c["Z"]],
+    attrs=[c["R"], c["cp"]],
+)
+def _theta(dsi, temp_key):
+    """Potential temperature with respect to the model boundary"""
+    return get_hydrostatic_state(dsi, temp_key).theta
+
+
+@register_derived(
+    "rho",
+    inputs={"temp_key": c["T"]},
+    coords=[c["Z"]],
+    attrs=["p_unit", c["R"]],
+)
+def _rho(dsi, temp_key):
+    """Density (in kg/m^3) from the ideal gas equation"""
+    return get_hydrostatic_state(dsi, temp_key).rho
+
+
+@register_derived(
+    "z_geo",
+    inputs={"temp_key": c["T"]},
+    coords=[c["Z"]],
+    attrs=["p_unit", c["R"], c["g"]],
+)
+def _z_geo(dsi, temp_key):
+    """Geometric height (in m) above the lowest pressure level"""
+    return get_hydrostatic_state(dsi, temp_key).z_geo
+
+
+@register_derived("wind_speed", inputs={"u_key": c["U"], "v_key": c["V"]})
+def _wind_speed(dsi, u_key, v_key):
+    """Horizontal wind speed"""
+    return np.sqrt(dsi[u_key] ** 2 + dsi[v_key] ** 2)
@@ -0,0 +1,252 @@
+"""
+==============================================================
+                      Encoding profiles
+==============================================================
+ Named encoding profiles (compression, chunking and packing)
+ that can be used to store gcm_toolkit datasets.
+==============================================================
+"""
+import numpy as np
+
+from ..core.const import VARNAMES as c
+
+# codec: blosc compressor for zarr (netCDF files always use zlib)
+# complevel: compression level
+# shuffle: use the byte shuffle filter
+# chunks: chunk sizes along the given dimensions (full size otherwise)
+# dtype: store the data with a different float precision (optional)
+# pack_bits: pack the data into integers with scale_factor and add_offset
+#            (optional, 8 or 16)
+ENCODING_PROFILES = {
+    "archive": {
+        "codec": "zstd",
+        "complevel": 9,
+        "shuffle": True,
+        "chunks": {c["time"]: 1},
+    },
+    "fast": {
+        "codec": "lz4",
+        "complevel": 1,
+        "shuffle": True,
+        "chunks": {c["time"]: 1},
+    },
+    "analysis": {
+        "codec": "zstd",
+        "complevel": 4,
+        "shuffle": True,
+        "chunks": {c["time"]: 10},
+        "dtype": "float32",
+    },
+}
+
+
+def get_encoding(model, profile, method):
+    """
+    Construct the encoding of all float data variables of a dataset.
+
+    Parameters
+    ----------
+    model: xarray.Dataset
+        Dataset that should be stored
+    profile: str or dict
+        Name of one of the ENCODING_PROFILES or a dictionary with the
+        same keys.
+    method: str
+        'nc' or 'zarr'
+
+    Returns
+    -------
+    encoding: dict
+        encoding that can be passed to to_netcdf or to_zarr
+    """
+    profile = _get_profile(profile)
+
+    if method not in ["nc", "zarr"]:
+        raise NotImplementedError("Please use zarr or nc.")
+
+    floats = [
+        name
+        for name, var in model.data_vars.items()
+        if np.issubdtype(var.dtype, np.floating)
+    ]
+    if profile.get("pack_bits") is not None:
+        v_mins, v_maxs = _extremes(model, floats)
+
+    encoding = {}
+    for name in floats:
+        var = model[name]
+
+        enc = _compression(profile, method)
+
+        chunks = tuple(
+            min(profile.get("chunks", {}).get(dim, size), size)
+            for dim, size in var.sizes.items()
+        )
+        if method == "nc" and len(chunks) > 0:
+            enc["chunksizes"] = chunks
+        elif method == "zarr" and var.chunks is None:
+            # dask backed data is written with its own chunks
+            enc["chunks"] = chunks
+
+        if profile.get("pack_bits") is not None:
+            enc.update(
+                _packing(v_mins[name], v_maxs[name], profile["pack_bits"])
+            )
+        elif profile.get("dtype") is not None:
+            enc["dtype"] = profile["dtype"]
+
+        encoding[name] = enc
+
+    return encoding
+
+
+def get_chunks(model, profile):
+    """
+    Chunk sizes of a profile for the dimensions of a dataset. Data that is
+    chunked accordingly is stored in the chunks of the profile.
+
+    Parameters
+    ----------
+    model: xarray.Dataset
+        Dataset that should be stored
+    profile: str or dict
+        Name of one of the ENCODING_PROFILES or a dictionary with the
+        same keys.
+
+    Returns
+    -------
+    chunks: dict
+        chunk sizes that can be passed to Dataset.chunk
+    """
+    profile = _get_profile(profile)
+    return {
+        dim: min(size, model.sizes[dim])
+        for dim, size in profile.get("chunks", {}).items()
+        if dim in model.dims
+    }
+
+
+def _get_profile(profile):
+    """Helper function to look up the encoding profile."""
+    if isinstance(profile, str):
+        if profile not in ENCODING_PROFILES:
+            raise ValueError(
+                f"Unknown encoding profile {profile}. "
+                f"Use one of {list(ENCODING_PROFILES)} or a dictionary."
+            )
+        profile = ENCODING_PROFILES[profile]
+    return profile
+
+
+def _compression(profile, method):
+    """Helper function to set up the compression of a variable."""
+    if method == "nc":
+        return {
+            "zlib": True,
+            "complevel": profile.get("complevel", 4),
+            "shuffle": profile.get("shuffle", True),
+        }
+
+    from numcodecs import Blosc
+
+    shuffle = (
+        Blosc.SHUFFLE if profile.get("shuffle", True) else Blosc.NOSHUFFLE
+    )
+    return {
+        "compressor": Blosc(
+            cname=profile.get("codec", "zstd"),
+            clevel=profile.get("complevel", 4),
+            shuffle=shuffle,
+        )
+    }
+
+
+def _packing(vmin, vmax, bits):
+    """
+    Helper function to pack a variable with the given range into signed
+    integers using scale_factor and add_offset. The smallest integer is used
+    as fill value.
+    """
+    if bits not in [8, 16]:
+        raise ValueError("Data can only be packed into 8 or 16 bits")
+
+    if not np.isfinite(vmin) or not np.isfinite(vmax):
+        vmin, vmax = 0.0, 0.0
+
+    # leave out the smallest integer, since it is used as fill value
+    n_steps = 2**bits - 2
+    scale = (vmax - vmin) / n_steps if vmax > vmin else 1.0
+
+    return {
+        "dtype": f"int{bits}",
+        "scale_factor": scale,
+        "add_offset": (vmax + vmin) / 2,
+        "_FillValue": -(2 ** (bits - 1)),
+    }
+
+
+def _extremes(model, names):
+    """
+    Helper function to get the minima and maxima of the given variables.
+    Lazy variables are computed in one pass.
+    """
+    if len(names) == 0:
+        return {}, {}
+
+    v_mins, v_maxs = model[names].min(), model[names].max()
+    if model[names].chunks:
+        import dask
+
+        v_mins, v_maxs = dask.compute(v_mins, v_maxs)
+    return (
+        {name: float(v_mins[name]) for name in names},
+        {name: float(v_maxs[name]) for name in names},
+    )
+
+
+def check_packed_range(model, encodings):
+    """
+    Check that the data fits into the range of packed variables. Data that is
+    appended to a packed variable uses the scale_factor and add_offset of the
+    first write, such that values outside of that range would be clipped.
+
+    Parameters
+    ----------
+    model: xarray.Dataset
+        Dataset that should be stored
+    encodings: dict
+        The encodings of the stored variables (dtype, scale_factor,
+        add_offset and _FillValue)
+
+    Raises
+    ------
+    ValueError
+        If a variable does not fit into the range of its packed encoding
+    """
+    packed = {
+        name: enc
+        for name, enc in encodings.items()
+        if name in model.data_vars
+        and "scale_factor" in enc
+        and np.issubdtype(np.dtype(enc["dtype"]), np.integer)
+    }
+    v_mins, v_maxs = _extremes(model, list(packed))
+
+    for name, enc in packed.items():
+        info = np.iinfo(np.dtype(enc["dtype"]))
+        lowest = (
+            info.min + 1 if enc.get("_FillValue") == info.min else info.min
+        )
+        scale = float(enc["scale_factor"])
+        offset = float(enc.get("add_offset", 0.0))
+
+        # allow for rounding to the nearest integer
+        low = offset + (lowest - 0.5) * scale
+        high = offset + (info.max + 0.5) * scale
+        if v_mins[name] < low or v_maxs[name] > high:
+            raise ValueError(
+                f"The values of {name} ({v_mins[name]} to {v_maxs[name]}) "
+                f"are outside of the packed range ({low} to {high}) of the "
+                "stored data. Please save it again without "
+                "update_along_time or with a different encoding."
+            )
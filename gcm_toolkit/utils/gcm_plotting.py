@@ -13,6 +13,8 @@ from matplotlib.collections import LineCollection
 
 from ..core import writer as wrt
 from ..core.const import VARNAMES as c
+from .interpolation import interpolate_pressure
+from .sidecar import get_product, isobaric_from_sidecar
 
 
 # pylint: disable=R0915,R0912
@@ -33,6 +35,7 @@ def isobaric_slice(
     xlabel="Longitude (deg)",
     ylabel="Latitude (deg)",
     contourf=False,
+    sidecar=None,
     **kwargs,
 ):
     """
@@ -44,7 +47,8 @@ def isobaric_slice(
     dsi : DataSet
         A gcm_toolkit-compatible dataset of a 3D climate simulation.
     var_key : str
-        The key of the variable quantity that should be plotted.
+        The key of the variable quantity that should be plotted. Derived
+        variables (e.g., theta or wind_speed) are computed if needed.
     pres : float
         Pressure level for the isobaric slice to be plotted, expressed in
         the units specified in the dataset attributes (e.g., init of GCMT object).
@@ -55,7 +59,7 @@ def isobaric_slice(
         The look-up method that is used to slice along pressure:
         'exact' for exactly matching key look-up (default);
         'nearest' to pick out the nearest neighbour Z coordinate;
-        'interpolate' for a linear interpolation along the Z axis.
+        'interpolate' for a linear interpolation in log(p) along the Z axis.
     ax : matplotlib.axes.Axes, optional
         The axis on which you want your plot to appear.
     plot_windvectors : boolean, optional
@@ -80,6 +84,9 @@ def isobaric_slice(
         Y-axis label, latitude by default.
     contourf: bool, optional
         Decide if you want to do a contourplot or a pcolormesh plot
+    sidecar: xarray.Dataset, optional
+        Sidecar with reduced products of the dataset. If it contains the
+        selected slice, the slice is taken from the sidecar.
     """
 
     # print information
@@ -105,20 +112,27 @@ def isobaric_slice(
     # if no timestamp is given, pick the last available time
     if time == -1:
         time = dsi[c["time"]].isel(**{c["time"]: -1}).values
+    # derive the variable (e.g., theta), if it is not part of the dataset
+    if var_key not in dsi.variables:
+        dsi = dsi.assign({var_key: dsi.gcmt[var_key]})
     # time-slice of the dataset
     # (note: the look-up method for time is always assumed to be exact)
     dsi = dsi.sel(**{c["time"]: time})
 
     # isobaric slice based on the look-up method for pressure
-    if lookup_method == "exact":
-        this_p = dsi[c["Z"]].sel(**{c["Z"]: pres}).values
-        ds2d = dsi.sel(**{c["Z"]: pres})
-    elif lookup_method == "nearest":
-        this_p = dsi[c["Z"]].sel(**{c["Z"]: pres}, method="nearest").values
-        ds2d = dsi.sel(**{c["Z"]: pres}, method="nearest")
+    ds2d = None
+    if lookup_method in ["exact", "nearest"]:
+        method = None if lookup_method == "exact" else "nearest"
+        this_p = dsi[c["Z"]].sel(**{c["Z"]: pres}, method=method).values
+        needed = [var_key, c["U"], c["V"]] if plot_windvectors else [var_key]
+        ds2d = isobaric_from_sidecar(sidecar, needed, time, this_p)
+        if ds2d is None:
+            ds2d = dsi.sel(**{c["Z"]: this_p})
+        else:
+            wrt.write_status("INFO", "Use isobaric slice of the sidecar")
     elif lookup_method == "interpolate":
-        this_p = dsi[c["Z"]].interp(**{c["Z"]: pres}).values
-        ds2d = dsi.interp(**{c["Z"]: pres})
+        ds2d = interpolate_pressure(dsi, pres)
+        this_p = ds2d[c["Z"]].values
     else:
         raise ValueError(
             "Please enter 'exact', 'nearest', or 'interpolate' as Z lookup"
@@ -309,7 +323,8 @@ def time_evol(
     dsi : DataSet
         A gcm_toolkit-compatible dataset of a 3D climate simulation.
     var_key : str
-        The key of the variable quantity that should be plotted.
+        The key of the variable quantity that should be plotted. Derived
+        variables (e.g., theta or wind_speed) are computed if needed.
     ax : matplotlib.axes.Axes, optional
         The axis on which you want your plot to appear.
     fs_labels : int, optional
@@ -406,6 +421,7 @@ def zonal_mean(
     title=None,
     add_colorbar=True,
     contourf=False,
+    sidecar=None,
     **kwargs,
 ):
     """
@@ -416,7 +432,8 @@ def zonal_mean(
     dsi : DataSet
         A gcm_toolkit-compatible dataset of a 3D climate simulation.
     var_key : str
-        The key of the variable quantity that should be plotted.
+        The key of the variable quantity that should be plotted. Derived
+        variables (e.g., theta or wind_speed) are computed if needed.
     time : int, optional
         Timestamp that should be plotted. By default, the last time is
         selected.
@@ -439,6 +456,9 @@ def zonal_mean(
         Optionally decide if you want a colorbar or don't
     contourf: bool, optional
         Decide if you want to do a contourplot or a pcolormesh plot
+    sidecar: xarray.Dataset, optional
+        Sidecar with reduced products of the dataset. If it contains the
+        zonal mean of the quantity, the zonal mean is taken from the sidecar.
 
     """
 
@@ -464,7 +484,13 @@ def zonal_mean(
     # time-slice of the dataset
     # (note: the look-up method for time is always assumed to be exact)
     # this_time = time
-    zmean = dsi[var_key].sel(**{c["time"]: time}).mean(dim=c["lon"])
+    zmean = get_product(sidecar, var_key, "zmean")
+    if zmean is not None and np.isin(time, zmean[c["time"]].values):
+        wrt.write_status("INFO", "Use zonal mean of the sidecar")
+        zmean = zmean.sel(**{c["time"]: time})
+    else:
+        # derived variables (e.g., theta) are computed, if needed
+        zmean = dsi.gcmt[var_key].sel(**{c["time"]: time}).mean(dim=c["lon"])
 
     # Simple plot (with xarray.plot.pcolormesh)
     if contourf:
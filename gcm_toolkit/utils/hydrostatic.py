@@ -0,0 +1,185 @@
+"""
+==============================================================
+                   Hydrostatic state engine
+==============================================================
+ Shared hydrostatic quantities (SI pressure, density, dz/dp,
+ geometric height and potential temperature) of a dataset.
+ They are computed once per dataset and reused by all
+ diagnostics until the underlying variables change.
+==============================================================
+"""
+from functools import cached_property
+
+from ..core.const import VARNAMES as c
+from .dataset_cache import fingerprint, get_cache, same_fingerprint
+
+
+class HydrostaticState:
+    """
+    Hydrostatic state of a dataset, based on the ideal gas equation and on
+    hydrostatic equilibrium. All quantities are computed lazily on first
+    access and are given in SI units. They keep the pressure coordinate of
+    the dataset, such that they can be combined with its variables.
+
+    Attributes
+    ----------
+    p_factor : float
+        Factor to convert the pressure coordinate of the dataset to Pa
+    temp_key : str
+        The key of the temperature
+    """
+
+    def __init__(self, dsi, temp_key="T"):
+        """
+        Constructor for the hydrostatic state.
+
+        Parameters
+        ----------
+        dsi: xarray.Dataset
+            The dataset for which the state should be calculated
+        temp_key: str, optional
+            The key to look up the temperature
+        """
+        self.temp_key = temp_key
+        self.p_factor = dsi.gcmt.p_factor("Pa")
+
+        self._fingerprint = self._get_fingerprint(dsi, temp_key)
+        self._temp = dsi[temp_key]
+        self._p_coord = dsi[c["Z"]]
+        self._pressure = dsi.gcmt.pressure(c["Z"], "Pa")
+        self._attrs = {key: dsi.attrs[c[key]] for key in ["R", "g", "cp"]}
+
+    @staticmethod
+    def _get_fingerprint(dsi, temp_key):
+        """
+        Helper function to identify the data the state depends on.
+        Assigning a new temperature, pressure coordinate or changing the
+        relevant attributes changes the fingerprint.
+        """
+        return fingerprint(
+            dsi,
+            variables=[temp_key],
+            values=[c["Z"]],
+            attrs=["p_unit", c["R"], c["g"], c["cp"]],
+        )
+
+    def is_valid(self, dsi):
+        """
+        Check if the state still describes the dataset.
+
+        Parameters
+        ----------
+        dsi: xarray.Dataset
+            The dataset to compare with
+
+        Returns
+        -------
+        valid: bool
+            True, if the underlying variables did not change
+        """
+        if self.temp_key not in dsi.variables:
+            return False
+        return same_fingerprint(
+            self._fingerprint, self._get_fingerprint(dsi, self.temp_key)
+        )
+
+    @property
+    def pressure(self):
+        """Pressure in Pa"""
+        return self._pressure
+
+    @cached_property
+    def rho(self):
+        """Density from the ideal gas equation"""
+        return self._pressure / self._attrs["R"] / self._temp
+
+    @cached_property
+    def dzdp(self):
+        """dz/dp (in m/Pa) from hydrostatic equilibrium"""
+        return -1 / self.rho / self._attrs["g"]
+
+    @cached_property
+    def dmdp(self):
+        """Mass per unit area and pressure (rho dz/dp, in kg/m^2/Pa)"""
+        return self.rho * self.dzdp
+
+    @cached_property
+    def z_geo(self):
+        """Geometric height (in m) above the lowest pressure level"""
+        return self.integrate_pressure(self.dzdp, cumulative=True)
+
+    @cached_property
+    def theta(self):
+        """Potential temperature with respect to the model boundary"""
+        return self._temp * (self._p_coord.max() / self._p_coord) ** (
+            self._attrs["R"] / self._attrs["cp"]
+        )
+
+    def integrate_pressure(self, quantity, cumulative=False):
+        """
+        Integrate a quantity along the pressure coordinate (in Pa).
+
+        Parameters
+        ----------
+        quantity: xarray.DataArray
+            The quantity that should be integrated
+        cumulative: bool, optional
+            Do a cumulative integration instead
+
+        Returns
+        -------
+        integral: xarray.DataArray
+            The integral in SI units
+        """
+        if cumulative:
+            return self.p_factor * quantity.cumulative_integrate(coord=c["Z"])
+        return self.p_factor * quantity.integrate(coord=c["Z"])
+
+    def integrate_over_mass(self, quantity, area):
+        """
+        Carry out a mass integral (dM = rho dV) over the whole dataset.
+
+        Parameters
+        ----------
+        quantity: xarray.DataArray
+            The quantity that should be integrated
+        area: xarray.DataArray
+            The area of the grid cells
+
+        Returns
+        -------
+        integral: xarray.DataArray
+            The mass integral in SI units
+        """
+        return self.integrate_pressure(
+            (quantity * self.dmdp * area).sum(dim=[c["lon"], c["lat"]])
+        )
+
+
+def get_hydrostatic_state(dsi, temp_key="T"):
+    """
+    Get the hydrostatic state of a dataset. The state is cached as long as the
+    dataset exists and its temperature, pressure coordinate and relevant
+    attributes are not replaced. Note that changing the values of a variable
+    in place is not detected.
+
+    Parameters
+    ----------
+    dsi: xarray.Dataset
+        The dataset for which the state should be calculated
+    temp_key: str, optional
+        The key to look up the temperature
+
+    Returns
+    -------
+    state: HydrostaticState
+        The (cached) hydrostatic state
+    """
+    states = get_cache(dsi, "hydrostatic")
+
+    state = states.get(temp_key)
+    if state is None or not state.is_valid(dsi):
+        state = HydrostaticState(dsi, temp_key=temp_key)
+        states[temp_key] = state
+
+    return state
@@ -15,6 +15,8 @@ import numpy as np
 import xarray as xr
 
 from ..core.const import VARNAMES as c
+from ..core.units import pressure_factor
+from .interpolation import interpolate_pressure
 
 
 class _Chemistry:
@@ -70,12 +72,10 @@ class _Chemistry:
                 + "Select the timestamp beforehand."
             )
 
-        pres = self.dsi[c["Z"]].values
         p_unit = self.dsi.attrs.get("p_unit")
-        if p_unit == "Pa":
-            pres = pres / 1e5  # convert to bar
         if p_unit not in ["Pa", "bar"]:
             raise NotImplementedError("can currently only deal with Pa or bar")
+        pres = self.dsi.gcmt.pressure(c["Z"], "bar").values
 
         co_ratios = np.ones_like(pres) * co_ratio
         feh_ratios = np.ones_like(pres) * feh_ratio
@@ -146,10 +146,9 @@ class _Chemistry:
         if p_unit not in ["Pa", "bar"]:
             raise NotImplementedError("can currently only deal with Pa or bar")
 
-        if p_unit == "Pa":
-            p_prt = p_prt * 1e5
+        p_prt = p_prt * pressure_factor("bar", p_unit)
 
-        prt_abu = prt_abu.interp(Z=p_prt)
+        prt_abu = interpolate_pressure(prt_abu, p_prt)
 
         return prt_abu
 
@@ -284,15 +283,12 @@ class PrtInterface(Interface):
         """
         self._set_data_common(time, tag=tag, regrid_lowres=regrid_lowres)
 
-        if self.dsi.p_unit == "bar":
-            press = self.dsi.Z.values
-        elif self.dsi.p_unit == "Pa":
-            press = self.dsi.Z.values / 1e5
-        else:
+        if self.dsi.p_unit not in ["Pa", "bar"]:
             raise NotImplementedError(
                 "only pressure units in Pa and bar are "
                 + "implemented at the moment"
             )
+        press = self.dsi.gcmt.pressure(c["Z"], "bar").values
 
         # be careful here: petitRADTRANS operates top->bot in bar
         self.prt.setup_opa_structure(np.sort(press))
@@ -0,0 +1,181 @@
+"""
+==============================================================
+                Pressure interpolation engine
+==============================================================
+ Linear interpolation in log(p) between pressure levels.
+ Bracketing levels and weights are computed once per source
+ and target grid and applied to all variables of a dataset
+ at once. Targets may differ from column to column.
+==============================================================
+"""
+from functools import lru_cache
+
+import numpy as np
+import xarray as xr
+
+from ..core.const import VARNAMES as c
+
+
+class PressureInterpolator:
+    """
+    Interpolation from the pressure levels of a dataset to target pressures,
+    linear in log(p). Targets outside of the source levels are set to NaN.
+
+    Attributes
+    ----------
+    dim : str
+        The pressure dimension that is interpolated
+    target : xarray.DataArray
+        The target pressures
+    """
+
+    def __init__(self, source, target, dim=c["Z"]):
+        """
+        Constructor for the interpolator.
+
+        Parameters
+        ----------
+        source: array-like
+            The (one dimensional) pressure levels of the data
+        target: float, array-like or xarray.DataArray
+            The target pressures (in the unit of source). A float or a one
+            dimensional array are new levels along dim. A DataArray may
+            have further dimensions (e.g., lon and lat) to use a different
+            target for each column.
+        dim: str, optional
+            The pressure dimension. Defaults to Z.
+        """
+        self.dim = dim
+
+        source = np.asarray(source, dtype=float)
+        if source.ndim != 1 or len(source) < 2:
+            raise ValueError("Need at least two source pressure levels.")
+        if not isinstance(target, xr.DataArray):
+            target = np.asarray(target, dtype=float)
+            if target.ndim > 1:
+                raise ValueError(
+                    "Multidimensional targets need to be a DataArray."
+                )
+            target = xr.DataArray(
+                target,
+                dims=[dim] if target.ndim == 1 else [],
+                coords={dim: target},
+            )
+        self.target = target
+
+        # brackets in the sorted source levels
+        order = np.argsort(source)
+        log_src = np.log(source[order])
+        log_tgt = np.log(np.asarray(target.values, dtype=float))
+        upper = np.clip(np.searchsorted(log_src, log_tgt), 1, len(log_src) - 1)
+        weight = (log_tgt - log_src[upper - 1]) / (
+            log_src[upper] - log_src[upper - 1]
+        )
+        valid = (log_tgt >= log_src[0]) & (log_tgt <= log_src[-1])
+
+        dims = target.dims
+        self._lower = xr.DataArray(order[upper - 1], dims=dims)
+        self._upper = xr.DataArray(order[upper], dims=dims)
+        self._weight = xr.DataArray(np.where(valid, weight, np.nan), dims=dims)
+
+    def __call__(self, data):
+        """
+        Interpolate data to the target pressures. Variables without the
+        pressure dimension are not changed. Coordinates along the pressure
+        dimension (e.g., drF) describe the source levels and are dropped.
+
+        Parameters
+        ----------
+        data: xarray.Dataset or xarray.DataArray
+            The data on the source levels
+
+        Returns
+        -------
+        interpolated: xarray.Dataset or xarray.DataArray
+            The data on the target pressures
+        """
+        data = data.drop_vars(self.dim, errors="ignore")
+        data = data.reset_coords(
+            [
+                name
+                for name, coord in data.coords.items()
+                if self.dim in coord.dims
+            ],
+            drop=True,
+        )
+        if isinstance(data, xr.DataArray):
+            interpolated = self._interpolate(data)
+        else:
+            # only the variables along dim are interpolated
+            along = [
+                name
+                for name, var in data.data_vars.items()
+                if self.dim in var.dims
+            ]
+            interpolated = data.drop_vars(along).assign(
+                self._interpolate(data[along]).data_vars
+            )
+        return interpolated.assign_coords({self.dim: self.target.variable})
+
+    def _interpolate(self, data):
+        """Helper function to apply the weights to all variables at once."""
+        lower = data.isel(**{self.dim: self._lower})
+        upper = data.isel(**{self.dim: self._upper})
+        return lower + self._weight * (upper - lower)
+
+
+@lru_cache(maxsize=32)
+def _cached_interpolator(source, target, dim):
+    """Helper function to reuse the interpolators of one dimensional grids."""
+    return PressureInterpolator(source, target, dim=dim)
+
+
+def get_interpolator(source, target, dim=c["Z"]):
+    """
+    Get an interpolator for the given grids. Interpolators between one
+    dimensional grids are cached and reused.
+
+    Parameters
+    ----------
+    source: array-like
+        The (one dimensional) pressure levels of the data
+    target: float, array-like or xarray.DataArray
+        The target pressures (see PressureInterpolator)
+    dim: str, optional
+        The pressure dimension. Defaults to Z.
+
+    Returns
+    -------
+    interpolator: PressureInterpolator
+        The interpolator
+    """
+    if isinstance(target, xr.DataArray):
+        return PressureInterpolator(source, target, dim=dim)
+
+    target = np.asarray(target, dtype=float)
+    key = tuple(target) if target.ndim == 1 else float(target)
+    return _cached_interpolator(
+        tuple(np.asarray(source, dtype=float)), key, dim
+    )
+
+
+def interpolate_pressure(dsi, target, dim=c["Z"]):
+    """
+    Interpolate a dataset to the given pressures, linear in log(p).
+
+    Parameters
+    ----------
+    dsi: xarray.Dataset or xarray.DataArray
+        The data that should be interpolated
+    target: float, array-like or xarray.DataArray
+        The target pressures in the unit of the dataset
+        (see PressureInterpolator)
+    dim: str, optional
+        The pressure dimension. Defaults to Z.
+
+    Returns
+    -------
+    interpolated: xarray.Dataset or xarray.DataArray
+        The data on the target pressures
+    """
+    return get_interpolator(dsi[dim].values, target, dim=dim)(dsi)
@@ -0,0 +1,96 @@
+"""
+==============================================================
+                     Directory manifests
+==============================================================
+ The results of scans of a directory (e.g., the saved datasets
+ or the iterations of GCM output) are cached in a manifest file
+ in the directory. The manifest is only rebuilt if the
+ modification time of the directory changes.
+==============================================================
+"""
+import json
+import os
+import time
+
+# path of the manifest -> manifest, to skip reading unchanged manifests
+_MANIFEST_CACHE = {}
+
+
+def scan_with_manifest(path, manifest_name, scan, create=True):
+    """
+    Scan a directory. The result is cached in a manifest file in the
+    directory, which is only rebuilt if the modification time of the
+    directory changes.
+
+    Parameters
+    ----------
+    path : str
+        The directory that is scanned
+    manifest_name : str
+        Filename of the manifest in the directory
+    scan : function
+        Function that scans the directory, called as scan(path). The result
+        needs to be JSON serializable.
+    create : bool, optional
+        Create the manifest, if it does not exist yet. Otherwise, only an
+        existing manifest is updated. Directories that can not be written
+        to are scanned without manifest in any case.
+
+    Returns
+    -------
+    content :
+        The (possibly cached) result of the scan
+    previous :
+        The result of the scan before the last change of the content, None
+        if the content did not change since the first scan.
+    """
+    manifest_path = os.path.join(path, manifest_name)
+    abs_path = os.path.abspath(manifest_path)
+
+    manifest = _MANIFEST_CACHE.get(abs_path)
+    if manifest is None:
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as fil:
+                manifest = json.load(fil)
+        except (OSError, ValueError):
+            manifest = None
+        if not isinstance(manifest, dict) or "content" not in manifest:
+            manifest = None
+
+    if (
+        manifest is not None
+        and manifest.get("mtime_ns") == os.stat(path).st_mtime_ns
+    ):
+        return manifest["content"], manifest["previous"]
+
+    # Creating the manifest changes the mtime of the directory, rewriting it
+    # later on does not. We therefore create it before we take the mtime.
+    writable = create or os.path.isfile(manifest_path)
+    try:
+        if writable:
+            with open(manifest_path, "a", encoding="utf-8"):
+                pass
+    except OSError:
+        writable = False
+    mtime_ns = os.stat(path).st_mtime_ns
+
+    content = scan(path)
+    if manifest is None:
+        previous = None
+    elif manifest["content"] != content:
+        previous = manifest["content"]
+    else:
+        previous = manifest["previous"]
+    manifest = {"content": content, "previous": previous}
+
+    # Only trust the manifest, if the directory was not modified right before
+    # the scan, since the mtime has a limited resolution on some filesystems.
+    if time.time_ns() - mtime_ns > 2e9:
+        manifest["mtime_ns"] = mtime_ns
+        _MANIFEST_CACHE[abs_path] = manifest
+
+    if writable:
+        with open(manifest_path, "w", encoding="utf-8") as fil:
+            json.dump(manifest, fil)
+
+    return content, previous
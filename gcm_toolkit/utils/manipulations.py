@@ -1,12 +1,21 @@
 """
 Functions to manipulate GCM data
+
+All functions work on dask-chunked datasets (e.g. gcmt.load(...,
+chunks={"time": 1})). The results stay lazy and the reductions are computed
+chunk by chunk along time, such that the memory usage is bounded by a few
+chunks instead of the length of the run.
 """
+import json
+
 import numpy as np
 import xarray as xr
 
 from ..core import writer as wrt
 from ..core.const import VARNAMES as c
-from ..core.units import convert_pressure
+from .dataset_cache import fingerprint, get_cache, same_fingerprint
+from .derived import get_derived
+from .hydrostatic import get_hydrostatic_state
 
 
 def m_add_horizontal_average(
@@ -18,18 +27,23 @@ def m_add_horizontal_average(
 
         bar q = int{q dA}/int{dA}
 
+    The normalized weights of each region are cached on the dataset, such that
+    they are only computed once.
+
     Parameters
     ----------
     dsi: xarray.Dataset
         The dataset for which the calculation should be performed
-    var_key: str, xarray.DataArray
+    var_key: str, xarray.DataArray or list
         The key or array of the variable quantity that should be averaged.
         If str, it will try to look up the key in the dataset.
         If DataArray, it will use this one instead.
-    var_key_out: str, optional
+        If list, all listed keys are averaged at once.
+    var_key_out: str or list, optional
         variable name used to store the outcome.
         If not provided, this script will just
         return the averages and not change the dataset inplace.
+        If var_key is a list, this needs to be a list of the same length.
     part: dict or str, optional
         'global': global average
         'night': only nightside (defined around +-180,0)
@@ -42,19 +56,23 @@ def m_add_horizontal_average(
         The 'lon', 'lat' specify regions of lon and lat that should be used,
         whereas 'inv' (optional, default False) gives the option to invert
         the lon and lat regions (e.g., exclude instead of include for average)
+        If a list of parts is given, all regions are averaged in one pass
+        and the result gets a new dimension 'region', labeled by the names
+        of the parts (or by the 'name' key of a dict, default: region<i>).
     area_key: str, optional
         Variable key in the dataset for the area of grid cells
 
     Returns
     -------
-    avg : xarray.DataArray
+    avg : xarray.DataArray or xarray.Dataset
         A dataArray with reduced dimensionality, containing the horizontally
-        averaged quantity.
+        averaged quantity. If var_key is a list, a Dataset with all averaged
+        quantities is returned.
     """
     # print information
     wrt.write_status("STAT", "Calculate horizontal average")
     if var_key_out is not None:
-        wrt.write_status("INFO", "Output variable: " + var_key_out)
+        wrt.write_status("INFO", f"Output variable: {var_key_out}")
     wrt.write_status("INFO", "Area of grid cells: " + area_key)
 
     if isinstance(var_key, str):
@@ -63,12 +81,49 @@ def m_add_horizontal_average(
     elif isinstance(var_key, xr.DataArray):
         data = var_key
         wrt.write_status("INFO", "Variable to be averaged is taken from input")
+    elif isinstance(var_key, (list, tuple)):
+        data = dsi[list(var_key)]
+        wrt.write_status("INFO", f"Variables to be averaged: {var_key}")
+        if var_key_out is not None and (
+            not isinstance(var_key_out, (list, tuple))
+            or len(var_key_out) != len(var_key)
+        ):
+            raise ValueError(
+                "var_key_out needs to be a list of the same length as var_key"
+            )
     else:
         raise ValueError(
-            "var_key needs to be either str (key in Dataset) or DataArray"
+            "var_key needs to be either str (key in Dataset), list of str "
+            "or DataArray"
         )
 
-    # Determine the area over which we want to average:
+    weights = get_region_weights(dsi, part=part, area_key=area_key)
+    if isinstance(data, xr.Dataset):
+        avg = data.map(_weighted_sum, args=(weights,))
+    else:
+        avg = _weighted_sum(data, weights)
+
+    if var_key_out is not None:
+        if isinstance(avg, xr.Dataset):
+            dsi.update(dict(zip(var_key_out, avg.data_vars.values())))
+        else:
+            dsi.update({var_key_out: avg})
+
+    return avg
+
+
+def _weighted_sum(data, weights):
+    """
+    Helper function to sum a quantity with the given weights over the
+    horizontal grid. All regions are computed in one contraction, so that the
+    data is read once and never broadcast against the regions. Missing values
+    (NaN) of the data or of the weights are skipped.
+    """
+    return xr.dot(data.fillna(0), weights.fillna(0), dims=[c["lon"], c["lat"]])
+
+
+def _get_part(part):
+    """Helper function to translate the region names into dictionaries."""
     if isinstance(part, str):
         if part == "global":
             part_internal = {}
@@ -96,37 +151,77 @@ def m_add_horizontal_average(
     else:
         raise ValueError("Please use a dict or a string for part.")
 
-    if lon := part_internal.get("lon"):
-        lon_bool = np.logical_and(
-            dsi[c["lon"]] <= max(lon),
-            dsi[c["lon"]] >= min(lon),
-        )
-    else:
-        lon_bool = xr.ones_like(dsi[area_key], dtype=np.bool)
+    return part_internal
 
-    if lat := part_internal.get("lat"):
-        lat_bool = np.logical_and(
-            dsi[c["lat"]] <= max(lat),
-            dsi[c["lat"]] >= min(lat),
-        )
-    else:
-        lat_bool = xr.ones_like(dsi[area_key], dtype=np.bool)
 
-    combined_bool = np.logical_and(lat_bool, lon_bool)
+def _get_region_name(part, i):
+    """Helper function to name the i-th region of a list of parts."""
+    if isinstance(part, str):
+        return part
+    if isinstance(part, dict):
+        return part.get("name", f"region{i}")
+    raise ValueError("Please use dicts or strings as parts of the list.")
+
 
-    if part_internal.get("inv", False):
-        area = xr.where(combined_bool, 0, dsi[area_key])
-    else:
-        area = xr.where(combined_bool, dsi[area_key], 0)
+def get_region_weights(dsi, part="global", area_key="area_c"):
+    """
+    Normalized area weights of a region, such that the horizontal average
+    of a quantity q is sum{q * weights}. The weights are cached on the
+    dataset and only recomputed if the grid or the area changes.
+
+    Parameters
+    ----------
+    dsi: xarray.Dataset
+        The dataset for which the weights should be calculated
+    part: dict, str or list, optional
+        The region (see m_add_horizontal_average)
+    area_key: str, optional
+        Variable key in the dataset for the area of grid cells
 
-    avg = (area * data).sum(dim=[c["lon"], c["lat"]]) / area.sum(
-        dim=[c["lon"], c["lat"]]
+    Returns
+    -------
+    weights: xarray.DataArray
+        Normalized weights on the horizontal grid. If part is a list,
+        the weights of all regions are stacked along a region dimension.
+    """
+    if isinstance(part, (list, tuple)):
+        names = [_get_region_name(sub, i) for i, sub in enumerate(part)]
+        if len(set(names)) != len(names):
+            raise ValueError("The names of the regions need to be unique.")
+        weights = [get_region_weights(dsi, sub, area_key) for sub in part]
+        return xr.concat(weights, dim=c["region"]).assign_coords(
+            {c["region"]: names}
+        )
+
+    part_internal = _get_part(part)
+
+    cache = get_cache(dsi, "region_weights")
+    key = (area_key, json.dumps(part_internal, sort_keys=True, default=str))
+    inputs = fingerprint(
+        dsi, variables=[area_key], values=[c["lon"], c["lat"]]
     )
+    if key in cache and same_fingerprint(cache[key][0], inputs):
+        return cache[key][1]
+
+    area = dsi[area_key]
+    mask = xr.ones_like(area, dtype=bool)
+    for dim in ["lon", "lat"]:
+        if val_range := part_internal.get(dim):
+            mask = (
+                mask
+                & (dsi[c[dim]] <= max(val_range))
+                & (dsi[c[dim]] >= min(val_range))
+            )
+    if part_internal.get("inv", False):
+        mask = ~mask
 
-    if var_key_out is not None:
-        dsi.update({var_key_out: avg})
+    area = area.where(mask, 0)
+    # the weights are small (lon x lat), keep them in memory, even if the
+    # area is a dask array
+    weights = (area / area.sum(dim=[c["lon"], c["lat"]])).compute()
 
-    return avg
+    cache[key] = (inputs, weights)
+    return weights
 
 
 def m_add_total_energy(
@@ -169,30 +264,17 @@ def m_add_total_energy(
     wrt.write_status("INFO", "Area of grid cells: " + area_key)
     wrt.write_status("INFO", "Temperature variable: " + temp_key)
 
-    dsi_calc = dsi.copy()
-    dsi_calc = convert_pressure(dsi_calc, dsi_calc.p_unit, "Pa")
-
-    dzdp, rho = _calc_hydrostat_eq(dsi_calc, temp_key)
-    z_geo = dzdp.cumulative_integrate(coord=c["Z"])
+    state = get_hydrostatic_state(dsi, temp_key)
 
-    d_pot_energy = z_geo * dsi_calc.attrs[c["g"]]
+    d_pot_energy = state.z_geo * dsi.attrs[c["g"]]
 
-    d_kin_energy = 0.5 * (dsi_calc[c["U"]] ** 2 + dsi_calc[c["V"]] ** 2)
+    d_kin_energy = 0.5 * (dsi[c["U"]] ** 2 + dsi[c["V"]] ** 2)
 
-    d_therm_energy = dsi_calc.attrs[c["cp"]] * dsi_calc[temp_key]
+    d_therm_energy = dsi.attrs[c["cp"]] * dsi[temp_key]
 
-    kin_energy = _integrate_over_mass(
-        quant_to_int=d_kin_energy, area=dsi_calc[area_key], dzdp=dzdp, rho=rho
-    )
-    therm_energy = _integrate_over_mass(
-        quant_to_int=d_therm_energy,
-        area=dsi_calc[area_key],
-        dzdp=dzdp,
-        rho=rho,
-    )
-    pot_energy = _integrate_over_mass(
-        quant_to_int=d_pot_energy, area=dsi_calc[area_key], dzdp=dzdp, rho=rho
-    )
+    kin_energy = state.integrate_over_mass(d_kin_energy, dsi[area_key])
+    therm_energy = state.integrate_over_mass(d_therm_energy, dsi[area_key])
+    pot_energy = state.integrate_over_mass(d_pot_energy, dsi[area_key])
 
     tot_energy = kin_energy + therm_energy + pot_energy
 
@@ -208,25 +290,6 @@ def m_add_total_energy(
         return tot_energy
 
 
-def _integrate_over_mass(quant_to_int, area, dzdp, rho):
-    """Helper function that carries out a mass integral (dM = rho dV)."""
-    return (
-        (quant_to_int * rho * area * dzdp)
-        .sum(dim=[c["lon"], c["lat"]])
-        .integrate(coord=c["Z"])
-    )
-
-
-def _calc_hydrostat_eq(dsi, temp_key):
-    """
-    Helper function that calculated rho and dz/dp
-    based on the ideal gas equation and on hydrostatic eq.
-    """
-    rho = dsi[c["Z"]] / dsi.attrs[c["R"]] / dsi[temp_key]
-    dzdp = -1 / rho / dsi.attrs[c["g"]]
-    return dzdp, rho
-
-
 def m_add_total_momentum(
     dsi, var_key_out=None, area_key="area_c", temp_key="T"
 ):
@@ -258,26 +321,17 @@ def m_add_total_momentum(
     wrt.write_status("INFO", "Area of grid cells: " + area_key)
     wrt.write_status("INFO", "Temperature variable: " + temp_key)
 
-    dsi_calc = dsi.copy()
-    dsi_calc = convert_pressure(dsi_calc, dsi_calc.p_unit, "Pa")
-
-    dzdp, rho = _calc_hydrostat_eq(dsi_calc, temp_key)
-    cosphi = np.cos(dsi_calc[c["lat"]] * np.pi / 180)
+    state = get_hydrostatic_state(dsi, temp_key)
+    cosphi = np.cos(dsi[c["lat"]] * np.pi / 180)
     d_momentum = (
         (
-            2
-            * np.pi
-            / dsi_calc.attrs[c["P_rot"]]
-            * dsi_calc.attrs[c["R_p"]]
-            * cosphi
-            + dsi_calc[c["U"]]
+            2 * np.pi / dsi.attrs[c["P_rot"]] * dsi.attrs[c["R_p"]] * cosphi
+            + dsi[c["U"]]
         )
         * cosphi
-        * dsi_calc.attrs[c["R_p"]]
-    )
-    momentum = _integrate_over_mass(
-        quant_to_int=d_momentum, area=dsi_calc[area_key], dzdp=dzdp, rho=rho
+        * dsi.attrs[c["R_p"]]
     )
+    momentum = state.integrate_over_mass(d_momentum, dsi[area_key])
 
     if var_key_out is not None:
         dsi.update({var_key_out: momentum})
@@ -304,9 +358,7 @@ def m_add_theta(dsi, var_key_out=None, temp_key="T"):
     theta : xarray.DataArray
         A dataArray with reduced dimensionality, containing the potential temperature
     """
-    theta = dsi[c[temp_key]] * (dsi[c["Z"]].max() / dsi[c["Z"]]) ** (
-        dsi.attrs[c["R"]] / dsi.attrs[c["cp"]]
-    )
+    theta = get_derived(dsi, "theta", temp_key=temp_key)
 
     if var_key_out is not None:
         dsi.update({var_key_out: theta})
@@ -360,6 +412,7 @@ def m_add_rcb(
     rcb : xarray.DataArray
         A dataArray with reduced dimensionality,
         containing the pressure of the rcb location.
+        NaN, if the profile does not deviate from the adiabat.
     """
     # print information
     wrt.write_status("STAT", "Calculate the location of the rcb")
@@ -368,21 +421,57 @@ def m_add_rcb(
     wrt.write_status("INFO", "Area of grid cells: " + area_key)
     wrt.write_status("INFO", "Temperature variable: " + temp_key)
 
-    dsi_calc = dsi.copy()
-    dsi_calc = convert_pressure(dsi_calc, dsi_calc.p_unit, "Pa")
+    theta = get_derived(dsi, "theta", temp_key=temp_key)
+    theta_g = m_add_horizontal_average(
+        dsi, var_key=theta, part=part, area_key=area_key
+    )
 
-    m_add_theta(dsi_calc, temp_key=temp_key, var_key_out="theta")
-    theta_g = m_add_horizontal_average(dsi_calc, var_key="theta", part=part)
+    rcb = _find_rcb(theta_g, tol)
 
-    rcb_loc = (
-        abs(
-            (theta_g - theta_g.isel(**{c["Z"]: 0}))
-            / theta_g.isel(**{c["Z"]: 0})
-        )
-        < tol
-    ).argmin(dim=c["Z"])
+    if var_key_out is not None:
+        dsi.update({var_key_out: rcb})
+
+    return rcb
 
-    rcb = dsi[c["Z"]].isel(**{c["Z"]: rcb_loc})
+
+def m_add_rcb_map(dsi, tol=0.01, var_key_out=None, temp_key="T"):
+    """
+    Calculate the radiative convective boundary (rcb) of every column by
+    searching (from the bottom upwards) for the first occurance of a
+    deviation from an adiabatic temperature profile.
+
+    All columns are processed at once, such that the map can be calculated
+    for every snapshot of a simulation.
+
+    Parameters
+    ----------
+    dsi: xarray.Dataset
+        The dataset for which the calculation should be performed
+    tol: float
+        tolerance for the relative deviation from adiabat
+    var_key_out: str, optional
+        variable name used to store the outcome. If not provided, this script will just
+        return the map and not change the dataset inplace.
+    temp_key: str, optional
+        The key to look up the temperature
+
+    Returns
+    -------
+    rcb : xarray.DataArray
+        A dataArray with the dimensions lon, lat (and time),
+        containing the pressure of the rcb location.
+        Columns without a deviation from the adiabat are set to NaN.
+    """
+    # print information
+    wrt.write_status(
+        "STAT", "Calculate the location of the rcb of each column"
+    )
+    if var_key_out is not None:
+        wrt.write_status("INFO", "Output variable: " + var_key_out)
+    wrt.write_status("INFO", "Temperature variable: " + temp_key)
+
+    theta = get_derived(dsi, "theta", temp_key=temp_key)
+    rcb = _find_rcb(theta, tol)
 
     if var_key_out is not None:
         dsi.update({var_key_out: rcb})
@@ -390,7 +479,24 @@ def m_add_rcb(
     return rcb
 
 
-def m_add_meridional_overturning(dsi, v_data="V", var_key_out=None):
+def _find_rcb(theta, tol):
+    """
+    Helper function to find the highest pressure at which theta deviates by
+    more than tol from its value at the bottom of the domain. Profiles
+    without a deviation are set to NaN.
+    """
+    pres = theta[c["Z"]]
+    bottom = theta.isel(**{c["Z"]: int(np.argmax(pres.values))})
+    deviates = abs((theta - bottom) / bottom) >= tol
+
+    # the first deviation from the bottom upwards is the one at the highest
+    # pressure. A single (lazy) reduction, independent of the order of Z.
+    return pres.where(deviates).max(dim=c["Z"])
+
+
+def m_add_meridional_overturning(
+    dsi, v_data="V", var_key_out=None, time_batch=None
+):
     """
     Calculate meridional overturning streamfunction. This quantity psi is
     computed by integrating the zonal-mean meridional velocity \bar V along
@@ -401,6 +507,9 @@ def m_add_meridional_overturning(dsi, v_data="V", var_key_out=None):
 
     (see e.g. Carone et al. (2018), Eq. 7)
 
+    The zonal mean is taken before the integration, such that only the
+    (Z, lat) field of each snapshot is integrated.
+
     Parameters
     ----------
     dsi: xarray.Dataset
@@ -410,6 +519,16 @@ def m_add_meridional_overturning(dsi, v_data="V", var_key_out=None):
     var_key_out: str, optional
         variable name used to store the outcome. If not provided, this script will just
         return the overturning circulation and not change the dataset inplace.
+    time_batch: int, optional
+        Number of snapshots that are read and averaged at once. Use this to
+        limit the memory usage for large datasets that are not chunked with
+        dask (chunked datasets are processed chunk by chunk anyway).
+        By default, all snapshots are processed at once.
+
+    Returns
+    -------
+    psi: xarray.DataArray
+        The streamfunction (in kg/s) with the dimensions Z, lat (and time)
     """
 
     # print information
@@ -417,18 +536,19 @@ def m_add_meridional_overturning(dsi, v_data="V", var_key_out=None):
     if var_key_out is not None:
         wrt.write_status("INFO", "Output variable: " + var_key_out)
 
-    v_integral = dsi[v_data].cumulative_integrate(coord="Z")
+    v_mean = _zonal_mean(dsi[v_data], time_batch)
 
-    if dsi.attrs.get("p_unit") == "bar":
-        # convert to SI, if needed
-        v_integral = v_integral / 1.0e5
+    # integrate in the pressure unit of the dataset, and convert to SI
+    v_integral = dsi.gcmt.p_factor("Pa") * v_mean.cumulative_integrate(
+        coord=c["Z"]
+    )
 
     psi = (
         2
         * np.pi
-        * np.cos(dsi.lat / 180 * np.pi)
-        * dsi.R_p
-        / dsi.g
+        * np.cos(dsi[c["lat"]] / 180 * np.pi)
+        * dsi.attrs[c["R_p"]]
+        / dsi.attrs[c["g"]]
         * v_integral
     )
 
@@ -436,3 +556,29 @@ def m_add_meridional_overturning(dsi, v_data="V", var_key_out=None):
         dsi.update({var_key_out: psi})
 
     return psi
+
+
+def _zonal_mean(data, time_batch=None):
+    """
+    Helper function to calculate the zonal mean of a variable. If time_batch
+    is given, the snapshots of data that is not chunked with dask are read and
+    averaged in batches of time_batch snapshots.
+    """
+    if (
+        time_batch is None
+        or data.chunks is not None
+        or c["time"] not in data.dims
+        or data.sizes[c["time"]] <= time_batch
+    ):
+        return data.mean(dim=c["lon"])
+
+    n_time = data.sizes[c["time"]]
+    return xr.concat(
+        [
+            data.isel(**{c["time"]: slice(start, start + time_batch)}).mean(
+                dim=c["lon"]
+            )
+            for start in range(0, n_time, time_batch)
+        ],
+        dim=c["time"],
+    )
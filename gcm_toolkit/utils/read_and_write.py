@@ -1,8 +1,13 @@
 """
 Functions to read and write data from GCMs to variable output.
 """
+import fnmatch
 import glob
+import importlib.util
+import json
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import xarray as xr
@@ -10,7 +15,26 @@ import xarray as xr
 from ..core import writer as wrt
 from ..core.const import SUPPORTED_GCMS, VARNAMES as c
 from ..core.units import convert_time, convert_pressure
+from .encoding import check_packed_range, get_chunks, get_encoding
+from .manifest import scan_with_manifest
 from .passport import is_the_data_basic
+from .sidecar import (
+    ISO_DIM,
+    SIDECAR_SUFFIX,
+    compute_sidecar,
+    convert_sidecar,
+    sidecar_name,
+    track_sidecar_data,
+)
+from .statistics import (
+    STATS_SUFFIX,
+    TimeStatistics,
+    read_statistics,
+    write_statistics,
+)
+
+MANIFEST = "gcmt_manifest.json"
+ZARR_TIME_MANIFEST = ".gcmt_time.json"
 
 
 def m_read_raw(
@@ -20,6 +44,7 @@ def m_read_raw(
     iters="last",
     load_existing=False,
     tag=None,
+    statistics=None,
     **kwargs,
 ):
     """
@@ -41,12 +66,16 @@ def m_read_raw(
         Set to true if you want to increment already loaded data
     tag : str
         Tag to reference the simulation in the collection of models.
+    statistics : gcm_toolkit.utils.statistics.TimeStatistics, optional
+        Running time statistics that are updated with the newly read
+        iterations (see TimeStatistics.update).
     kwargs: dict
         Additional options passed down to read functions
     """
 
     # call the required GCM read-in method
     dsi = None
+    loaded_dsi = None
 
     if gcm not in SUPPORTED_GCMS:
         raise NotImplementedError(
@@ -63,8 +92,6 @@ def m_read_raw(
                 loaded_dsi = tools.get_models(tag)
             except KeyError:
                 loaded_dsi = None
-        else:
-            loaded_dsi = None
 
         dsi = m_read_from_mitgcm(
             tools, data_path, iters, loaded_dsi=loaded_dsi, **kwargs
@@ -72,12 +99,32 @@ def m_read_raw(
 
     if dsi is not None:
         _add_attrs_and_store(tools, dsi, tag)
+        if statistics is not None:
+            _update_statistics(statistics, dsi, loaded_dsi)
     else:
         wrt.write_status("E-INFO", "No dataset has been loaded!")
 
 
+def _update_statistics(statistics, dsi, loaded_dsi):
+    """Helper function to add the newly read iterations to the statistics."""
+    wrt.write_status("INFO", "Update the time statistics")
+    if loaded_dsi is not None:
+        new = ~dsi[c["iter"]].isin(loaded_dsi[c["iter"]].values)
+        dsi = dsi.isel(**{c["time"]: new.values})
+    statistics.update(dsi)
+
+
 def m_read_reduced(
-    tools, data_path, tag=None, time_unit_in=None, p_unit_in=None
+    tools,
+    data_path,
+    tag=None,
+    time_unit_in=None,
+    p_unit_in=None,
+    chunks=None,
+    parallel=True,
+    variables=None,
+    p_range=None,
+    time_range=None,
 ):
     """
     Read in function for GCM data that has been reduced and saved according
@@ -85,8 +132,10 @@ def m_read_reduced(
 
     Parameters
     ----------
-    data_path : str
-        Folder path to the reduced (gcm_toolkit) data.
+    data_path : str, list
+        Path to the reduced (gcm_toolkit) data. Can also be a glob pattern
+        or a list of paths, e.g. for data that is split into segments along
+        time. Multiple files are opened lazily and combined by coordinates.
     time_unit_in: str, None
         units of time dimension in input dataset.
         If None, try to read from nc file (ds.attr.time_unit)
@@ -95,13 +144,46 @@ def m_read_reduced(
         If None, try to read from nc file (ds.attr.p_unit)
     tag : str
         Tag to reference the simulation in the collection of models.
+    chunks: dict, optional
+        Chunks of the dask arrays, e.g. {"time": 10}. By default, a single
+        file is not chunked and multiple files are chunked per file.
+    parallel: bool, optional
+        Open multiple files in parallel using dask.
+    variables: list, optional
+        Only keep these data variables (the basic variables T, U, V and W
+        are always kept, since they are required by gcm_toolkit).
+    p_range: tuple, optional
+        Only keep pressures between p_range[0] and p_range[1]
+        (in units of the GCMT object).
+    time_range: tuple, optional
+        Only keep times between time_range[0] and time_range[1]
+        (in units of the GCMT object).
     """
+    paths = _expand_paths(data_path)
+
     # print information
     wrt.write_status("STAT", "Read in reduced data")
-    wrt.write_status("INFO", "File path: " + data_path)
+    if len(paths) == 1:
+        wrt.write_status("INFO", "File path: " + paths[0])
+    else:
+        wrt.write_status("INFO", f"Number of files: {len(paths)}")
 
     # read dataset using xarray functionalities
-    dsi = xr.open_dataset(data_path)
+    if len(paths) == 1:
+        dsi = xr.open_dataset(paths[0], chunks=chunks)
+    else:
+        # only variables along time are concatenated, everything else is
+        # taken from the first file without comparing it to the others
+        dsi = xr.open_mfdataset(
+            paths,
+            chunks={} if chunks is None else chunks,
+            combine="by_coords",
+            data_vars="minimal",
+            coords="minimal",
+            compat="override",
+            combine_attrs="override",
+            parallel=parallel,
+        )
 
     if time_unit_in is None:
         time_unit_in = dsi.attrs.get("time_unit")
@@ -120,12 +202,80 @@ def m_read_reduced(
         dsi, current_unit=time_unit_in, goal_unit=tools.time_unit
     )
     dsi = convert_pressure(dsi, current_unit=p_unit_in, goal_unit=tools.p_unit)
+    dsi = _select_partial(
+        dsi, variables=variables, p_range=p_range, time_range=time_range
+    )
 
     tag = _add_attrs_and_store(tools, dsi, tag)
 
     wrt.write_status("INFO", "Tag: " + tag)
 
 
+def _select_partial(dsi, variables=None, p_range=None, time_range=None):
+    """
+    Select a subset of a lazily opened dataset. Since the data is not read
+    yet, only the selected part will be read from disk later on.
+
+    Parameters
+    ----------
+    dsi: xarray.Dataset
+        Dataset from which the subset should be selected
+    variables: list, optional
+        Data variables to keep (the basic variables are always kept)
+    p_range: tuple, optional
+        Range of pressures (Z) to keep
+    time_range: tuple, optional
+        Range of times to keep
+
+    Returns
+    -------
+    dsi: xarray.Dataset
+        Selected subset
+    """
+    if variables is not None:
+        if isinstance(variables, str):
+            variables = [variables]
+        keep = set(variables) | {c["T"], c["U"], c["V"], c["W"]}
+        dsi = dsi.drop_vars([var for var in dsi.data_vars if var not in keep])
+
+    for dim, val_range in [
+        (c["Z"], p_range),
+        (ISO_DIM, p_range),
+        (c["time"], time_range),
+    ]:
+        if val_range is None or dim not in dsi.dims:
+            continue
+        values = dsi[dim].values
+        (index,) = np.nonzero(
+            (values >= min(val_range)) & (values <= max(val_range))
+        )
+        if len(index) > 0 and np.all(np.diff(index) == 1):
+            # slices can be read more efficiently than lists of indices
+            index = slice(index[0], index[-1] + 1)
+        dsi = dsi.isel(**{dim: index})
+
+    return dsi
+
+
+def _expand_paths(data_path):
+    """
+    Helper function to expand a path, glob pattern or list of paths into
+    a sorted list of paths.
+    """
+    if isinstance(data_path, (str, os.PathLike)):
+        data_path = str(data_path)
+        if not any(char in data_path for char in "*?["):
+            return [data_path]
+        paths = sorted(glob.glob(data_path))
+    else:
+        paths = [str(path) for path in data_path]
+
+    if len(paths) == 0:
+        raise FileNotFoundError(f"No files found for {data_path}")
+
+    return paths
+
+
 def _add_attrs_and_store(tools, dsi, tag):
     # if no tag is given, models are just numbered as they get added
     if tag is None:
@@ -148,7 +298,15 @@ def _add_attrs_and_store(tools, dsi, tag):
     return tag
 
 
-def m_save(tools, path, method="nc", update_along_time=False, tag=None):
+def m_save(
+    tools,
+    path,
+    method="nc",
+    update_along_time=False,
+    tag=None,
+    encoding=None,
+    sidecar=False,
+):
     """
     Save function to store current member variables.
 
@@ -161,10 +319,23 @@ def m_save(tools, path, method="nc", update_along_time=False, tag=None):
         Defaults to '.nc'.
     update_along_time: str, optional
         Decide if you want to update already saved datasets along the timedimension.
-        This only works with method='zarr'.
+        With method='nc', this requires the file to have been written by
+        gcm_toolkit (with an unlimited time dimension).
+        With method='zarr', timesteps that are already stored are overwritten.
     tag: str, optional
         tag of the model that should be loaded.
         Will save all available models by default.
+    encoding: str or dict, optional
+        Encoding profile (compression, chunks and packing) of newly written
+        datasets. Either the name of one of the profiles in
+        gcm_toolkit.utils.encoding.ENCODING_PROFILES ('archive', 'fast',
+        'analysis') or a dictionary with the same keys.
+        By default, the data is stored uncompressed.
+    sidecar: bool or dict, optional
+        Also write a sidecar with reduced products (horizontal averages,
+        zonal means and isobaric slices) next to each dataset, which is
+        used for quick looks after loading. A dictionary is passed as
+        keyword arguments to gcm_toolkit.utils.sidecar.compute_sidecar.
 
     Returns
     -------
@@ -181,46 +352,609 @@ def m_save(tools, path, method="nc", update_along_time=False, tag=None):
         wrt.write_status("INFO", "Tag: " + tag)
     wrt.write_status("INFO", "method: " + method)
     wrt.write_status("INFO", "Update old data?: " + str(update_along_time))
+    if encoding is not None:
+        wrt.write_status("INFO", f"Encoding: {encoding}")
 
     if method not in ["nc", "zarr"]:
         raise NotImplementedError("Please use zarr or nc.")
 
-    for key, model in tools.get_models(always_dict=True).items():
-        if tag is not None and tag != key:
+    if sidecar:
+        wrt.write_status("INFO", "Write sidecars with reduced products")
+
+    # New files are written to temporary files first. With dask, all of them
+    # are written in one dask graph. They are moved into place afterwards.
+    parallel = _has_dask()
+    writes, delayed = [], []
+    try:
+        for key, model in tools.get_models(always_dict=True).items():
+            if tag is not None and tag != key:
+                continue
+
+            for dsi, filename in _save_outputs(
+                model, path, key, method, sidecar, parallel
+            ):
+                if update_along_time and os.path.exists(filename):
+                    _append_saved(
+                        dsi, filename, method, compute=dsi is not model
+                    )
+                    continue
+                if update_along_time and dsi is not model:
+                    wrt.write_status(
+                        "WARN",
+                        (
+                            f"No sidecar found for {key}. The new sidecar only"
+                            " contains the timesteps of the current model."
+                        ),
+                    )
+
+                tmpname = os.path.join(
+                    path, f".{os.path.basename(filename)}.tmp{os.getpid()}"
+                )
+                _remove_saved(tmpname)
+                writes.append((tmpname, filename))
+                delayed.append(
+                    _write_saved(dsi, tmpname, method, encoding, parallel)
+                )
+    except BaseException:
+        _discard_writes(writes)
+        raise
+
+    _finish_writes(writes, delayed)
+
+    # refresh the manifest of the directory
+    _find_saved_tags(path, create_manifest=True)
+
+
+def _has_dask():
+    """Helper function to check if dask is installed."""
+    return importlib.util.find_spec("dask") is not None
+
+
+def _save_outputs(model, path, key, method, sidecar, parallel):
+    """Helper function to list the datasets and the files of one model."""
+    outputs = [(model, os.path.join(path, f"{key}.{method}"))]
+    if sidecar:
+        # with dask, the reduced products are computed in the same graph
+        chunked = model.chunk() if parallel and not model.chunks else model
+        sidecar_kwargs = sidecar if isinstance(sidecar, dict) else {}
+        outputs.append(
+            (
+                compute_sidecar(chunked, **sidecar_kwargs),
+                sidecar_name(path, key, method),
+            )
+        )
+    return outputs
+
+
+def _append_saved(dsi, filename, method, compute=False):
+    """Helper function to append a dataset to a saved one along time."""
+    if compute:
+        # sidecars are small, no need to align dask chunks
+        dsi = dsi.compute()
+    if method == "nc":
+        _append_netcdf_along_time(dsi, filename)
+    else:
+        _append_zarr_along_time(dsi, filename)
+
+
+def _finish_writes(writes, delayed):
+    """
+    Helper function to compute the delayed writes and to move the written
+    files into place. The temporary files are removed, if a write fails.
+    """
+    delayed = [task for task in delayed if task is not None]
+    try:
+        if len(delayed) > 0:
+            import dask
+
+            dask.compute(*delayed)
+    except BaseException:
+        _discard_writes(writes)
+        raise
+
+    for tmpname, filename in writes:
+        _replace_saved(tmpname, filename)
+
+
+def _discard_writes(writes):
+    """Helper function to remove the temporary files of failed writes."""
+    for tmpname, _ in writes:
+        _remove_saved(tmpname)
+
+
+def _write_saved(dsi, tmpname, method, encoding, parallel=True):
+    """
+    Helper function to write a dataset. With parallel, the write is delayed
+    and the variables are written in the chunks of the encoding (zarr stores
+    the data in the dask chunks). Otherwise, the data is written right away
+    and None is returned.
+    """
+    if parallel and not dsi.chunks:
+        dsi = dsi.chunk(_get_chunks(dsi, encoding))
+
+    dsi_encoding = _get_encoding(dsi, encoding, method)
+    if method == "nc":
+        unlimited_dims = [c["time"]] if c["time"] in dsi.dims else None
+        delayed = dsi.to_netcdf(
+            tmpname,
+            unlimited_dims=unlimited_dims,
+            encoding=dsi_encoding,
+            compute=not parallel,
+        )
+    else:
+        delayed = dsi.to_zarr(
+            tmpname,
+            mode="w",
+            consolidated=True,
+            encoding=dsi_encoding,
+            compute=not parallel,
+        )
+        if c["time"] in dsi.dims:
+            _write_zarr_times(tmpname, dsi[c["time"]].values)
+
+    return delayed if parallel else None
+
+
+def _remove_saved(filename):
+    """Helper function to remove a netCDF file or zarr store, if it exists."""
+    if os.path.isdir(filename):
+        shutil.rmtree(filename)
+    elif os.path.exists(filename):
+        os.remove(filename)
+
+
+def _replace_saved(tmpname, filename):
+    """
+    Helper function to move a newly written file or store into place.
+    Files are replaced atomically. Since a directory can not be replaced
+    atomically, an old zarr store is moved away first and removed afterwards.
+    """
+    if not os.path.isdir(filename):
+        os.replace(tmpname, filename)
+        return
+
+    oldname = f"{tmpname}.old"
+    os.replace(filename, oldname)
+    os.replace(tmpname, filename)
+    shutil.rmtree(oldname)
+
+
+def _get_encoding(model, encoding, method):
+    """Helper function to get the encoding of a dataset (or None)."""
+    if encoding is None:
+        return None
+    return get_encoding(model, encoding, method)
+
+
+def _get_chunks(model, encoding):
+    """Helper function to get the chunks of an encoding profile."""
+    if encoding is None:
+        return {}
+    return get_chunks(model, encoding)
+
+
+def _append_netcdf_along_time(model, filename):
+    """
+    Append the timesteps of model that are not yet stored in the netCDF file
+    along the (unlimited) time dimension. Only the new data is written.
+
+    Parameters
+    ----------
+    model: xarray.Dataset
+        Dataset that should be appended
+    filename: str
+        netCDF file to which the data should be appended
+    """
+    import netCDF4
+
+    with xr.open_dataset(filename) as dsi_ondisk:
+        times_ondisk = dsi_ondisk[c["time"]].values
+
+    new = model.isel(
+        **{c["time"]: ~np.isin(model[c["time"]].values, times_ondisk)}
+    )
+    if new.sizes[c["time"]] == 0:
+        return
+
+    with netCDF4.Dataset(filename, "a") as ncf:
+        if not ncf.dimensions[c["time"]].isunlimited():
+            raise ValueError(
+                f"{filename} has no unlimited time dimension and can not be"
+                " updated along time. Please save it again without"
+                " update_along_time."
+            )
+        # we write data that is already encoded by xarray
+        ncf.set_auto_maskandscale(False)
+
+        encodings = {}
+        for name, var in new.variables.items():
+            if c["time"] not in var.dims:
+                continue
+            if name not in ncf.variables:
+                wrt.write_status(
+                    "WARN", f"{name} is not in {filename} and is skipped."
+                )
+                continue
+
+            ncvar = ncf.variables[name]
+            encodings[name] = {
+                key: ncvar.getncattr(key)
+                for key in [
+                    "units",
+                    "calendar",
+                    "scale_factor",
+                    "add_offset",
+                    "_FillValue",
+                ]
+                if key in ncvar.ncattrs()
+            }
+            encodings[name]["dtype"] = ncvar.dtype
+
+        # packed data would be clipped silently
+        check_packed_range(new, encodings)
+
+        n_old = len(ncf.dimensions[c["time"]])
+        region = slice(n_old, n_old + new.sizes[c["time"]])
+        for name, enc in encodings.items():
+            ncvar = ncf.variables[name]
+            var = new.variables[name].copy(deep=False)
+            var.encoding = enc
+            encoded = xr.conventions.encode_cf_variable(var, name=name)
+            encoded = encoded.transpose(*ncvar.dimensions)
+
+            index = tuple(
+                region if dim == c["time"] else slice(None)
+                for dim in ncvar.dimensions
+            )
+            ncvar[index] = encoded.values
+
+
+def _append_zarr_along_time(model, filename):
+    """
+    Write the timesteps of model to the zarr store. New timesteps are
+    inserted along time, timesteps that are already stored are overwritten
+    in place. The times of the store are taken from its time manifest, so
+    that the store itself does not need to be opened.
+
+    Parameters
+    ----------
+    model: xarray.Dataset
+        Dataset that should be written
+    filename: str
+        zarr store to which the data should be written
+    """
+    times_ondisk = _read_zarr_times(filename)
+    index_ondisk = {t: i for i, t in enumerate(times_ondisk)}
+
+    # packed data would be clipped silently
+    check_packed_range(model, _read_zarr_encodings(filename))
+
+    # variables without time are already stored
+    model = model.drop_vars(
+        [
+            name
+            for name, var in model.variables.items()
+            if c["time"] not in var.dims
+        ]
+    )
+
+    new, overlap = [], []
+    for i, time_i in enumerate(model[c["time"]].values.tolist()):
+        if time_i in index_ondisk:
+            overlap.append((index_ondisk[time_i], i))
+        else:
+            new.append(i)
+
+    # overwrite timesteps that are already stored, in contiguous regions
+    overlap.sort()
+    start = 0
+    for end in range(1, len(overlap) + 1):
+        if end < len(overlap) and overlap[end][0] == overlap[end - 1][0] + 1:
             continue
+        region = slice(overlap[start][0], overlap[end - 1][0] + 1)
+        model.isel(**{c["time"]: [i for _, i in overlap[start:end]]}).to_zarr(
+            filename, region={c["time"]: region}
+        )
+        start = end
+
+    if len(new) > 0:
+        _insert_zarr_along_time(
+            model.isel(**{c["time"]: new}).sortby(c["time"]),
+            filename,
+            times_ondisk,
+        )
+
+    wrt.write_status(
+        "INFO",
+        f"Appended {len(new)} and overwrote {len(overlap)} timesteps",
+    )
+
+
+def _insert_zarr_along_time(new, filename, times_ondisk):
+    """
+    Insert new timesteps into the zarr store, such that the times of the
+    store stay sorted. Timesteps after the last stored time are appended.
+    Otherwise, the stored timesteps that follow the first new timestep are
+    read, merged with the new ones and written back in order.
+
+    Parameters
+    ----------
+    new: xarray.Dataset
+        Sorted timesteps that are not yet stored. Only variables along time.
+    filename: str
+        zarr store to which the data should be written
+    times_ondisk: list
+        times in the order in which they are stored
+    """
+    times_new = new[c["time"]].values.tolist()
+    if times_ondisk == sorted(times_ondisk):
+        start = int(np.searchsorted(times_ondisk, times_new[0]))
+    else:
+        # stores of older versions may not be sorted yet
+        start = 0
+
+    if start < len(times_ondisk):
+        with xr.open_zarr(filename) as dsi_ondisk:
+            tail = (
+                dsi_ondisk[list(new.variables)]
+                .isel(**{c["time"]: slice(start, None)})
+                .load()
+            )
+        tail = tail.drop_vars(
+            [name for name in tail.variables if name not in new.variables]
+        )
+        new = xr.concat([tail, new], dim=c["time"]).sortby(c["time"])
+        for var in new.variables.values():
+            var.encoding = {}
+
+    n_tail = len(times_ondisk) - start
+    new.isel(**{c["time"]: slice(n_tail, None)}).to_zarr(
+        filename, append_dim=c["time"], consolidated=True
+    )
+    if n_tail > 0:
+        new.isel(**{c["time"]: slice(None, n_tail)}).to_zarr(
+            filename, region={c["time"]: slice(start, len(times_ondisk))}
+        )
+    _write_zarr_times(
+        filename,
+        list(times_ondisk[:start]) + new[c["time"]].values.tolist(),
+    )
+
+
+def _read_zarr_encodings(filename):
+    """
+    Helper function to read the packing of the variables of a zarr store.
+    Only the metadata of the store is read.
+    """
+    import zarr
+
+    encodings = {}
+    for name, array in zarr.open_group(filename, mode="r").arrays():
+        encodings[name] = {
+            key: array.attrs[key]
+            for key in ["scale_factor", "add_offset"]
+            if key in array.attrs
+        }
+        encodings[name]["dtype"] = array.dtype
+        encodings[name]["_FillValue"] = array.fill_value
+    return encodings
+
+
+def _read_zarr_times(filename):
+    """
+    Read the times that are stored in a zarr store. We use the time manifest
+    of the store, as long as its length matches the (consolidated) metadata.
+    Otherwise, the times are read from the store and the manifest is rebuilt.
+
+    Parameters
+    ----------
+    filename: str
+        zarr store
+
+    Returns
+    -------
+    times: list
+        times in the order in which they are stored
+    """
+    try:
+        with open(
+            os.path.join(filename, ZARR_TIME_MANIFEST), "r", encoding="utf-8"
+        ) as fil:
+            times = json.load(fil)
+        with open(
+            os.path.join(filename, ".zmetadata"), "r", encoding="utf-8"
+        ) as fil:
+            metadata = json.load(fil)["metadata"]
+        if metadata[f"{c['time']}/.zarray"]["shape"][0] == len(times):
+            return times
+    except (OSError, ValueError, KeyError):
+        pass
+
+    with xr.open_zarr(filename) as dsi_ondisk:
+        times = dsi_ondisk[c["time"]].values.tolist()
+
+    _write_zarr_times(filename, times)
+    import zarr
+
+    zarr.consolidate_metadata(filename)
+
+    return times
+
+
+def _write_zarr_times(filename, times):
+    """Helper function to write the time manifest of a zarr store."""
+    with open(
+        os.path.join(filename, ZARR_TIME_MANIFEST), "w", encoding="utf-8"
+    ) as fil:
+        json.dump(np.asarray(times).tolist(), fil)
+
+
+def m_convert_raw(
+    tools,
+    gcm,
+    data_path,
+    save_path,
+    iters="all",
+    batch_size=10,
+    method="nc",
+    tag=None,
+    load_existing=False,
+    update_along_time=False,
+    encoding=None,
+    sidecar=False,
+    statistics=False,
+    **kwargs,
+):
+    """
+    Convert raw GCM data to the gcm_toolkit format in batches of iterations.
+    Every batch is read, appended to the output file and then removed from
+    memory again, so that the memory usage does not depend on the number of
+    iterations. A model that is already stored under the tag in tools is
+    kept.
 
-        filename = os.path.join(path, f"{key}.{method}")
-
-        if method == "nc":
-            if os.path.isfile(filename):
-                os.remove(filename)
-            model.to_netcdf(filename)
-        elif method == "zarr":
-            if os.path.isdir(filename) and update_along_time:
-                # Relies on https://stackoverflow.com/questions/65339851/xarray-
-                #           dataset-to-zarr-overwrite-data-if-exists-with-append-dim
-                # read structure of dataset to see what's on disk
-                dsi_ondisk = xr.open_zarr(filename)
-
-                # get index of first new datapoint
-                (start_ix,) = np.nonzero(
-                    ~np.isin(model[c["time"]], dsi_ondisk[c["time"]])
+    Parameters
+    ----------
+    gcm : str
+        Type of GCM, must be 'MITgcm'.
+    data_path : str
+        Folder path to the standard output of the GCM.
+    save_path : str
+        directory at which the gcm_toolkit datasets should be stored.
+    iters : list, str
+        The iteration (time step) of the input files to be read.
+        If 'last', only the last iteration will be read.
+        If 'all' (default), all iterations will be read.
+    batch_size: int, optional
+        Number of iterations that are held in memory at once.
+    method : str, optional
+        Datasets can be stored as '.zarr' or '.nc'.
+    tag : str
+        Tag to reference the simulation in the collection of models.
+    load_existing: bool
+        Set to false if you want to overwrite already converted data
+        Set to true if you want to only append new iterations
+    update_along_time: bool, optional
+        Append the converted iterations to an existing output file instead
+        of overwriting it (see m_save). Implied by load_existing.
+    encoding: str or dict, optional
+        Encoding profile of the output (see m_save).
+    sidecar: bool or dict, optional
+        Also write a sidecar with reduced products (see m_save).
+    statistics: bool or dict, optional
+        Also accumulate time statistics (mean, variance, minimum and maximum)
+        of the converted iterations and store them next to the output
+        (see gcm_toolkit.utils.statistics.write_statistics). If data is
+        appended, the stored statistics are updated. A dictionary is passed
+        as keyword arguments to TimeStatistics.
+    kwargs: dict
+        Additional options passed down to read functions
+    """
+    wrt.write_status("STAT", "Convert raw data in batches")
+    wrt.write_status("INFO", "Batch size: " + str(batch_size))
+
+    if gcm not in SUPPORTED_GCMS:
+        raise NotImplementedError(
+            f"There is currently no readin function for {gcm}"
+        )
+    if method not in ["nc", "zarr"]:
+        raise NotImplementedError("Please use zarr or nc.")
+    if tag is None:
+        tag = str(len(tools.get_models(always_dict=True)))
+
+    prefix = kwargs.get("prefix", ["T", "U", "V", "W"])
+    if gcm == "MITgcm" and iters in ["all", "last"]:
+        from ..exorad.read_in import find_iters_mitgcm
+
+        all_iters = find_iters_mitgcm(data_path, prefix)
+        iters = [max(all_iters)] if iters == "last" else all_iters
+
+    iters = set(iters)
+    if (exclude_iters := kwargs.pop("exclude_iters", None)) is not None:
+        iters -= set(np.atleast_1d(exclude_iters))
+
+    filename = os.path.join(save_path, f"{tag}.{method}")
+    exists = os.path.exists(filename)
+    if load_existing and exists:
+        # only the iterations are read from disk, not the data itself
+        opener = xr.open_zarr if method == "zarr" else xr.open_dataset
+        with opener(filename) as dsi_ondisk:
+            iters -= set(dsi_ondisk[c["iter"]].values)
+
+    iters = sorted(iters)
+    if len(iters) == 0:
+        wrt.write_status("INFO", "No new iterations to convert.")
+        return
+
+    stats = None
+    if statistics:
+        stats_kwargs = statistics if isinstance(statistics, dict) else {}
+        if load_existing and exists:
+            stats = read_statistics(save_path, tag, **stats_kwargs)
+            if stats.count == 0:
+                wrt.write_status(
+                    "WARN",
+                    (
+                        f"No statistics found for {tag}. The new statistics "
+                        "only contain the newly converted iterations."
+                    ),
                 )
+        else:
+            stats = TimeStatistics(**stats_kwargs)
 
-                if len(start_ix) > 0:
-                    # region of new data
-                    region_new = slice(start_ix[0], model[c["time"]].size)
+    update_along_time = (load_existing or update_along_time) and exists
 
-                    # append structure of new data
-                    # (compute=False means no data is written)
-                    model.isel(time=region_new).to_zarr(
-                        filename, append_dim=c["time"], compute=True
-                    )
-            else:
-                model.to_zarr(filename, mode="w")
+    # a model that is already stored under the tag is put back afterwards
+    existing = tools.get(tag)
+    existing_sidecar = tools.sidecars.get(tag)
+    if existing is not None:
+        del tools[tag]
+
+    try:
+        for i in range(0, len(iters), batch_size):
+            tools.read_raw(
+                gcm,
+                data_path,
+                iters=iters[i : i + batch_size],
+                tag=tag,
+                statistics=stats,
+                **kwargs,
+            )
+            if tools.get(tag) is None:
+                continue
+            m_save(
+                tools,
+                save_path,
+                method=method,
+                update_along_time=update_along_time,
+                tag=tag,
+                encoding=encoding,
+                sidecar=sidecar,
+            )
+            if stats is not None:
+                # keep the statistics in sync with the output after every batch
+                write_statistics(stats, save_path, tag)
+            del tools[tag]
+            update_along_time = True
+    finally:
+        if tools.get(tag) is not None:
+            del tools[tag]
+        if existing is not None:
+            tools[tag] = existing
+            if existing_sidecar is not None:
+                tools.sidecars[tag] = existing_sidecar
 
 
-def m_load(tools, path, method="nc", tag=None):
+def m_load(
+    tools,
+    path,
+    method="nc",
+    tag=None,
+    chunks=None,
+    n_workers=None,
+    variables=None,
+    p_range=None,
+    time_range=None,
+):
     """
     Load function to load stored member variables.
 
@@ -234,6 +968,29 @@ def m_load(tools, path, method="nc", tag=None):
     tag: str, optional
         tag of the model that should be loaded.
         Will load all available models by default.
+    chunks: dict, optional
+        Open the datasets as dask arrays with the given chunks,
+        e.g. {"time": 10}. By default, netCDF files are loaded
+        lazily without dask and zarr stores are opened as dask arrays
+        with the chunks of the store.
+    n_workers: int, optional
+        Number of threads that open zarr stores in parallel. netCDF files
+        are opened one after another, since netCDF4/HDF5 is not thread safe.
+        Defaults to the default of concurrent.futures.ThreadPoolExecutor.
+    variables: list, optional
+        Only keep these data variables (the basic variables T, U, V and W
+        are always kept, since they are required by gcm_toolkit).
+    p_range: tuple, optional
+        Only keep pressures between p_range[0] and p_range[1]
+        (in units of the GCMT object).
+    time_range: tuple, optional
+        Only keep times between time_range[0] and time_range[1]
+        (in units of the GCMT object).
+
+    Notes
+    -----
+    Sidecars with reduced products that were written with save(sidecar=True)
+    are loaded as well and can be accessed with tools.get_sidecar(tag).
     """
 
     # print information
@@ -248,20 +1005,38 @@ def m_load(tools, path, method="nc", tag=None):
     if method not in ["nc", "zarr"]:
         raise NotImplementedError("Please use zarr or nc.")
 
-    tag_filename = "*" if tag is None else tag
-    available_datasets = glob.glob(f"{path}/{tag_filename}.{method}")
+    tags = _find_saved_tags(path)[method]
+    if tag is not None:
+        tags = fnmatch.filter(tags, tag)
 
-    if len(available_datasets) == 0:
+    if len(tags) == 0:
         print(f"[INFO] No data available to load for method {method}")
+        return
 
-    for file in available_datasets:
-        _, tail = os.path.split(file)
-        tag = tail.replace(f".{method}", "")
-        if method == "zarr":
-            dsi = xr.open_zarr(file)
-        elif method == "nc":
-            dsi = xr.open_dataset(file)
+    files = [os.path.join(path, f"{t}.{method}") for t in tags]
+    sidecars = {
+        t: sidecar_name(path, t, method)
+        for t in tags
+        if os.path.exists(sidecar_name(path, t, method))
+    }
+    files += list(sidecars.values())
+    if method == "zarr":
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            datasets = list(
+                executor.map(
+                    _open_saved,
+                    files,
+                    [method] * len(files),
+                    [chunks] * len(files),
+                )
+            )
+    else:
+        # netCDF4/HDF5 is not thread safe, so netCDF files are opened one
+        # after another
+        datasets = [_open_saved(file, method, chunks) for file in files]
+    sidecars = dict(zip(sidecars, datasets[len(tags) :]))
 
+    for key, dsi in zip(tags, datasets):
         dsi = convert_time(
             dsi,
             current_unit=dsi.attrs.get("time_unit"),
@@ -271,4 +1046,74 @@ def m_load(tools, path, method="nc", tag=None):
             dsi, current_unit=dsi.attrs.get("p_unit"), goal_unit=tools.p_unit
         )
 
-        tools[tag] = dsi
+        # zarr stores of older versions may contain timesteps that were
+        # appended out of order
+        if (
+            c["time"] in dsi.indexes
+            and not dsi.indexes[c["time"]].is_monotonic_increasing
+        ):
+            dsi = dsi.sortby(c["time"])
+
+        tools[key] = _select_partial(
+            dsi, variables=variables, p_range=p_range, time_range=time_range
+        )
+
+        if key in sidecars:
+            sidecar = convert_sidecar(
+                sidecars[key], p_unit=tools.p_unit, time_unit=tools.time_unit
+            )
+            if c["time"] in sidecar.indexes:
+                sidecar = sidecar.sortby(c["time"])
+            tools.sidecars[key] = _select_partial(
+                sidecar, p_range=p_range, time_range=time_range
+            )
+            track_sidecar_data(tools[key])
+
+
+def _open_saved(filename, method, chunks):
+    """Helper function to open one saved dataset."""
+    if method == "zarr":
+        if chunks is None:
+            return xr.open_zarr(filename)
+        return xr.open_zarr(filename, chunks=chunks)
+    return xr.open_dataset(filename, chunks=chunks)
+
+
+def _find_saved_tags(path, create_manifest=False):
+    """
+    Find the tags of all datasets that are saved in the directory. We use the
+    manifest of the directory if it is up to date, otherwise we glob and
+    refresh the manifest.
+
+    Parameters
+    ----------
+    path : str
+        directory at which the gcm_toolkit datasets are stored
+    create_manifest : bool, optional
+        Create the manifest if it does not exist (only done when saving, so
+        that loading never writes to the directory)
+
+    Returns
+    -------
+    tags: dict
+        Sorted lists of tags for each method (nc and zarr)
+    """
+    if not os.path.isdir(path):
+        return {"nc": [], "zarr": []}
+
+    return scan_with_manifest(
+        path, MANIFEST, _glob_saved_tags, create=create_manifest
+    )[0]
+
+
+def _glob_saved_tags(path):
+    """Helper function to glob the tags of the saved datasets."""
+    return {
+        method: sorted(
+            os.path.basename(file)[: -len(method) - 1]
+            for file in glob.glob(os.path.join(path, f"*.{method}"))
+            if not file.endswith(f".{SIDECAR_SUFFIX}.{method}")
+            and not file.endswith(f".{STATS_SUFFIX}.nc")
+        )
+        for method in ["nc", "zarr"]
+    }
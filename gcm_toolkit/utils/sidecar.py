@@ -0,0 +1,304 @@
+"""
+==============================================================
+                   Reduced-product sidecars
+==============================================================
+ Compact stores of the reduced products that are used most
+ often for quick looks (horizontal averages, zonal means and
+ a few isobaric slices). They are written next to the saved
+ datasets and used by the plotting functions if available.
+==============================================================
+"""
+import os
+
+import numpy as np
+import xarray as xr
+
+from ..core.const import VARNAMES as c
+from ..core.units import convert_pressure, convert_time, pressure_factor
+from .dataset_cache import fingerprint, get_cache, same_fingerprint
+from .manipulations import m_add_horizontal_average
+
+SIDECAR_SUFFIX = "sidecar"
+ISO_DIM = "Z_iso"
+N_ISOBARS = 5
+REGIONS = ["global", "day", "night", "morning", "evening"]
+
+# name of the variable of a product in the sidecar: f"{var_key}_{product}"
+PRODUCTS = ["havg", "zmean", "iso"]
+
+
+def sidecar_name(path, tag, method):
+    """
+    Get the path of the sidecar of a saved dataset.
+
+    Parameters
+    ----------
+    path: str
+        directory at which the gcm_toolkit datasets are stored
+    tag: str
+        tag of the dataset
+    method: str
+        'nc' or 'zarr'
+
+    Returns
+    -------
+    filename: str
+        path of the sidecar
+    """
+    return os.path.join(path, f"{tag}.{SIDECAR_SUFFIX}.{method}")
+
+
+def compute_sidecar(
+    dsi, variables=None, isobars=None, area_key="area_c", parts=None
+):
+    """
+    Compute the reduced products of a dataset. The products are computed
+    lazily, if the dataset is backed by dask.
+
+    Parameters
+    ----------
+    dsi: xarray.Dataset
+        A gcm_toolkit-compatible dataset
+    variables: list, optional
+        Variables for which the products are computed. Defaults to all
+        variables with a Z, lat and lon dimension.
+    isobars: list, optional
+        Pressures (in units of the dataset) of the isobaric slices.
+        The nearest pressure levels of the dataset are used. By default,
+        N_ISOBARS levels that are equally spaced in log(p) are selected.
+    area_key: str, optional
+        Variable key in the dataset for the area of grid cells. If it is not
+        available, no horizontal averages are computed.
+    parts: list, optional
+        Regions of the horizontal averages (see m_add_horizontal_average).
+        Defaults to REGIONS.
+
+    Returns
+    -------
+    sidecar: xarray.Dataset
+        Dataset with the variables f"{var_key}_havg" (horizontal averages
+        along the dimension region), f"{var_key}_zmean" (zonal mean) and
+        f"{var_key}_iso" (isobaric slices along the dimension ISO_DIM).
+    """
+    horizontal = {c["Z"], c["lat"], c["lon"]}
+    if variables is None:
+        variables = [
+            name
+            for name, var in dsi.data_vars.items()
+            if horizontal <= set(var.dims)
+            and np.issubdtype(var.dtype, np.floating)
+        ]
+    elif isinstance(variables, str):
+        variables = [variables]
+
+    levels = _isobar_levels(dsi[c["Z"]].values, isobars)
+
+    products = {}
+    if area_key in dsi and len(variables) > 0:
+        havg = m_add_horizontal_average(
+            dsi,
+            list(variables),
+            part=REGIONS if parts is None else list(parts),
+            area_key=area_key,
+        )
+        for var_key in variables:
+            products[f"{var_key}_havg"] = havg[var_key].assign_attrs(
+                area_key=area_key
+            )
+
+    for var_key in variables:
+        data = dsi[var_key]
+        products[f"{var_key}_zmean"] = data.mean(dim=c["lon"])
+        products[f"{var_key}_iso"] = data.sel(**{c["Z"]: levels}).rename(
+            {c["Z"]: ISO_DIM}
+        )
+
+    sidecar = xr.Dataset(products, attrs=dict(dsi.attrs))
+    if c["iter"] in dsi.coords:
+        sidecar.coords[c["iter"]] = dsi[c["iter"]]
+    return sidecar
+
+
+def _isobar_levels(z_values, isobars):
+    """Helper function to select the pressure levels of the slices."""
+    if isobars is None:
+        n_iso = min(N_ISOBARS, len(z_values))
+        isobars = np.geomspace(z_values.min(), z_values.max(), n_iso)
+
+    index = [np.argmin(np.abs(np.log(z_values / p))) for p in isobars]
+    return z_values[np.unique(index)]
+
+
+def convert_sidecar(sidecar, p_unit, time_unit):
+    """
+    Convert the units of a sidecar.
+
+    Parameters
+    ----------
+    sidecar: xarray.Dataset
+        sidecar as returned by compute_sidecar
+    p_unit: str
+        pressure unit to be changed to
+    time_unit: str
+        time unit to be changed to
+
+    Returns
+    -------
+    sidecar: xarray.Dataset
+        sidecar with updated units
+    """
+    factor = pressure_factor(sidecar.attrs.get("p_unit"), p_unit)
+    sidecar = convert_time(
+        sidecar,
+        current_unit=sidecar.attrs.get("time_unit"),
+        goal_unit=time_unit,
+    )
+    sidecar = convert_pressure(
+        sidecar, current_unit=sidecar.attrs.get("p_unit"), goal_unit=p_unit
+    )
+    if ISO_DIM in sidecar.dims:
+        sidecar[ISO_DIM] = np.array(sidecar[ISO_DIM]) * factor
+    return sidecar
+
+
+def track_sidecar_data(dsi):
+    """
+    Remember the data of a dataset that has been loaded together with its
+    sidecar (see sidecar_is_current).
+
+    Parameters
+    ----------
+    dsi: xarray.Dataset
+        The dataset the sidecar belongs to
+    """
+    variables = list(dsi.variables)
+    attrs = [key for key in dsi.attrs if key != "tag"]
+    get_cache(dsi, "sidecar")["data"] = (
+        variables,
+        attrs,
+        fingerprint(dsi, variables=variables, attrs=attrs),
+    )
+
+
+def sidecar_is_current(dsi):
+    """
+    Check if a dataset still holds the data that its sidecar was loaded
+    with. Assigning new data to a variable or coordinate (e.g.,
+    dsi["T"] = ...) or changing the attributes outdates the sidecar.
+    Changing the values of an array in place is not detected.
+
+    Parameters
+    ----------
+    dsi: xarray.Dataset
+        The dataset the sidecar belongs to
+
+    Returns
+    -------
+    current: bool
+        True, if the sidecar can be used for the dataset
+    """
+    tracked = get_cache(dsi, "sidecar").get("data")
+    if tracked is None:
+        return False
+
+    variables, attrs, old = tracked
+    if not set(variables) <= set(dsi.variables):
+        return False
+    new = fingerprint(dsi, variables=variables, attrs=attrs)
+    return same_fingerprint(old, new)
+
+
+def get_product(sidecar, var_key, product):
+    """
+    Get a reduced product from a sidecar.
+
+    Parameters
+    ----------
+    sidecar: xarray.Dataset or None
+        sidecar as returned by compute_sidecar
+    var_key: str
+        The key of the variable
+    product: str
+        One of PRODUCTS
+
+    Returns
+    -------
+    data: xarray.DataArray or None
+        The product or None, if it is not available
+    """
+    if sidecar is None or not isinstance(var_key, str):
+        return None
+    return sidecar.get(f"{var_key}_{product}")
+
+
+def horizontal_average_from_sidecar(sidecar, var_key, part, area_key):
+    """
+    Get a horizontal average from a sidecar.
+
+    Parameters
+    ----------
+    sidecar: xarray.Dataset or None
+        sidecar as returned by compute_sidecar
+    var_key: str
+        The key of the variable
+    part: str
+        The region of the average
+    area_key: str
+        Variable key for the area of grid cells that is used for the average
+
+    Returns
+    -------
+    avg: xarray.DataArray or None
+        The average or None, if it is not available
+    """
+    havg = get_product(sidecar, var_key, "havg")
+    if (
+        havg is None
+        or not isinstance(part, str)
+        or havg.attrs.get("area_key") != area_key
+        or part not in havg[c["region"]].values
+    ):
+        return None
+    return havg.sel(**{c["region"]: part}, drop=True)
+
+
+def isobaric_from_sidecar(sidecar, var_keys, time, pres):
+    """
+    Get a horizontal slice of the given variables from a sidecar.
+
+    Parameters
+    ----------
+    sidecar: xarray.Dataset or None
+        sidecar as returned by compute_sidecar
+    var_keys: list
+        The keys of the variables that are needed
+    time: float
+        Time of the slice
+    pres: float
+        Pressure of the slice (needs to be one of the stored levels)
+
+    Returns
+    -------
+    ds2d: xarray.Dataset or None
+        Dataset with the variables on a single Z level or None, if the
+        slice is not available in the sidecar
+    """
+    if sidecar is None or ISO_DIM not in sidecar.dims:
+        return None
+    if not np.any(np.isclose(sidecar[ISO_DIM].values, pres, rtol=1e-10)):
+        return None
+    if not np.isin(time, sidecar[c["time"]].values):
+        return None
+
+    slices = {}
+    for var_key in var_keys:
+        data = get_product(sidecar, var_key, "iso")
+        if data is None:
+            return None
+        slices[var_key] = data
+
+    ds2d = xr.Dataset(slices, attrs=sidecar.attrs)
+    ds2d = ds2d.sel(**{c["time"]: time}).sel(
+        **{ISO_DIM: pres}, method="nearest"
+    )
+    return ds2d.rename({ISO_DIM: c["Z"]})
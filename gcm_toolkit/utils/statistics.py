@@ -0,0 +1,340 @@
+"""
+==============================================================
+                 Streaming time statistics
+==============================================================
+ Running mean, variance, minimum and maximum along time.
+ Snapshots (or batches of snapshots) are added one after
+ another, so that statistics of long runs never need the full
+ time series in memory.
+==============================================================
+"""
+import os
+
+import numpy as np
+import xarray as xr
+
+from ..core.const import VARNAMES as c
+
+STATS_SUFFIX = "stats"
+SEEN_KEY = "stats_iters"
+
+# name of the variables in the stored statistics: f"{var_key}_{statistic}"
+STATISTICS = ["mean", "var", "min", "max"]
+
+
+class TimeStatistics:
+    """
+    Running statistics along time of the variables of a dataset.
+
+    Batches are reduced on their own and combined with the running state
+    (Chan et al. 1979). Adding a single snapshot is Welford's update.
+    Missing values (NaN) are not skipped.
+
+    Attributes
+    ----------
+    variables : list or None
+        The variables for which the statistics are calculated. If None, all
+        floating point variables with a time dimension are used.
+    count : int
+        Number of snapshots that have been added
+    attrs : dict
+        Attributes of the first dataset that has been added
+    """
+
+    def __init__(self, variables=None):
+        """
+        Constructor for the statistics.
+
+        Parameters
+        ----------
+        variables: list, optional
+            The variables for which the statistics are calculated.
+            Defaults to all floating point variables with a time dimension.
+        """
+        self.variables = variables
+        self.count = 0
+        self.attrs = {}
+        self._seen = set()
+        self._mean = None
+        self._m2 = None
+        self._min = None
+        self._max = None
+
+    def update(self, dsi):
+        """
+        Add the snapshots of a dataset to the statistics. Snapshots with an
+        iteration that has been added before are skipped.
+
+        Parameters
+        ----------
+        dsi: xarray.Dataset
+            A gcm_toolkit-compatible dataset
+
+        Returns
+        -------
+        stats: TimeStatistics
+            The updated statistics (self)
+        """
+        if c["time"] not in dsi.dims:
+            # a single snapshot
+            dsi = dsi.expand_dims(c["time"])
+            if c["iter"] in dsi.coords and dsi[c["iter"]].dims == ():
+                dsi = dsi.assign_coords(
+                    {c["iter"]: dsi[c["iter"]].expand_dims(c["time"])}
+                )
+
+        iters = None
+        if c["iter"] in dsi.coords and dsi[c["iter"]].dims == (c["time"],):
+            iters = dsi[c["iter"]].values
+            new = ~np.isin(iters, list(self._seen))
+            if not new.all():
+                dsi = dsi.isel(**{c["time"]: new})
+                iters = iters[new]
+
+        if dsi.sizes[c["time"]] == 0:
+            return self
+
+        if self.variables is None:
+            self.variables = [
+                name
+                for name, var in dsi.data_vars.items()
+                if c["time"] in var.dims
+                and np.issubdtype(var.dtype, np.floating)
+            ]
+
+        batch = _reduce_batch(dsi[self.variables])
+        self.merge(batch, dsi.sizes[c["time"]], attrs=dsi.attrs)
+        if iters is not None:
+            self._seen.update(iters.tolist())
+        return self
+
+    def merge(self, other, count=None, attrs=None):
+        """
+        Combine the statistics with other statistics.
+
+        Parameters
+        ----------
+        other: TimeStatistics or tuple
+            The statistics to be added. A tuple (mean, m2, min, max) of
+            reduced datasets can also be given together with count.
+        count: int, optional
+            Number of snapshots of other, if other is a tuple
+        attrs: dict, optional
+            Attributes of the dataset, if other is a tuple
+
+        Returns
+        -------
+        stats: TimeStatistics
+            The updated statistics (self)
+        """
+        if isinstance(other, TimeStatistics):
+            if other.count == 0:
+                return self
+            self._seen.update(other._seen)
+            count, attrs = other.count, other.attrs
+            other = (other._mean, other._m2, other._min, other._max)
+
+        mean, m_2, d_min, d_max = other
+        if self.count == 0:
+            self._mean, self._m2, self._min, self._max = other
+            self.count = count
+            self.attrs = dict(attrs or {})
+            return self
+
+        total = self.count + count
+        delta = mean - self._mean
+        self._mean = self._mean + delta * (count / total)
+        self._m2 = self._m2 + m_2 + delta**2 * (self.count * count / total)
+        self._min = np.minimum(self._min, d_min)
+        self._max = np.maximum(self._max, d_max)
+        self.count = total
+        return self
+
+    @property
+    def mean(self):
+        """Mean along time"""
+        return self._mean
+
+    def variance(self, ddof=0):
+        """
+        Variance along time.
+
+        Parameters
+        ----------
+        ddof: int, optional
+            Delta degrees of freedom (1 for the sample variance)
+
+        Returns
+        -------
+        var: xarray.Dataset or None
+            The variance, None if not enough snapshots have been added
+        """
+        if self.count - ddof <= 0:
+            return None
+        return self._m2 / (self.count - ddof)
+
+    def std(self, ddof=0):
+        """Standard deviation along time (see variance)"""
+        var = self.variance(ddof)
+        return None if var is None else np.sqrt(var)
+
+    @property
+    def min(self):
+        """Minimum along time"""
+        return self._min
+
+    @property
+    def max(self):
+        """Maximum along time"""
+        return self._max
+
+    def to_dataset(self):
+        """
+        Convert the statistics to a dataset.
+
+        Returns
+        -------
+        stats: xarray.Dataset
+            Dataset with the variables f"{var_key}_{statistic}" for each of
+            STATISTICS. The number of snapshots is stored in the attribute
+            n_time, the added iterations in the variable SEEN_KEY.
+        """
+        if self.count == 0:
+            raise ValueError("No data has been added to the statistics.")
+
+        products = {}
+        for statistic, data in zip(
+            STATISTICS, [self.mean, self.variance(), self.min, self.max]
+        ):
+            for var_key in data.data_vars:
+                products[f"{var_key}_{statistic}"] = data[var_key]
+
+        stats = xr.Dataset(products, attrs=dict(self.attrs, n_time=self.count))
+        stats[SEEN_KEY] = (SEEN_KEY, np.array(sorted(self._seen), dtype=int))
+        return stats
+
+    @classmethod
+    def from_dataset(cls, stats):
+        """
+        Restore the statistics from a dataset.
+
+        Parameters
+        ----------
+        stats: xarray.Dataset
+            Dataset as returned by to_dataset
+
+        Returns
+        -------
+        stats: TimeStatistics
+            The restored statistics
+        """
+        suffix = "_" + STATISTICS[0]
+        variables = [
+            name[: -len(suffix)]
+            for name in stats.data_vars
+            if name.endswith(suffix)
+        ]
+
+        new = cls(variables)
+        attrs = dict(stats.attrs)
+        new.count = int(attrs.pop("n_time"))
+        new.attrs = attrs
+        if SEEN_KEY in stats:
+            new._seen = set(stats[SEEN_KEY].values.tolist())
+
+        reduced = []
+        for statistic in STATISTICS:
+            reduced.append(
+                xr.Dataset(
+                    {
+                        var_key: stats[f"{var_key}_{statistic}"]
+                        for var_key in variables
+                    },
+                    attrs=attrs,
+                )
+            )
+        new._mean, var, new._min, new._max = reduced
+        new._m2 = var * new.count
+        return new
+
+
+def _reduce_batch(dsi):
+    """Helper function to calculate the statistics of a batch."""
+    dim = c["time"]
+    data = dsi.astype(np.float64)
+    mean = data.mean(dim=dim, skipna=False, keep_attrs=True)
+    m_2 = ((data - mean) ** 2).sum(dim=dim, skipna=False, keep_attrs=True)
+    d_min = dsi.min(dim=dim, skipna=False, keep_attrs=True)
+    d_max = dsi.max(dim=dim, skipna=False, keep_attrs=True)
+
+    # the running state is kept in memory
+    reduced = [mean, m_2, d_min, d_max]
+    if dsi.chunks:
+        import dask
+
+        reduced = list(dask.compute(*reduced))
+    return reduced
+
+
+def statistics_name(path, tag):
+    """
+    Get the path of the stored statistics of a dataset.
+
+    Parameters
+    ----------
+    path: str
+        directory at which the gcm_toolkit datasets are stored
+    tag: str
+        tag of the dataset
+
+    Returns
+    -------
+    filename: str
+        path of the statistics (netCDF)
+    """
+    return os.path.join(path, f"{tag}.{STATS_SUFFIX}.nc")
+
+
+def read_statistics(path, tag, variables=None):
+    """
+    Read stored statistics of a dataset.
+
+    Parameters
+    ----------
+    path: str
+        directory at which the gcm_toolkit datasets are stored
+    tag: str
+        tag of the dataset
+    variables: list, optional
+        Variables of new statistics, if none are stored yet
+
+    Returns
+    -------
+    stats: TimeStatistics
+        The stored statistics or new (empty) statistics, if none are stored
+    """
+    filename = statistics_name(path, tag)
+    if not os.path.exists(filename):
+        return TimeStatistics(variables)
+    return TimeStatistics.from_dataset(xr.load_dataset(filename))
+
+
+def write_statistics(stats, path, tag):
+    """
+    Store the statistics of a dataset. An existing file is replaced.
+
+    Parameters
+    ----------
+    stats: TimeStatistics
+        The statistics
+    path: str
+        directory at which the gcm_toolkit datasets are stored
+    tag: str
+        tag of the dataset
+    """
+    filename = statistics_name(path, tag)
+    tmpname = os.path.join(
+        path, f".{os.path.basename(filename)}.tmp{os.getpid()}"
+    )
+    stats.to_dataset().to_netcdf(tmpname)
+    os.replace(tmpname, filename)